@@ -0,0 +1,92 @@
+# batch.py - Bulk label-image compliance checks fanned out over a process pool
+
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from PIL import Image
+
+
+# ---------- CONFIG & CONSTANTS ----------
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+BATCH_WORKERS = os.cpu_count() or 1
+BATCH_SOURCE_TYPE = "Batch Upload OCR"
+IN_FLIGHT_PER_WORKER = 4   # Bounds how many inputs are read ahead of the workers
+# ----------------------------------------
+
+
+def iter_label_files(files):
+    """
+    Yields (name, bytes) for every label image in `files`, which may be Streamlit
+    uploads or filesystem paths. ZIP archives are expanded in place.
+    """
+    for f in files:
+        name = getattr(f, "name", None) or os.path.basename(str(f))
+        if hasattr(f, "getvalue"):
+            data = f.getvalue()
+        else:
+            with open(f, "rb") as fh:
+                data = fh.read()
+
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                for info in zf.infolist():
+                    inner = info.filename
+                    if info.is_dir() or "__MACOSX" in inner or os.path.basename(inner).startswith("."):
+                        continue
+                    if inner.lower().endswith(IMAGE_EXTENSIONS):
+                        yield f"{name}/{inner}", zf.read(info)
+        elif name.lower().endswith(IMAGE_EXTENSIONS):
+            yield name, data
+
+
+def _init_worker():
+    # Parallelism comes from the processes, so keep each worker's Tesseract pool small
+    from ocr_engine import get_engine
+    get_engine(size=1)
+
+
+def process_label(name: str, data: bytes, source_type: str = BATCH_SOURCE_TYPE) -> dict:
+    """OCR + compliance check for one image. Runs inside a worker process."""
+    from dashbroad import check_compliance, ocr_image_to_text
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        raw_text = ocr_image_to_text(img)
+        if not raw_text.strip():
+            return {"name": name, "status": "No text extracted", "details": None}
+        details = check_compliance(raw_text)
+        details['source_type'] = source_type
+        return {"name": name, "status": "OK", "details": details}
+    except Exception as e:
+        return {"name": name, "status": f"Error: {e}", "details": None}
+
+
+def bounded_map(pool, fn, items, window: int):
+    """
+    Submits fn(*item) for each item to `pool`, keeping at most `window` in flight,
+    and yields results in completion order. `items` is consumed lazily, so huge
+    inputs never have to sit in memory at once.
+    """
+    pending = set()
+    for item in items:
+        pending.add(pool.submit(fn, *item))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    for future in as_completed(pending):
+        yield future.result()
+
+
+def run_batch(items, workers: int = BATCH_WORKERS, source_type: str = BATCH_SOURCE_TYPE):
+    """Fans (name, bytes) items out over a process pool and yields results as they finish."""
+    workers = max(1, workers)
+    # 'spawn' avoids forking the Streamlit server with its threads and open sockets
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+        jobs = ((name, data, source_type) for name, data in items)
+        yield from bounded_map(pool, process_label, jobs, workers * IN_FLIGHT_PER_WORKER)
@@ -0,0 +1,115 @@
+# benchmarks/bench_adversarial.py - Worst-case field parsing latency on pathological OCR text, per rule set
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_adversarial [--max-size 200000] [--json out.json]
+#
+# Every generator is grown until the V1 rules exceed --v1-cutoff seconds on a single field
+# (larger V1 sizes are skipped - they would effectively hang); V2 runs every size. A rule
+# set scales linearly if its per-character cost stays flat as the input grows.
+
+import argparse
+import json
+import random
+import time
+
+from rules import RULESET_VERSION, evaluate, get_rules
+from benchmarks.bench_rules import SAMPLES
+
+OCR_NOISE = "0123456789 .,:;/-|~\n" + "abcdefghijklmnopqrstuvwxyz" + "NETQtyMRPRs"
+
+GENERATORS = {
+    # Digit runs after a quantity keyword: V1 net weight backtracks ~O(n^3)
+    "digit_run": lambda n: "NET " + "1" * n,
+    "digit_dots": lambda n: "NET WT " + "1 ." * (n // 3),
+    # Whitespace between caption and value: V1 country of origin ~O(n^3)
+    "blank_country": lambda n: "Country of Origin" + " " * n + "1",
+    # Repeated keywords on one line without a value: every match attempt rescans the line
+    "repeated_price": lambda n: "Rs " * (n // 3),
+    "repeated_qty": lambda n: "Qty Weight NET " * (n // 15),
+    # Keyword-less blank / punctuation lines: only the product name fallback runs, and
+    # V1's ^[\s\W]* rescans the rest of the run from every line start ~O(n^2)
+    "blank_lines": lambda n: "\n" * n,
+    "punct_lines": lambda n: "-\n" * (n // 2),
+    "spaced_punct": lambda n: " .\n\t|" * (n // 5),
+    # Seeded OCR garbage with keywords and long runs spliced in
+    "ocr_noise": lambda n: _noise(n),
+}
+
+
+def _noise(n: int) -> str:
+    rnd = random.Random(n)
+    parts, size = [], 0
+    while size < n:
+        kind = rnd.random()
+        if kind < 0.1:
+            part = rnd.choice(["NET ", "MRP ", "Rs. ", "Country of Origin ", "Mfg: ", "Qty "])
+        elif kind < 0.2:
+            part = rnd.choice("1 .:") * rnd.randint(20, 200)
+        else:
+            part = "".join(rnd.choice(OCR_NOISE) for _ in range(rnd.randint(1, 40)))
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)[:n]
+
+
+def worst_field(text: str, version: int):
+    """Slowest single-field search (main pattern or keyword-less fallback) over the text: (seconds, field name)."""
+    worst = (0.0, None)
+    for rule in get_rules(version):
+        for pattern, name in ((rule.pattern, rule.name), (rule.fallback, f"{rule.name} (fallback)")):
+            if pattern is None:
+                continue
+            start = time.perf_counter()
+            pattern.search(text)
+            worst = max(worst, (time.perf_counter() - start, name))
+    return worst
+
+
+def equivalence(samples: int, seed: int = 0) -> dict:
+    """Mismatching fields between V1 and the current rules on shuffled, well-formed label lines."""
+    lines = [line for text in SAMPLES.values() for line in text.splitlines() if line.strip()]
+    rnd = random.Random(seed)
+    mismatches = {}
+    for _ in range(samples):
+        text = "\n".join(rnd.sample(lines, rnd.randint(1, len(lines))))
+        old, new = evaluate(text, 1), evaluate(text, RULESET_VERSION)
+        for field in old:
+            if old[field] != new[field]:
+                mismatches[field] = mismatches.get(field, 0) + 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-size", type=int, default=250)
+    parser.add_argument("--max-size", type=int, default=200000)
+    parser.add_argument("--v1-cutoff", type=float, default=0.5, help="Stop growing V1 inputs past this many seconds")
+    parser.add_argument("--fuzz", type=int, default=5000, help="Well-formed samples for the V1/V2 output comparison")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'generator':<16}{'size':>9}{'v1 ms':>11}{'v2 ms':>10}{'v2 ns/char':>12}  slowest v2 field")
+    for name, generate in GENERATORS.items():
+        size, v1_done = args.min_size, False
+        while size <= args.max_size:
+            text = generate(size)
+            v1 = None if v1_done else worst_field(text, 1)[0]
+            v1_done = v1_done or v1 > args.v1_cutoff
+            v2, field = worst_field(text, RULESET_VERSION)
+            rows.append({"generator": name, "size": len(text), "v1_seconds": v1, "v2_seconds": v2, "v2_field": field})
+            v1_col = "-" if v1 is None else f"{1e3 * v1:.2f}"
+            print(f"{name:<16}{len(text):>9}{v1_col:>11}{1e3 * v2:>10.2f}{1e9 * v2 / max(1, len(text)):>12.1f}  {field}")
+            size *= 4
+
+    mismatches = equivalence(args.fuzz)
+    print(f"\nV1 vs v{RULESET_VERSION} on {args.fuzz} well-formed labels: "
+          + (", ".join(f"{f}: {c} differ" for f, c in mismatches.items()) or "identical"))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": rows, "mismatches": mismatches}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
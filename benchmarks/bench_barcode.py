@@ -0,0 +1,106 @@
+# benchmarks/bench_barcode.py - Barcode decode latency and read rate: old full-frame decode vs. the fast path
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_barcode                 # synthetic camera-like barcode photos
+#   python -m benchmarks.bench_barcode --images DIR    # your own photos, named after their code (e.g. 8901234567890.jpg)
+#   python -m benchmarks.bench_barcode --json out.json
+#
+# "baseline" is the previous decode_barcode: RGB conversion and every symbology zbar
+# knows, at full resolution. "fast" is barcodes.decode_retail. A read is correct when it
+# matches the expected code (leading zeros ignored, so a UPC-A reported as EAN-13 counts);
+# "wrong" reads decoded something else, "bad check" ones would have gone to the API
+# with a check digit that does not match.
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+
+from pyzbar.pyzbar import decode
+
+import barcodes
+from barcodes import decode_retail, valid_check_digit
+from benchmarks.corpus import load_images, synthetic_barcode_photos
+
+
+def baseline(image):
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return decode(image)
+
+
+def run(photos, method, repeat: int = 1) -> dict:
+    samples, correct, wrong, bad_check = [], 0, 0, 0
+    calls = [0]
+    zbar = barcodes.decode
+
+    def counted(*args, **kwargs):
+        calls[0] += 1
+        return zbar(*args, **kwargs)
+
+    barcodes.decode = counted  # counts the fast path's zbar passes
+    try:
+        for _ in range(repeat):
+            for _, image, expected in photos:
+                start = time.perf_counter()
+                results = method(image)
+                samples.append(1e3 * (time.perf_counter() - start))
+                codes = [r.data.decode("ascii", errors="replace") for r in results]
+                bad_check += sum(1 for r, code in zip(results, codes) if not valid_check_digit(code, r.type))
+                if expected and any(code.lstrip("0") == expected.lstrip("0") for code in codes):
+                    correct += 1
+                elif expected and codes:
+                    wrong += 1
+    finally:
+        barcodes.decode = zbar
+    samples.sort()
+    runs = len(photos) * repeat
+    return {
+        "p50_ms": round(statistics.median(samples), 1),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 1),
+        "mean_ms": round(statistics.fmean(samples), 1),
+        "read_rate": round(correct / runs, 3) if any(expected for _, _, expected in photos) else None,
+        "wrong_reads": wrong,
+        "bad_check_digit": bad_check,
+        "zbar_passes": round(calls[0] / runs, 2) if calls[0] else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="Directory of barcode photos (default: synthetic corpus)")
+    parser.add_argument("-n", type=int, default=40, help="Synthetic corpus size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    if args.images:
+        photos = []
+        for name, image in load_images(args.images):
+            match = re.search(r"\d{8,14}", os.path.splitext(name)[0])
+            photos.append((name, image, match.group(0) if match else None))
+    else:
+        photos = synthetic_barcode_photos(n=args.n)
+    for _, image, _ in photos:
+        image.load()  # decode the JPEGs up front, not inside the first timed call
+    pixels = statistics.fmean(image.width * image.height for _, image, _ in photos) / 1e6
+    print(f"{len(photos)} photos, {pixels:.1f} MP on average\n")
+
+    results = {"baseline": run(photos, baseline, args.repeat), "fast": run(photos, decode_retail, args.repeat)}
+
+    print(f"{'method':<10}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}{'read rate':>11}{'wrong':>7}{'bad check':>11}{'passes':>8}")
+    for name, row in results.items():
+        rate = f"{row['read_rate']:.0%}" if row["read_rate"] is not None else "-"
+        print(f"{name:<10}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['mean_ms']:>9}{rate:>11}{row['wrong_reads']:>7}"
+              f"{row['bad_check_digit']:>11}{row['zbar_passes']:>8}")
+    print(f"\nfast path: {results['baseline']['mean_ms'] / max(results['fast']['mean_ms'], 1e-3):.1f}x faster on average")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
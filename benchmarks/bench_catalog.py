@@ -0,0 +1,108 @@
+# benchmarks/bench_catalog.py - Local barcode lookup: catalog index vs. re-reading products.csv
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_catalog [--rows 1000000] [--lookups 10000] [--json out.json]
+#
+# Writes a synthetic products.csv, imports it with catalog.sync_csv, then times random
+# lookups through catalog.lookup against the old approach (pd.read_csv plus a string
+# comparison over the whole barcode column), which is timed for a few lookups only.
+# Also times the no-op sync of an unchanged file and an incremental sync after an append.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import catalog
+import db
+
+BASE = 8900000000000
+
+
+def write_csv(path: str, rows: int, start: int = 0, header: bool = True):
+    with open(path, "a" if not header else "w") as f:
+        if header:
+            f.write("barcode,product_name,brand,quantity,manufacturer,country,mrp,mfg_date\n")
+        for i in range(start, start + rows):
+            f.write(f'{BASE + i},"Product {i}",Brand {i % 500},{100 + i % 900} g,"Maker {i % 2000}, Ltd",India,{i % 400},2025-{1 + i % 12:02d}\n')
+
+
+def csv_scan(path: str, barcode):
+    df = pd.read_csv(path)
+    row = df[df["barcode"].astype(str) == str(barcode)]
+    return None if row.empty else row.iloc[0].to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--scans", type=int, default=3, help="Lookups timed with the old CSV scan")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, db_path = os.path.join(tmp, "products.csv"), os.path.join(tmp, "catalog.db")
+        write_csv(csv_path, args.rows)
+        results["csv_mb"] = round(os.path.getsize(csv_path) / 2**20, 1)
+
+        start = time.perf_counter()
+        catalog.sync_csv(csv_path, db_path)
+        results["import_s"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        catalog.sync_csv(csv_path, db_path)
+        results["unchanged_sync_ms"] = round(1e3 * (time.perf_counter() - start), 3)
+
+        write_csv(csv_path, 1000, start=args.rows, header=False)
+        start = time.perf_counter()
+        appended = catalog.sync_csv(csv_path, db_path)
+        results["append_sync_ms"] = round(1e3 * (time.perf_counter() - start), 1)
+        results["append_rows"] = appended
+
+        keys = [BASE + random.randrange(args.rows) for _ in range(args.lookups)]
+        tracemalloc.start()
+        samples = []
+        for key in keys:
+            t = time.perf_counter()
+            catalog.lookup(key, db_path)
+            samples.append(1e6 * (time.perf_counter() - t))
+        results["lookup_peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+        samples.sort()
+        results["lookup_p50_us"] = round(statistics.median(samples), 1)
+        results["lookup_p99_us"] = round(samples[int(0.99 * (len(samples) - 1))], 1)
+
+        tracemalloc.start()
+        scans = []
+        for key in keys[:args.scans]:
+            t = time.perf_counter()
+            csv_scan(csv_path, key)
+            scans.append(1e3 * (time.perf_counter() - t))
+        results["csv_scan_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+        results["csv_scan_median_ms"] = round(statistics.median(scans), 1)
+        db.get_pool(db_path).close()
+
+    print(f"{args.rows} products ({results['csv_mb']} MB CSV), imported in {results['import_s']} s")
+    print(f"  sync, file unchanged:       {results['unchanged_sync_ms']} ms")
+    print(f"  sync, {results['append_rows']} rows appended:   {results['append_sync_ms']} ms")
+    print(f"  catalog.lookup p50 / p99:   {results['lookup_p50_us']} / {results['lookup_p99_us']} us "
+          f"(peak {results['lookup_peak_kb']} KB)")
+    print(f"  read_csv + column scan:     {results['csv_scan_median_ms']} ms per lookup "
+          f"(peak {results['csv_scan_peak_mb']} MB)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
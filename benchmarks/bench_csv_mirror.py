@@ -0,0 +1,90 @@
+# benchmarks/bench_csv_mirror.py - Per-insert cost of the CSV mirror as the file grows
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_csv_mirror [--rows 100000] [--legacy-rows 3000] [--json out.json]
+#
+# Appends rows one at a time (as save_record does) and reports the mean cost per insert
+# over consecutive windows. The append-only mirror stays flat; the old read_csv -> concat
+# -> to_csv rewrite grows linearly per insert, so it is only run up to --legacy-rows.
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from csv_mirror import CSVMirror
+
+COLUMNS = [
+    "id", "user_id", "username", "source_type", "product_name", "net_weight", "mrp",
+    "inclusive_of_all_taxes", "mfg_date", "country_of_origin", "manufacturer", "compliance_status", "created_at"
+]
+
+
+def make_row(i: int) -> dict:
+    return {
+        "id": i, "user_id": 1, "username": "officer", "source_type": "Image Upload OCR",
+        "product_name": f"Spicy Masala Chips {i}", "net_weight": "200g", "mrp": "45.00",
+        "inclusive_of_all_taxes": 1, "mfg_date": "09/2025", "country_of_origin": "India",
+        "manufacturer": "Delicious Foods Pvt Ltd, 123 Industrial Area, Noida",
+        "compliance_status": "✅ COMPLIANT", "created_at": "2025-10-01T12:00:00",
+    }
+
+
+def legacy_append(path: str, row: dict):
+    """The pre-mirror save path: whole-file read, concat and rewrite."""
+    try:
+        df_existing = pd.read_csv(path)
+    except FileNotFoundError:
+        df_existing = pd.DataFrame(columns=row.keys())
+    df_existing = pd.concat([df_existing, pd.DataFrame([row])], ignore_index=True)
+    df_existing.to_csv(path, index=False)
+
+
+def measure(append, rows: int, window: int) -> list:
+    """Mean microseconds per insert for each window of `window` inserts: [(rows_so_far, us)]."""
+    out = []
+    start = time.perf_counter()
+    for i in range(1, rows + 1):
+        append(make_row(i))
+        if i % window == 0:
+            now = time.perf_counter()
+            out.append((i, 1e6 * (now - start) / window))
+            start = now
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--legacy-rows", type=int, default=3000)
+    parser.add_argument("--fsync-every", type=int, default=100)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror = CSVMirror(os.path.join(tmp, "mirror.csv"), COLUMNS, fsync_every=args.fsync_every)
+        results = {
+            "mirror": measure(lambda row: mirror.append([row]), args.rows, max(1, args.rows // 10)),
+            "legacy": measure(lambda row: legacy_append(os.path.join(tmp, "legacy.csv"), row),
+                              args.legacy_rows, max(1, args.legacy_rows // 10)),
+        }
+        mirror_size = os.path.getsize(mirror.path)
+
+    for name, points in results.items():
+        print(f"\n{name}")
+        print(f"  {'rows':>8}{'us/insert':>12}")
+        for rows, us in points:
+            print(f"  {rows:>8}{us:>12.1f}")
+    first, last = results["mirror"][0][1], results["mirror"][-1][1]
+    print(f"\nmirror: {args.rows} rows ({mirror_size / 1e6:.1f} MB), last/first window cost {last / first:.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/bench_db.py - Concurrent writer / reader sessions: pooled WAL connections vs. connect-per-query
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_db [--writers 4] [--readers 4] [--inserts 300] [--json out.json]
+#
+# Writers insert one record per transaction (as save_record does); readers repeatedly run
+# the Records tab query until the writers finish. "legacy" opens a fresh connection per
+# operation in the default rollback-journal mode, "pooled" goes through db.ConnectionPool.
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from db import ConnectionPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, username TEXT, source_type TEXT, raw_text TEXT,
+    product_name TEXT, net_weight TEXT, mrp TEXT, inclusive_of_all_taxes INTEGER, mfg_date TEXT,
+    country_of_origin TEXT, manufacturer TEXT, compliance_status TEXT, created_at TEXT
+)
+"""
+INSERT = """
+INSERT INTO records (user_id, username, source_type, raw_text, product_name, net_weight, mrp,
+    inclusive_of_all_taxes, mfg_date, country_of_origin, manufacturer, compliance_status, created_at)
+VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+"""
+READ = "SELECT * FROM records ORDER BY created_at DESC LIMIT 500"
+RAW_TEXT = "Product Name: Spicy Masala Chips\nNET WT: 200g\nMRP: Rs. 45.00\n" * 8
+
+
+class Legacy:
+    """The pre-pool access pattern: connect, run, commit, close."""
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def transaction(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def run(store, writers: int, readers: int, inserts: int) -> dict:
+    with store.transaction() as conn:
+        conn.execute(SCHEMA)
+    write_lat, read_lat, errors = [], [], []
+    done = threading.Event()
+
+    def writer(wid):
+        for i in range(inserts):
+            row = (wid, f"user{wid}", "Image Upload OCR", RAW_TEXT, f"Product {i}", "200g", "45.00", 1,
+                   "09/2025", "India", "Delicious Foods Pvt Ltd", "✅ COMPLIANT", f"2025-10-01T12:{i % 60:02d}:00")
+            start = time.perf_counter()
+            try:
+                with store.transaction() as conn:
+                    conn.execute(INSERT, row)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+                continue
+            write_lat.append(time.perf_counter() - start)
+
+    def reader():
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                with store.connection() as conn:
+                    conn.execute(READ).fetchall()
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+                continue
+            read_lat.append(time.perf_counter() - start)
+
+    read_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    write_threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    start = time.perf_counter()
+    for t in read_threads + write_threads:
+        t.start()
+    for t in write_threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for t in read_threads:
+        t.join()
+
+    def pct(values, q):
+        return round(1e3 * statistics.quantiles(values, n=100)[q - 1], 2) if len(values) > 1 else None
+
+    return {
+        "seconds": round(elapsed, 3),
+        "writes_per_sec": round(len(write_lat) / elapsed, 1),
+        "reads_per_sec": round(len(read_lat) / elapsed, 1),
+        "write_p50_ms": pct(write_lat, 50), "write_p95_ms": pct(write_lat, 95),
+        "read_p50_ms": pct(read_lat, 50), "read_p95_ms": pct(read_lat, 95),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--inserts", type=int, default=300, help="Per writer")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "legacy": Legacy(os.path.join(tmp, "legacy.db")),
+            "pooled": ConnectionPool(os.path.join(tmp, "pooled.db"), size=args.writers + args.readers),
+        }
+        for name, store in stores.items():
+            results[name] = run(store, args.writers, args.readers, args.inserts)
+        stores["pooled"].close()
+
+    keys = list(results["legacy"])
+    print(f"{'':<10}" + "".join(f"{k:>16}" for k in keys))
+    for name, row in results.items():
+        print(f"{name:<10}" + "".join(f"{'-' if row[k] is None else row[k]:>16}" for k in keys))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/bench_parsers.py - Throughput and per-field precision/recall of the field extractors
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_parsers [-n 2000] [--noise 0.02] [--json parser_bench.json] [--compare old.json]
+#
+# Suites: OCR label text -> check_compliance, OCR lookup dicts -> barcode_compliance_details,
+# product page source -> scrape_product's post-processing + check_compliance.
+# An extracted value counts as correct when it equals the ground truth after lower-casing
+# and dropping everything but letters, digits and dots (MRP is compared numerically).
+
+import argparse
+import json
+import re
+import time
+
+from rules import RULESET_VERSION
+from benchmarks.corpus import synthetic_barcode_records, synthetic_label_texts, synthetic_product_pages
+
+
+def _norm(value) -> str:
+    return re.sub(r"[^a-z0-9.]", "", str(value).lower())
+
+
+def matches(field: str, extracted, truth) -> bool:
+    if field == "inclusive_of_all_taxes":
+        return bool(extracted) == bool(truth)
+    if field == "mrp":
+        try:
+            return float(str(extracted).replace(",", "")) == float(truth)
+        except ValueError:
+            return False
+    return _norm(extracted) == _norm(truth)
+
+
+def score(pairs: list) -> dict:
+    """
+    pairs: (extracted details, truth) per label. Per field:
+    tp = correct value, fp = wrong or spurious value, fn = true value not extracted.
+    A wrong value counts as both fp and fn.
+    """
+    counts = {}
+    for details, truth in pairs:
+        for field, expected in truth.items():
+            c = counts.setdefault(field, {"tp": 0, "fp": 0, "fn": 0})
+            got = details.get(field)
+            present = bool(got) and got not in ("N/A", "N/A (API)")
+            if present and expected and matches(field, got, expected):
+                c["tp"] += 1
+                continue
+            if present:
+                c["fp"] += 1
+            if expected:
+                c["fn"] += 1
+    for c in counts.values():
+        c["precision"] = round(c["tp"] / (c["tp"] + c["fp"]), 4) if c["tp"] + c["fp"] else None
+        c["recall"] = round(c["tp"] / (c["tp"] + c["fn"]), 4) if c["tp"] + c["fn"] else None
+    return counts
+
+
+def run_suite(corpus: list, extract) -> dict:
+    start = time.perf_counter()
+    outputs = [extract(item) for item in corpus]
+    elapsed = time.perf_counter() - start
+    return {
+        "labels": len(corpus),
+        "seconds": round(elapsed, 4),
+        "labels_per_sec": round(len(corpus) / elapsed, 1),
+        "fields": score(list(zip(outputs, (item[-1] for item in corpus)))),
+    }
+
+
+def suites(n: int, seed: int, noise: float, pages: int) -> dict:
+    from dashbroad import (barcode_compliance_details, check_compliance, scraped_manufacturer,
+                           scraped_quantity, scraped_raw_text)
+
+    def scrape(item):
+        page_text, elements, _ = item
+        product = {"Net Quantity": scraped_quantity(page_text), "Manufacturer details": scraped_manufacturer(page_text), **elements}
+        if not product["Manufacturer details"] and product["Brand name (Proxy)"]:
+            product["Manufacturer details"] = product["Brand name (Proxy)"]
+        return check_compliance(scraped_raw_text(product))
+
+    return {
+        "check_compliance": run_suite(synthetic_label_texts(n, seed, noise), lambda item: check_compliance(item[0])),
+        "barcode_compliance": run_suite(synthetic_barcode_records(n, seed),
+                                        lambda item: barcode_compliance_details(item[0], "Barcode Scan")),
+        "scrape_post_processing": run_suite(synthetic_product_pages(pages, seed), scrape),
+    }
+
+
+def print_report(results: dict, baseline: dict = None):
+    for suite, result in results.items():
+        line = f"\n{suite}: {result['labels_per_sec']:.0f} labels/s"
+        if baseline and suite in baseline:
+            line += f" (was {baseline[suite]['labels_per_sec']:.0f})"
+        print(line)
+        print(f"  {'field':<24}{'precision':>10}{'recall':>10}")
+        for field, c in result["fields"].items():
+            cells = ["-" if c[k] is None else f"{c[k]:.3f}" for k in ("precision", "recall")]
+            if baseline and suite in baseline and field in baseline[suite]["fields"]:
+                old = baseline[suite]["fields"][field]
+                cells = [cell if old[k] is None or c[k] is None else f"{cell} ({c[k] - old[k]:+.3f})"
+                         for cell, k in zip(cells, ("precision", "recall"))]
+            print(f"  {field:<24}{cells[0]:>10}{cells[1]:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=2000, help="Labels per text/barcode suite")
+    parser.add_argument("--pages", type=int, default=200, help="Product pages for the scrape suite")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.02, help="Per-character OCR confusion rate")
+    parser.add_argument("--json", default="parser_bench.json", help="Write results to this file")
+    parser.add_argument("--compare", help="Earlier --json output to show deltas against")
+    args = parser.parse_args()
+
+    results = suites(args.n, args.seed, args.noise, args.pages)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_report(results, baseline)
+
+    with open(args.json, "w") as f:
+        json.dump({"rule_version": RULESET_VERSION, "n": args.n, "pages": args.pages, "seed": args.seed,
+                   "noise": args.noise, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_preprocess.py - OCR latency and field hit rate per preprocessing stage
+# (plus a final row for text-region cropping on top of the full pipeline)
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_preprocess                 # synthetic camera-like labels
+#   python -m benchmarks.bench_preprocess --images DIR    # your own label photos
+#   python -m benchmarks.bench_preprocess --json out.json
+
+import argparse
+import json
+import time
+
+from benchmarks.corpus import load_images, synthetic_label_photos
+from preprocess import preprocess_image, stage_configs
+from text_regions import ocr_by_regions
+from ocr_engine import get_engine
+
+FIELDS = ["product_name", "net_weight", "mrp", "inclusive_of_all_taxes", "mfg_date", "country_of_origin", "manufacturer"]
+
+
+def run(images, repeat: int = 1) -> list:
+    from dashbroad import check_compliance
+
+    engine = get_engine()
+    engine.warm()
+    rows = []
+    stages = stage_configs() + [("+regions", None)]
+    for stage_name, config in stages:
+        prep_s = ocr_s = 0.0
+        fields_found = pixels = 0
+        for _ in range(repeat):
+            for _, img in images:
+                t0 = time.perf_counter()
+                if config is None:
+                    # Region cropping interleaves preprocessing and OCR; report it all as OCR time
+                    t1 = t0
+                    text = ocr_by_regions(img, engine)
+                    pixels += img.width * img.height
+                else:
+                    prepared = preprocess_image(img, config)
+                    t1 = time.perf_counter()
+                    text = engine.image_to_string(prepared)
+                    pixels += prepared.width * prepared.height
+                t2 = time.perf_counter()
+                prep_s += t1 - t0
+                ocr_s += t2 - t1
+                details = check_compliance(text)
+                fields_found += sum(1 for f in FIELDS if details.get(f))
+        n = len(images) * repeat
+        rows.append({
+            "stage": stage_name,
+            "config": config,
+            "images": n,
+            "mean_pixels": pixels / n,
+            "preprocess_ms": 1000 * prep_s / n,
+            "ocr_ms": 1000 * ocr_s / n,
+            "total_ms": 1000 * (prep_s + ocr_s) / n,
+            "field_hit_rate": fields_found / (n * len(FIELDS)),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="Directory of label photos (default: synthetic corpus)")
+    parser.add_argument("-n", type=int, default=8, help="Synthetic corpus size")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    images = load_images(args.images) if args.images else synthetic_label_photos(args.n)
+    print(f"OCR backend: {get_engine().backend}, images: {len(images)}")
+    rows = run(images, args.repeat)
+
+    print(f"{'stage':<12}{'Mpx':>8}{'prep ms':>10}{'ocr ms':>10}{'total ms':>10}{'hit rate':>10}")
+    for r in rows:
+        print(f"{r['stage']:<12}{r['mean_pixels'] / 1e6:>8.2f}{r['preprocess_ms']:>10.1f}"
+              f"{r['ocr_ms']:>10.1f}{r['total_ms']:>10.1f}{r['field_hit_rate']:>10.1%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_rules.py - Per-call latency of the rule engine vs. the original inline-regex check_compliance
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_rules [--calls 20000]
+
+import argparse
+import re
+import timeit
+
+from rules import evaluate
+
+SAMPLES = {
+    "ocr_label": (
+        "Product Name: Spicy Masala Chips\nNET WT: 200g\nMRP: Rs. 45.00 (Inclusive of all taxes)\n"
+        "Mfg Date: 09/2025\nCountry of Origin: India\nManufactured By: Delicious Foods Pvt Ltd, "
+        "123 Industrial Area, Noida\nFor Consumer Complaints call 1800-000-000\n"
+    ),
+    "barcode": (
+        "Product Name: Nutella\nManufacturer: Ferrero\nNet Quantity: 350 g\nMRP: N/A (API)\n"
+        "MFG Date: N/A (API)\nCountry of Origin: en:india\n"
+    ),
+    "scraped": (
+        "Product Name: Herbal Bath Soap Pack of 4\nMRP: Rs 180 (Inclusive of all taxes)\n"
+        "Net Quantity: 4 x 125g\nManufacturer: Green Leaf Cosmetics\n"
+    ),
+    "noisy_missing": (
+        "5P1CY MA5ALA CH1PS\n~~ best before 6 months ~~\nNo. 12 ingredients: potato, oil, salt\n"
+        "keep in a cool dry place\n" * 3
+    ),
+}
+
+
+def legacy_check_compliance(raw_text: str) -> dict:
+    """Frozen copy of the field extraction in check_compliance before the rule engine."""
+    details = {}
+    product_match = re.search(r"(?i)(?:Product(?: Name)?|Item|Description)\s*[:\s]*\s*(.+?)(?:\n|MRP|NET|WT|WGT|Qty|Manufacturer|\Z)", raw_text, re.DOTALL)
+    if product_match:
+        details['product_name'] = re.sub(r'\s+', ' ', product_match.group(1).strip()).split('\n')[0]
+    else:
+        fallback_match = re.search(r"(?i)^[\s\W]*([A-Za-z][A-Za-z0-9 ,\-]{2,80})", raw_text, re.MULTILINE)
+        details['product_name'] = fallback_match.group(1).strip() if fallback_match else None
+    net_match = re.search(
+        r"(?i)(?:NET\s*WT|NET\s*WGT|NET\s*WEIGHT|NET\s*QTY|NET|Qty|Quantity|Weight)[^\n]*?(\d+[\s\.]*\d*\s*(?:g|kg|gm|ml|l|pcs|pack|packet|units|KG))",
+        raw_text
+    )
+    details['net_weight'] = net_match.group(1).strip() if net_match else None
+    mrp_match = re.search(r"(?i)(?:MRP|Maximum\s*Retail\s*Price|Price|Rs\.?)(?:[^0-9\n]*)([\d,]*\.?\d+)", raw_text)
+    details['mrp'] = mrp_match.group(1).strip().replace(',', '') if mrp_match else None
+    details['inclusive_of_all_taxes'] = bool(re.search(r"(?i)(?:inclusive\s*of\s*all\s*taxes|Incl\.?\s*All\s*Taxes)", raw_text))
+    mfg_match = re.search(
+        r"(?i)(?:Mfg|Mfd|Manufactured\s*on|Mfg\.?|MFG\s*Date)[\s:/-]*(\d{1,4}[/.-]\d{1,4}[/.-]?\d{0,4})",
+        raw_text
+    )
+    details['mfg_date'] = mfg_match.group(1).strip() if mfg_match else None
+    country_match = re.search(r"(?i)Country\s*of\s*Origin[:\s]*([A-Za-z\s,]+)(?:\n|Importer|Manufacturer|\Z)", raw_text)
+    details['country_of_origin'] = country_match.group(1).strip() if country_match else None
+    manu_match = re.search(
+        r"(?is)(?:Manufacturer|Manufactured\s*By|Packed\s*&\s*Marketed\s*by|Mfg\s*By|Importer|Marketer|Seller|Mfg:)\s*[:\s\-]*\s*(.+?)(?:For\s*Consumer\s*Complaints|\n{2,}|Phone:|Tel:|Email:|Customer|Net Qty|MRP|$)",
+        raw_text
+    )
+    if manu_match:
+        manu = manu_match.group(1).strip().replace("\n", " ")
+        manu = re.sub(r"\s{2,}", " ", manu)
+        details['manufacturer'] = manu.split('Address:')[0].strip()
+    else:
+        details['manufacturer'] = None
+    return details
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'sample':<16}{'legacy us':>12}{'rules us':>12}{'speedup':>10}  same output")
+    for name, text in SAMPLES.items():
+        same = legacy_check_compliance(text) == evaluate(text)
+        legacy = min(timeit.repeat(lambda: legacy_check_compliance(text), number=args.calls, repeat=3))
+        rules = min(timeit.repeat(lambda: evaluate(text), number=args.calls, repeat=3))
+        print(f"{name:<16}{1e6 * legacy / args.calls:>12.2f}{1e6 * rules / args.calls:>12.2f}"
+              f"{legacy / rules:>9.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_search.py - Records search: FTS5 index vs. LIKE '%...%' scans
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_search [--rows 200000] [--repeat 5] [--json out.json]
+#
+# Builds a migrated database of synthetic OCR records, then times each query both ways:
+# "like" scans product_name, manufacturer and raw_text with LIKE (the only option before
+# the index) for every match, "like50" stops at the newest 50 (unranked, so it is only
+# fast when the term is common), "fts" is search.search_records (ranked, highlighted,
+# top 50). Queries range from a word in every sixth record to one that matches a single record.
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import db
+from migrations import migrate
+from search import search_records
+
+from .corpus import synthetic_label_texts
+
+QUERIES = ["Sharma Oil", "chocolate", "Dehradun", "Royal Bakers biscuits", "needle{rare}"]
+
+
+def build(path: str, rows: int):
+    migrate(path)
+    texts = synthetic_label_texts(n=min(rows, 5000), seed=0)
+    batch = []
+    with db.transaction(path) as conn:
+        for i in range(rows):
+            raw_text, truth = texts[i % len(texts)]
+            batch.append((truth["product_name"], truth["manufacturer"], f"{raw_text}Batch {i}", f"2025-10-01T00:00:{i % 60:02d}"))
+            if len(batch) == 10000 or i == rows - 1:
+                conn.executemany("INSERT INTO records (product_name, manufacturer, raw_text, created_at) VALUES (?,?,?,?)", batch)
+                batch = []
+        rare = rows // 2
+        conn.execute("UPDATE records SET raw_text = raw_text || ' needle' || ? WHERE id = ?", (rare, rare))
+    return rare
+
+
+def like(path: str, query: str, limit: int = -1):
+    clauses, params = [], []
+    for word in query.split():
+        clauses.append("(product_name LIKE ? OR manufacturer LIKE ? OR raw_text LIKE ?)")
+        params += [f"%{word}%"] * 3
+    with db.connection(path) as conn:
+        return conn.execute(f"SELECT id FROM records WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+                            params + [limit]).fetchall()
+
+
+def timed(fn, repeat: int):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(1e3 * (time.perf_counter() - start))
+    return statistics.median(samples), len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.db")
+        start = time.perf_counter()
+        rare = build(path, args.rows)
+        print(f"Built {args.rows} records with FTS index in {time.perf_counter() - start:.1f} s\n")
+        for query in QUERIES:
+            query = query.format(rare=rare)
+            like_ms, like_hits = timed(lambda: like(path, query), args.repeat)
+            like50_ms, _ = timed(lambda: like(path, query, 50), args.repeat)
+            fts_ms, fts_hits = timed(lambda: search_records(path, query), args.repeat)
+            results[query] = {"like_ms": round(like_ms, 2), "like50_ms": round(like50_ms, 2), "fts_ms": round(fts_ms, 2),
+                              "matches": like_hits, "fts_hits": fts_hits}
+        db.get_pool(path).close()
+
+    print(f"{'query':<24}{'matches':>9}{'like ms':>10}{'like50 ms':>11}{'fts ms':>10}{'vs like':>9}")
+    for query, row in results.items():
+        print(f"{query:<24}{row['matches']:>9}{row['like_ms']:>10}{row['like50_ms']:>11}{row['fts_ms']:>10}"
+              f"{row['like_ms'] / max(row['fts_ms'], 1e-3):>8.1f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# benchmarks/corpus.py - Shared benchmark corpora (label photos, label texts with ground truth)
+
+import glob
+import io
+import os
+import random
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+
+SAMPLE_PRODUCTS = [
+    ("Spicy Masala Chips", "250.00", "200g", "Delicious Foods Pvt Ltd, Noida", "09/2025", "India"),
+    ("Herbal Bath Soap", "45.00", "125g", "Green Leaf Cosmetics, Pune", "03/2025", "India"),
+    ("Cold Pressed Mustard Oil", "310.00", "1 L", "Sharma Oil Mills, Jaipur", "11/2024", "India"),
+    ("Butter Cookies Biscuits", "120.00", "400g", "Royal Bakers Ltd, Chennai", "01/2025", "Denmark"),
+]
+
+
+def load_images(directory: str) -> list:
+    """Loads every jpg/jpeg/png under `directory` as (name, PIL.Image)."""
+    paths = []
+    for ext in ("jpg", "jpeg", "png"):
+        paths += glob.glob(os.path.join(directory, "**", f"*.{ext}"), recursive=True)
+    return [(os.path.basename(p), Image.open(p)) for p in sorted(paths)]
+
+
+def synthetic_label_photos(n: int = 8, seed: int = 0, scale: float = 4.0) -> list:
+    """
+    Camera-like photos built from generate_label_image: upscaled, slightly rotated,
+    placed on a large textured background, blurred, noised and JPEG-compressed.
+    """
+    from dashbroad import generate_label_image
+
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    photos = []
+    for i in range(n):
+        name, mrp, qty, manu, mfg, country = SAMPLE_PRODUCTS[i % len(SAMPLE_PRODUCTS)]
+        label = Image.open(generate_label_image(name, mrp, qty, manu, mfg, country)).convert("RGB")
+        label = label.resize((int(label.width * scale), int(label.height * scale)), Image.BICUBIC)
+        label = label.rotate(rng.uniform(-4, 4), expand=True, fillcolor=(90, 70, 50))
+
+        bg_w, bg_h = int(label.width * 1.8), int(label.height * 1.8)
+        background = np_rng.integers(40, 140, size=(bg_h // 8, bg_w // 8, 3), dtype=np.uint8)
+        canvas = Image.fromarray(background).resize((bg_w, bg_h), Image.BILINEAR)
+        canvas.paste(label, (rng.randint(0, bg_w - label.width), rng.randint(0, bg_h - label.height)))
+        canvas = canvas.filter(ImageFilter.GaussianBlur(radius=1.2))
+
+        arr = np.asarray(canvas).astype(np.int16) + np_rng.normal(0, 8, size=(bg_h, bg_w, 3)).astype(np.int16)
+        buf = io.BytesIO()
+        Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8)).save(buf, format="JPEG", quality=85)
+        buf.seek(0)
+        photos.append((f"synthetic_{i:03d}.jpg", Image.open(buf)))
+    return photos
+
+
+# ---------- SYNTHETIC BARCODE PHOTOS ----------
+_EAN_L = ["0001101", "0011001", "0010011", "0111101", "0100011", "0110001", "0101111", "0111011", "0110111", "0001011"]
+_EAN_R = ["".join("1" if bit == "0" else "0" for bit in code) for code in _EAN_L]
+_EAN_G = [code[::-1] for code in _EAN_R]
+_EAN13_PARITY = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG", "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL"]
+
+
+def ean_modules(code: str) -> str:
+    """Bar pattern ('1' = dark module) of an EAN-13 or EAN-8 code (UPC-A: EAN-13 with a leading 0)."""
+    if len(code) == 8:
+        left = "".join(_EAN_L[int(d)] for d in code[:4])
+        right = "".join(_EAN_R[int(d)] for d in code[4:])
+    else:
+        parity = _EAN13_PARITY[int(code[0])]
+        left = "".join((_EAN_L if p == "L" else _EAN_G)[int(d)] for p, d in zip(parity, code[1:7]))
+        right = "".join(_EAN_R[int(d)] for d in code[7:])
+    return "101" + left + "01010" + right + "101"
+
+
+def random_gtin(rng, length: int) -> str:
+    from barcodes import gtin_check_digit
+
+    body = "".join(str(rng.randint(0, 9)) for _ in range(length - 1))
+    if length == 13:
+        body = "890" + body[3:]  # GS1 India prefix, like the products in the catalog
+    return body + str(gtin_check_digit(body))
+
+
+def synthetic_barcode_photos(n: int = 40, seed: int = 0, size=(3000, 2250)) -> list:
+    """
+    (name, PIL.Image, expected code) camera-like photos of EAN-13 / EAN-8 / UPC-A barcodes:
+    module width 1.5-8 px on a `size` textured canvas, slightly rotated, blurred, noised
+    and JPEG-compressed. About one in five is shot from afar (modules under 3 px).
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    photos = []
+    for i in range(n):
+        kind = rng.choices(["EAN13", "EAN8", "UPCA"], weights=[70, 15, 15])[0]
+        code = random_gtin(rng, {"EAN13": 13, "EAN8": 8, "UPCA": 12}[kind])
+        modules = ean_modules("0" + code if kind == "UPCA" else code)
+
+        module_px = rng.uniform(1.5, 3.0) if rng.random() < 0.2 else rng.uniform(3.0, 8.0)
+        quiet = 11
+        strip = np.array([[0 if bit == "1" else 255 for bit in "0" * quiet + modules + "0" * quiet]], dtype=np.uint8)
+        bar_w = int(strip.shape[1] * module_px)
+        barcode = Image.fromarray(strip).resize((bar_w, 1), Image.NEAREST).resize((bar_w, int(bar_w * 0.6)), Image.NEAREST)
+        barcode = barcode.convert("RGB").rotate(rng.uniform(-6, 6), expand=True, fillcolor=(255, 255, 255))
+        barcode = barcode.filter(ImageFilter.GaussianBlur(radius=rng.uniform(0.3, 1.0) * module_px / 3))
+
+        bg_w, bg_h = size
+        background = np_rng.integers(60, 200, size=(bg_h // 16, bg_w // 16, 3), dtype=np.uint8)
+        canvas = Image.fromarray(background).resize((bg_w, bg_h), Image.BILINEAR)
+        canvas.paste(barcode, (rng.randint(0, bg_w - barcode.width), rng.randint(0, bg_h - barcode.height)))
+
+        arr = np.asarray(canvas).astype(np.float32) + 6 * np_rng.standard_normal((bg_h, bg_w, 3), dtype=np.float32)
+        buf = io.BytesIO()
+        Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8)).save(buf, format="JPEG", quality=85)
+        buf.seek(0)
+        photos.append((f"{kind.lower()}_{i:03d}.jpg", Image.open(buf), code))
+    return photos
+
+
+# ---------- SYNTHETIC LABEL TEXTS ----------
+PRODUCT_NAMES = [
+    "Spicy Masala Chips", "Herbal Bath Soap", "Cold Pressed Mustard Oil", "Butter Cookies Biscuits",
+    "Instant Noodles Masala", "Basmati Rice Premium", "Green Tea Bags", "Dark Chocolate Bar",
+    "Mango Fruit Drink", "Roasted Peanuts Salted",
+]
+MANUFACTURERS = [
+    "Delicious Foods Pvt Ltd, Noida", "Green Leaf Cosmetics, Pune", "Sharma Oil Mills, Jaipur",
+    "Royal Bakers Ltd, Chennai", "Sunrise Agro Industries, Indore", "Himalaya Beverages, Dehradun",
+]
+COUNTRIES = ["India", "Denmark", "Thailand", "Sri Lanka", "United Arab Emirates", "Nepal"]
+UNITS = ["g", "kg", "ml", "L", "pcs"]
+
+CAPTIONS = {
+    "product_name": ["Product Name", "Product", "Item", "Description"],
+    "net_weight": ["NET WT", "Net Quantity", "Net Wt.", "Qty", "Net Weight"],
+    "mrp": ["MRP", "MRP Rs.", "Maximum Retail Price", "Price"],
+    "mfg_date": ["Mfg Date", "Mfd", "MFG", "Manufactured on", "Mfg. Date"],
+    "country_of_origin": ["Country of Origin"],
+    "manufacturer": ["Manufactured By", "Mfg By", "Packed & Marketed by", "Manufacturer", "Marketer"],
+}
+SEPARATORS = [": ", " : ", " - ", " ", ":"]
+TAX_NOTES = ["(Inclusive of all taxes)", "Incl. All Taxes", "inclusive of all taxes"]
+NOISE_LINES = [
+    "Best before 6 months from packaging", "Ingredients: potato, edible oil, salt, spices",
+    "Store in a cool and dry place", "Batch No. B1234", "FSSAI Lic. No. 10012345000123",
+    "For Consumer Complaints call 1800-000-000", "Email: care@example.com",
+]
+# Typical Tesseract confusions on packaging fonts
+OCR_CONFUSIONS = {"O": "0", "0": "O", "l": "1", "1": "l", "I": "l", "S": "5", "5": "S", "B": "8", "e": "c", ".": ","}
+
+
+def _confuse(text: str, rng, rate: float) -> str:
+    return "".join(OCR_CONFUSIONS[c] if c in OCR_CONFUSIONS and rng.random() < rate else c for c in text)
+
+
+def _field_values(rng) -> dict:
+    amount = rng.choice([50, 100, 125, 200, 250, 400, 500, 1, 2, 1.5])
+    unit = rng.choice(UNITS if amount >= 50 else ["kg", "L", "pcs"])
+    price = rng.choice([10, 20, 45, 99, 120, 250, 310, 1299]) + rng.choice([0, 0.5])
+    month, year = rng.randint(1, 12), rng.randint(2023, 2025)
+    return {
+        "product_name": rng.choice(PRODUCT_NAMES),
+        "net_weight": f"{amount:g}{rng.choice(['', ' '])}{unit}",
+        "mrp": f"{price:.2f}",
+        "mfg_date": rng.choice([f"{month:02d}/{year}", f"{rng.randint(1, 28):02d}-{month:02d}-{year}", f"{month:02d}.{year}"]),
+        "country_of_origin": rng.choice(COUNTRIES),
+        "manufacturer": rng.choice(MANUFACTURERS),
+    }
+
+
+def synthetic_label_texts(n: int = 2000, seed: int = 0, noise: float = 0.02, drop: float = 0.15) -> list:
+    """
+    OCR-style label texts as (raw_text, truth). Field order, captions and separators vary;
+    each field is left out with probability `drop` (truth None) and every character is
+    swapped for a typical OCR confusion with probability `noise` (truth stays clean).
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        values = _field_values(rng)
+        truth = {}
+        lines = []
+        for field, value in values.items():
+            if rng.random() < drop:
+                truth[field] = None
+                continue
+            truth[field] = value
+            shown = f"Rs. {value}" if field == "mrp" and rng.random() < 0.5 else value
+            lines.append(f"{rng.choice(CAPTIONS[field])}{rng.choice(SEPARATORS)}{shown}")
+        truth["inclusive_of_all_taxes"] = truth["mrp"] is not None and rng.random() < 0.8
+        if truth["inclusive_of_all_taxes"]:
+            lines.append(rng.choice(TAX_NOTES))
+        lines += rng.sample(NOISE_LINES, rng.randint(0, 3))
+        if rng.random() < 0.5:
+            rng.shuffle(lines)
+        corpus.append(("\n".join(_confuse(line, rng, noise) for line in lines) + "\n", truth))
+    return corpus
+
+
+def synthetic_barcode_records(n: int = 2000, seed: int = 0, drop: float = 0.2) -> list:
+    """
+    Product dicts as returned by fetch_from_api / fetch_from_local_db, as (details, truth).
+    API records never carry MRP or MFG date; local records drop fields to 'N/A'.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        values = _field_values(rng)
+        from_api = rng.random() < 0.6
+        truth = {field: (None if rng.random() < drop else value) for field, value in values.items()}
+        if from_api:
+            truth["mrp"] = truth["mfg_date"] = None
+        details = {
+            "Product Name": truth["product_name"] or "N/A",
+            "Brand": truth["manufacturer"].split(",")[0] if truth["manufacturer"] else "N/A",
+            "Quantity": truth["net_weight"] or "N/A",
+            "Manufacturer": truth["manufacturer"] or "N/A",
+            "Country": (f"en:{truth['country_of_origin'].lower()}" if from_api else truth["country_of_origin"]) if truth["country_of_origin"] else "N/A",
+            "MRP": "N/A (API)" if from_api else (truth["mrp"] or "N/A"),
+            "MFG Date": "N/A (API)" if from_api else (truth["mfg_date"] or "N/A"),
+        }
+        if truth["manufacturer"] is None:
+            truth["manufacturer"] = details["Brand"] if details["Brand"] != "N/A" else None
+        corpus.append((details, truth))
+    return corpus
+
+
+SCRIPT_NOISE = [
+    '<script>window.__data={"sellerId":"A1B2C3","rating":4.5,"reviews":1287};</script>',
+    '<div class="ad">Buy 2 get 1 free on 500g packs</div>',
+    '<script>var cfg={"images":[{"w":1500,"h":1500}],"zoom":true};</script>',
+    '<span class="delivery">FREE delivery by Tuesday</span>',
+]
+MANUFACTURER_LAYOUTS = [
+    "<div>Manufacturer: {m}<br></div>",
+    "<p>Marketed By: {m}</p>",
+    '<li><span class="a-text-bold">Manufactured By : </span><span>{m}</span></li>',
+]
+
+
+def synthetic_product_pages(n: int = 500, seed: int = 0, page_kb: int = 200) -> list:
+    """
+    (page_source, element_fields, truth) for the scraper's post-processing: a padded HTML page
+    with the quantity and manufacturer somewhere in it, plus the title/price/brand that
+    scrape_product would have read from page elements.
+    """
+    rng = random.Random(seed)
+    filler = '<div class="x">Customers also viewed similar products in this category</div>\n'
+    corpus = []
+    for _ in range(n):
+        values = _field_values(rng)
+        parts = [filler] * (page_kb * 1024 // len(filler))
+        truth = {"product_name": values["product_name"], "mrp": values["mrp"], "net_weight": None, "manufacturer": None}
+        for noise in rng.sample(SCRIPT_NOISE, rng.randint(0, len(SCRIPT_NOISE))):
+            parts.insert(rng.randrange(len(parts) // 2), noise)
+        if rng.random() > 0.2:
+            truth["net_weight"] = values["net_weight"]
+            parts.insert(rng.randrange(len(parts)), f"<li>Net Quantity: {values['net_weight']}</li>")
+        if rng.random() > 0.2:
+            truth["manufacturer"] = values["manufacturer"]
+            parts.insert(rng.randrange(len(parts)), rng.choice(MANUFACTURER_LAYOUTS).format(m=values["manufacturer"]))
+        brand = values["manufacturer"].split(",")[0]
+        if truth["manufacturer"] is None:
+            truth["manufacturer"] = brand
+        elements = {"Product name": values["product_name"], "MRP": values["mrp"], "Brand name (Proxy)": brand}
+        corpus.append(("".join(parts), elements, truth))
+    return corpus
+# ----------------------------------------
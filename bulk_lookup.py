@@ -0,0 +1,60 @@
+# bulk_lookup.py - Resolves lists of barcodes (shipment manifests) concurrently
+#
+# Lookups are network-bound, so they run on a thread pool rather than processes. Every
+# thread goes through the shared keep-alive session and per-host limit in off_cache.py,
+# so raising the worker count overlaps cache hits and local-catalog fallbacks with the
+# API requests without hammering the API.
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import IN_FLIGHT_PER_WORKER, bounded_map
+
+
+# ---------- CONFIG & CONSTANTS ----------
+RESOLVE_WORKERS = 16
+BULK_RETRIES = 3              # API retries per barcode on timeouts, throttling (429) and 5xx
+BULK_SOURCE_TYPE = "Barcode Bulk Lookup"
+BARCODE_DIGITS = (8, 14)      # EAN-8 ... GTIN-14
+# ----------------------------------------
+
+_FIELD = re.compile(r"[,;\t ]+")
+
+
+def iter_barcodes(lines, unique: bool = False):
+    """
+    The first 8-14 digit field of each line (plain lists, or CSV / TSV manifests with a
+    barcode column anywhere); header, comment and blank lines yield nothing.
+    """
+    seen = set()
+    low, high = BARCODE_DIGITS
+    for line in lines:
+        if line.lstrip().startswith("#"):
+            continue
+        for field in _FIELD.split(line.strip()):
+            field = field.strip("\"'")
+            if field.isdigit() and low <= len(field) <= high:
+                if not unique or field not in seen:
+                    seen.add(field)
+                    yield field
+                break
+
+
+def _resolve_one(resolve, barcode: str) -> tuple:
+    try:
+        return barcode, resolve(barcode)
+    except Exception as e:
+        return barcode, {"Error": f"Error: {e}", "Barcode": barcode}
+
+
+def resolve_barcodes(barcodes, resolve, workers: int = RESOLVE_WORKERS):
+    """
+    Runs `resolve(barcode)` (e.g. get_product_details) for every barcode on a thread pool
+    and yields (barcode, result) in completion order, so each result can be checked and
+    saved while the rest are still in flight. `barcodes` is consumed lazily; an exception
+    becomes an {"Error": ...} result.
+    """
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="barcode-lookup") as pool:
+        jobs = ((resolve, barcode) for barcode in barcodes)
+        yield from bounded_map(pool, _resolve_one, jobs, workers * IN_FLIGHT_PER_WORKER)
@@ -22,6 +22,10 @@ except ImportError as e:
         st.stop()
 
 import re
+from ocr_engine import get_engine
+from rules import evaluate, missing_fields, compliance_status
+from csv_mirror import get_mirror
+from dedupe import content_hash, text_fingerprint
 
 # Set Tesseract path based on environment
 if platform.system() == "Windows" and os.path.exists(r"C:\Program Files\Tesseract-OCR\tesseract.exe"):
@@ -39,12 +43,23 @@ else:
         st.warning(f"⚠️ Could not check tesseract availability: {e}")
 
 CSV_FILE = "camera_ocr_products.csv"
+CSV_COLUMNS = [
+    "product_name", "net_weight", "mrp",
+    "inclusive_of_all_taxes", "mfg_date",
+    "country_of_origin", "manufacturer", "compliance_status"
+]
+csv_mirror = get_mirror(CSV_FILE, CSV_COLUMNS)
 if not os.path.exists(CSV_FILE):
-    pd.DataFrame(columns=[
-        "product_name", "net_weight", "mrp",
-        "inclusive_of_all_taxes", "mfg_date",
-        "country_of_origin", "manufacturer", "compliance_status"
-    ]).to_csv(CSV_FILE, index=False)
+    csv_mirror.ensure_header()
+
+@st.cache_resource
+def saved_fingerprints(path: str) -> set:
+    """
+    Text fingerprints of the products in the CSV: read from the file once per process,
+    then kept up to date by the saves below (so a save does not re-read the whole file).
+    """
+    rows = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")
+    return {text_fingerprint(row) for row in rows} - {None}
 
 st.title("📸 Product Label OCR & Compliance Checker")
 
@@ -60,72 +75,39 @@ elif input_option == "📂 Upload Image":
 
 if picture:
     img = Image.open(picture)
-
-    # OCR text
-    raw_text = pytesseract.image_to_string(img)
-    st.text_area("🔎 Raw OCR Output", raw_text, height=200)
-
-    # --- Extract fields ---
-    details = {}
-
-    # Product Name
-    product_match = re.search(r"(?i)([A-Za-z0-9 ]+(?:Chips|Soap|Oil|Biscuits|Snack))", raw_text)
-    details['product_name'] = product_match.group(1).strip() if product_match else None
-
-    # Net Weight
-    net_match = re.search(r"(?i)NET\s*W[TE]{1,2}[:\s]*([\d\.]+\s?(?:g|kg|ml|l|pcs|packet|pack)?)", raw_text)
-    details['net_weight'] = net_match.group(1).strip() if net_match else None
-
-    # MRP
-    mrp_match = re.search(r"(?i)MRP\s*[:₹Rs]*\s*([\d\.]+)", raw_text)
-    details['mrp'] = mrp_match.group(1).strip() if mrp_match else None
-
-    # Inclusive of all taxes
-    details['inclusive_of_all_taxes'] = bool(re.search(r"(?i)inclusive\s*of\s*all\s*taxes", raw_text))
-
-    # Manufacture Date
-    mfg_match = re.search(r"(?i)(Mfd|Manufactured\s*on|Mfg)[\s:]*([\d]{1,2}[/-]\d{4}|\d{2}[/-]\d{2}[/-]\d{4})", raw_text)
-    details['mfg_date'] = mfg_match.group(2).strip() if mfg_match else None
-
-    # Country of Origin
-    country_match = re.search(r"(?i)Country\s*of\s*Origin[:\s]*([A-Za-z ]+)", raw_text)
-    details['country_of_origin'] = country_match.group(1).strip() if country_match else None
-
-    # Manufacturer
-    manu_match = re.search(
-        r"(?is)(Packed\s*&\s*Marketed\s*by|Manufactured\s*by|Packed\s*by)\s*[:\-]*\s*(.+?)(?:Customer|Phone|Email|$)",
-        raw_text
-    )
-    details['manufacturer'] = manu_match.group(2).strip().replace("\n", " ") if manu_match else None
-
-    # --- Compliance Check ---
-    missing_fields = []
-    if not details['product_name']: missing_fields.append("Product Name")
-    if not details['net_weight']: missing_fields.append("Net Quantity")
-    if not details['mrp']: missing_fields.append("MRP")
-    if not details['inclusive_of_all_taxes']: missing_fields.append("Inclusive of All Taxes")
-    if not details['mfg_date']: missing_fields.append("Manufacture Date")
-    if not details['country_of_origin']: missing_fields.append("Country of Origin")
-    if not details['manufacturer']: missing_fields.append("Manufacturer Details")
-
-    if missing_fields:
-        compliance_status = f"❌ NON-COMPLIANT: Missing {', '.join(missing_fields)}"
+    photo_hash = content_hash(img)
+    last_scan = st.session_state.get("last_scan")
+    repeat_photo = last_scan is not None and photo_hash == last_scan["image_hash"]
+
+    if repeat_photo:
+        # Same photo as the previous run (every widget interaction reruns the script): reuse its result.
+        # Only identical pixels count; a merely similar photo may be another product's label
+        raw_text, details = last_scan["raw_text"], last_scan["details"]
     else:
-        compliance_status = "✅ COMPLIANT"
+        # OCR text (pooled engine, default page segmentation like the old call)
+        raw_text = get_engine().image_to_string(img, psm=3)
 
-    details['compliance_status'] = compliance_status
+        # --- Extract fields & compliance check (shared rule set, see rules.py) ---
+        details = evaluate(raw_text)
+        details['compliance_status'] = compliance_status(missing_fields(details))
+        st.session_state["last_scan"] = {"image_hash": photo_hash, "raw_text": raw_text, "details": details}
+    st.text_area("🔎 Raw OCR Output", raw_text, height=200)
 
     # --- Display extracted info ---
     st.subheader("🟢 Extracted Details & Compliance")
     st.json(details)
 
-    # --- Save to CSV ---
-    df_existing = pd.read_csv(CSV_FILE)
-    df_existing = pd.concat([df_existing, pd.DataFrame([details])], ignore_index=True)
-    df_existing.to_csv(CSV_FILE, index=False)
-
-    st.success("✅ Details saved to camera_ocr_products.csv")
+    # --- Save to CSV (append-only), once per product ---
+    fingerprint = text_fingerprint(details)
+    saved = saved_fingerprints(CSV_FILE)
+    if repeat_photo or (fingerprint and fingerprint in saved):
+        st.info("ℹ️ This product is already in camera_ocr_products.csv; not saved again.")
+    else:
+        csv_mirror.append([details])
+        if fingerprint:
+            saved.add(fingerprint)
+        st.success("✅ Details saved to camera_ocr_products.csv")
 
     # --- Show stored data ---
     st.subheader("📂 Stored Records")
-    st.dataframe(df_existing)
+    st.dataframe(pd.read_csv(CSV_FILE))
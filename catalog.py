@@ -0,0 +1,218 @@
+# catalog.py - Local product catalog: barcode-keyed SQLite store fed from products.csv
+#
+# Lookups are primary-key reads on a WITHOUT ROWID table (microseconds, nothing held in
+# memory beyond SQLite's page cache). Source files are imported in chunks; their size and
+# mtime are remembered, so an unchanged file is skipped, a file that only grew is imported
+# from where the last import stopped, and a rewritten file is re-imported in full.
+
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from db import connection, transaction
+from migrations import migrate
+
+
+# ---------- CONFIG & CONSTANTS ----------
+CATALOG_DB = "product_catalog.db"
+CATALOG_FIELDS = ["product_name", "brand", "quantity", "manufacturer", "country", "mrp", "mfg_date"]
+IMPORT_CHUNK_ROWS = 10000     # Rows per write transaction while importing
+SYNC_CHECK_SECONDS = 2.0      # How often lookups stat the source file for changes
+CHECK_BYTES = 65536           # Bytes hashed at the start of the file and before the resume offset,
+                              # to tell an appended-to file from a rewritten one
+# ----------------------------------------
+
+
+# ---------- SCHEMA ----------
+def _products(c):
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS products (
+            barcode TEXT PRIMARY KEY,
+            {", ".join(f"{field} TEXT" for field in CATALOG_FIELDS)},
+            source TEXT,
+            generation INTEGER,
+            updated_at TEXT
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_products_source ON products(source, generation)")
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_sources (
+            source TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime REAL,
+            offset INTEGER,
+            prefix_hash TEXT,
+            header TEXT,
+            generation INTEGER,
+            rows INTEGER,
+            imported_at TEXT
+        )
+    ''')
+
+def _dump_imports(c):
+    # High-water marks of imported product dumps (see off_import.py), one per source and
+    # dump kind: rows last modified before modified_through are already in products
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS dump_imports (
+            source TEXT PRIMARY KEY,
+            modified_through INTEGER,
+            rows INTEGER,
+            files INTEGER,
+            imported_at TEXT
+        )
+    ''')
+
+CATALOG_MIGRATIONS = [
+    (1, "products and catalog_sources tables", _products),
+    (2, "dump_imports table", _dump_imports),
+]
+# ----------------------------------------
+
+
+def normalize_barcode(barcode) -> str:
+    """Digits only, without the leading zeros GTIN padding adds ('0012345678905' == '12345678905')."""
+    digits = "".join(ch for ch in str(barcode) if ch.isdigit())
+    return digits.lstrip("0") or digits
+
+
+def lookup(barcode, db_path: str = CATALOG_DB):
+    """Catalog fields of `barcode` as a dict, or None."""
+    key = normalize_barcode(barcode)
+    if not key:
+        return None
+    migrate(db_path, CATALOG_MIGRATIONS)
+    with connection(db_path) as conn:
+        row = conn.execute(f"SELECT {', '.join(CATALOG_FIELDS)} FROM products WHERE barcode = ?", (key,)).fetchone()
+    return dict(zip(CATALOG_FIELDS, row)) if row else None
+
+
+def upsert_products(conn, rows, source: str, generation: int, overwrite: bool = True):
+    """
+    Inserts or replaces (barcode, {field: value}) pairs; missing fields are stored as NULL.
+    With overwrite=False, rows of other sources are left alone (the hand-maintained
+    products.csv wins over bulk dumps).
+    """
+    now = datetime.utcnow().isoformat()
+    if overwrite:
+        conflict = ""
+    else:
+        conflict = (f" ON CONFLICT(barcode) DO UPDATE SET "
+                    f"{', '.join(f'{f} = excluded.{f}' for f in CATALOG_FIELDS + ['generation', 'updated_at'])} "
+                    f"WHERE products.source = excluded.source")
+    conn.executemany(
+        f"INSERT {'OR REPLACE ' if overwrite else ''}INTO products (barcode, {', '.join(CATALOG_FIELDS)}, source, generation, updated_at) "
+        f"VALUES ({', '.join('?' * (len(CATALOG_FIELDS) + 4))}){conflict}",
+        [(normalize_barcode(barcode), *(fields.get(f) or None for f in CATALOG_FIELDS), source, generation, now)
+         for barcode, fields in rows]
+    )
+
+
+# ---------- CSV IMPORT ----------
+def _csv_records(fh, offset: int):
+    """
+    (record_text, end_offset) for each complete CSV record from byte `offset` on. Quoted
+    fields may span lines; a trailing record without its newline (still being written) is left for next time.
+    """
+    fh.seek(offset)
+    pending, quotes = b"", 0
+    for line in fh:
+        if not line.endswith(b"\n"):
+            break
+        pending += line
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            offset += len(pending)
+            yield pending.decode("utf-8"), offset
+            pending, quotes = b"", 0
+
+def _prefix_hash(path: str, offset: int) -> str:
+    with open(path, "rb") as fh:
+        digest = hashlib.sha1(fh.read(min(offset, CHECK_BYTES)))
+        fh.seek(max(0, offset - CHECK_BYTES))
+        digest.update(fh.read(offset - fh.tell()))
+    return digest.hexdigest()
+
+
+def sync_csv(csv_path: str, db_path: str = CATALOG_DB, chunk_rows: int = IMPORT_CHUNK_ROWS) -> int:
+    """
+    Brings the catalog up to date with `csv_path` (a 'barcode' column plus any of
+    CATALOG_FIELDS). Returns the number of rows imported (0 if the file is unchanged).
+    """
+    migrate(db_path, CATALOG_MIGRATIONS)
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return 0
+    source = os.path.abspath(csv_path)
+    with connection(db_path) as conn:
+        known = conn.execute(
+            "SELECT size, mtime, offset, prefix_hash, header, generation FROM catalog_sources WHERE source = ?", (source,)
+        ).fetchone()
+    if known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+        return 0
+
+    imported = 0
+    with open(csv_path, "rb") as fh:
+        # Resume after the last imported record if the file only grew (or a previous import
+        # was interrupted); anything else is a rewrite and starts over in a new generation.
+        # A file no longer than the offset but with a new mtime was edited in place (the
+        # prefix hash does not cover the middle of the file), so it counts as rewritten.
+        resume = known is not None and 0 < known[2] < stat.st_size and _prefix_hash(csv_path, known[2]) == known[3]
+        offset, header = (known[2], json.loads(known[4])) if resume else (0, None)
+        generation = (known[5] if resume else (known[5] or 0) + 1) if known else 1
+
+        batch = []
+        for text, end in _csv_records(fh, offset):
+            values = next(csv.reader(io.StringIO(text)), [])
+            offset = end
+            if header is None:
+                header = [name.strip().lstrip("\ufeff").lower() for name in values]
+                if "barcode" not in header:
+                    raise ValueError(f"{csv_path} has no 'barcode' column")
+                continue
+            record = dict(zip(header, values))
+            if record.get("barcode"):
+                batch.append((record["barcode"], record))
+            if len(batch) >= chunk_rows:
+                imported += _commit_chunk(db_path, csv_path, batch, source, generation, offset, header)
+                batch = []
+        # Only the final commit records the file's size and mtime, marking it fully imported
+        imported += _commit_chunk(db_path, csv_path, batch, source, generation, offset, header, stat)
+
+    # Rows of earlier generations of this file that are no longer in it
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM products WHERE source = ? AND generation < ?", (source, generation))
+    return imported
+
+
+def _commit_chunk(db_path, csv_path, batch, source, generation, offset, header, stat=None) -> int:
+    # Rows and the resume offset are committed together, so an interrupted import resumes cleanly
+    prefix_hash = _prefix_hash(csv_path, offset)
+    with transaction(db_path) as conn:
+        upsert_products(conn, batch, source, generation)
+        conn.execute(
+            "INSERT OR REPLACE INTO catalog_sources (source, size, mtime, offset, prefix_hash, header, generation, rows, imported_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT rows FROM catalog_sources WHERE source = ? AND generation = ?), 0) + ?, ?)",
+            (source, stat.st_size if stat else None, stat.st_mtime if stat else None, offset, prefix_hash, json.dumps(header),
+             generation, source, generation, len(batch), datetime.utcnow().isoformat())
+        )
+    return len(batch)
+
+
+_LAST_CHECK = {}
+_SYNC_LOCK = threading.Lock()
+
+def ensure_synced(csv_path: str, db_path: str = CATALOG_DB) -> int:
+    """sync_csv at most once per SYNC_CHECK_SECONDS per file (cheap enough to call before every lookup)."""
+    now = time.monotonic()
+    with _SYNC_LOCK:
+        if now - _LAST_CHECK.get((csv_path, db_path), -SYNC_CHECK_SECONDS) < SYNC_CHECK_SECONDS:
+            return 0
+        _LAST_CHECK[(csv_path, db_path)] = now
+        return sync_csv(csv_path, db_path)
+# ----------------------------------------
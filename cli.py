@@ -0,0 +1,186 @@
+# cli.py - Headless compliance runs over directories of label images, barcode lists or URL lists
+#
+# Examples (from the repo root):
+#   python cli.py images ./labels --workers 8 > results.jsonl
+#   python cli.py barcodes manifest.csv --format csv --output results.csv --user officer
+#   python cli.py urls urls.txt --no-save
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import BATCH_WORKERS, IMAGE_EXTENSIONS, IN_FLIGHT_PER_WORKER, bounded_map, iter_label_files, run_batch
+from bulk_lookup import BULK_RETRIES, RESOLVE_WORKERS, iter_barcodes, resolve_barcodes
+
+
+OUTPUT_FIELDS = [
+    "input", "status", "source_type", "product_name", "net_weight", "mrp", "inclusive_of_all_taxes",
+    "mfg_date", "country_of_origin", "manufacturer", "compliance_status", "created_at", "record_id",
+]
+
+
+# ---------- INPUTS ----------
+def iter_image_paths(root: str):
+    """Walks `root` lazily, yielding image and ZIP paths in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS + (".zip",)):
+                yield os.path.join(dirpath, name)
+
+def iter_lines(path: str):
+    """Non-empty, non-comment lines of a text file ('-' for stdin)."""
+    fh = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in fh:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+# ----------------------------------------
+
+
+# ---------- PER-ITEM CHECKS (thread pool) ----------
+def check_barcode(barcode: str) -> dict:
+    from dashbroad import barcode_compliance_details, get_product_details
+
+    try:
+        details = get_product_details(barcode, retries=BULK_RETRIES)
+        if "Error" in details:
+            return {"name": barcode, "status": details["Error"], "details": None}
+        return {"name": barcode, "status": "OK", "details": barcode_compliance_details(details, "Barcode CLI")}
+    except Exception as e:
+        return {"name": barcode, "status": f"Error: {e}", "details": None}
+
+def check_url(url: str) -> dict:
+    from dashbroad import check_compliance, scrape_product
+
+    try:
+        raw_text, _ = scrape_product(url)
+        details = check_compliance(raw_text)
+        details['source_type'] = "Product URL (Selenium)"
+        return {"name": url, "status": "OK", "details": details}
+    except Exception as e:
+        return {"name": url, "status": f"Error: {e}", "details": None}
+# ----------------------------------------
+
+
+# ---------- OUTPUT ----------
+class ResultWriter:
+    """Writes one row per finished item and flushes immediately, so output streams."""
+
+    def __init__(self, fh, fmt: str, include_raw: bool):
+        self.fh = fh
+        self.fmt = fmt
+        self.include_raw = include_raw
+        self.fields = OUTPUT_FIELDS + (["raw_text"] if include_raw else [])
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(fh, fieldnames=self.fields, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, result: dict, record_id=None):
+        row = {"input": result["name"], "status": result["status"], "record_id": record_id}
+        row.update(result["details"] or {})
+        if not self.include_raw:
+            row.pop("raw_text", None)
+        if self.csv:
+            self.csv.writerow(row)
+        else:
+            self.fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.fh.flush()
+# ----------------------------------------
+
+
+def run(args) -> int:
+    import dashbroad
+
+    user = None
+    if args.write_behind:
+        dashbroad.WRITE_BEHIND = True
+    if not args.no_save:
+        dashbroad.init_storage()
+        if args.user:
+            user = dashbroad.get_user_from_db(args.user)
+            if user is None:
+                print(f"Unknown user '{args.user}'", file=sys.stderr)
+                return 2
+            user = {k: user[k] for k in ('id', 'username', 'role', 'fullname')}
+
+    pool = None
+    if args.mode == "images":
+        results = run_batch(iter_label_files(iter_image_paths(args.source)), workers=args.workers or BATCH_WORKERS)
+    elif args.mode == "barcodes":
+        # Network-bound: many more threads than cores, over one keep-alive session (see bulk_lookup.py)
+        lookups = resolve_barcodes(iter_barcodes(iter_lines(args.source)), check_barcode, workers=args.workers or RESOLVE_WORKERS)
+        results = (result for _, result in lookups)
+    else:
+        workers = args.workers or BATCH_WORKERS
+        pool = ThreadPoolExecutor(max_workers=workers)
+        jobs = ((line,) for line in iter_lines(args.source))
+        results = bounded_map(pool, check_url, jobs, workers * IN_FLIGHT_PER_WORKER)
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = ResultWriter(out, args.format, args.include_raw)
+    total = failed = 0
+    pending = deque()  # (result, Future of its record id), written in input order once saved
+
+    def write_saved(block: bool):
+        while pending and (block or pending[0][1] is None or pending[0][1].done()):
+            result, future = pending.popleft()
+            writer.write(result, future.result() if future else None)
+
+    try:
+        for result in results:
+            future = None
+            if result["details"] and not args.no_save:
+                # Queued for group commit with dashbroad.WRITE_BEHIND, saved right away otherwise
+                future = dashbroad.queue_records([result["details"]], user)[0]
+            pending.append((result, future))
+            write_saved(block=False)
+            total += 1
+            failed += result["details"] is None
+        write_saved(block=True)
+    finally:
+        if pool:
+            pool.shutdown(wait=True)
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Processed {total} inputs, {failed} failed.", file=sys.stderr)
+    if args.mode == "barcodes":
+        stats = dashbroad.get_off_cache(dashbroad.OFF_CACHE_DB, dashbroad.OFF_BASE_URL).summary()
+        print(f"OpenFoodFacts: {stats['fetches']} API requests, {stats['fetch_errors']} failed after retries, "
+              f"cache hit rate {stats['hit_rate']:.0%}.", file=sys.stderr)
+    if dashbroad.WRITE_BEHIND and not args.no_save:
+        stats = dashbroad.record_writer().summary()
+        print(f"Write-behind: {stats['committed']} records in {stats['groups']} commits, "
+              f"commit p95 {stats['commit_p95_ms']} ms, peak queue depth {stats['max_depth']}.", file=sys.stderr)
+    return 1 if failed and failed == total else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run product label compliance checks without the Streamlit UI.")
+    parser.add_argument("mode", choices=["images", "barcodes", "urls"],
+                        help="images: directory of label photos/ZIPs; barcodes: list or CSV manifest (first 8-14 digit field "
+                             "of each line); urls: text file with one per line ('-' for stdin)")
+    parser.add_argument("source")
+    parser.add_argument("--workers", type=int, help=f"Parallel workers (default: CPU count; {RESOLVE_WORKERS} for barcodes)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--output", help="Write results here instead of stdout")
+    parser.add_argument("--include-raw", action="store_true", help="Include the raw OCR/scraped text in the output")
+    parser.add_argument("--no-save", action="store_true", help="Do not write results to the records table")
+    parser.add_argument("--user", help="Attribute saved records to this username")
+    parser.add_argument("--write-behind", action="store_true", help="Commit saved records in background groups instead of one by one")
+    args = parser.parse_args(argv)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# csv_mirror.py - Append-only, file-locked CSV mirror of saved records
+
+import atexit
+import csv
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# ---------- CONFIG & CONSTANTS ----------
+FSYNC_EVERY_ROWS = 100       # fsync after this many unsynced rows...
+FSYNC_INTERVAL_SECONDS = 2.0  # ...or once the last fsync is older than this (by a timer if nothing more is appended)
+# ----------------------------------------
+
+
+class _FileLock:
+    """Exclusive advisory lock on a sidecar '<path>.lock' file, shared by every process and session."""
+
+    def __init__(self, path: str):
+        self.path = path + ".lock"
+        self._fh = None
+
+    def __enter__(self):
+        self._fh = open(self.path, "a+")
+        if fcntl:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        else:
+            self._fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10s of contention; keep waiting
+                    continue
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            else:
+                self._fh.seek(0)
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._fh.close()
+            self._fh = None
+
+
+class CSVMirror:
+    """
+    Appends rows to a CSV file without re-reading it: constant cost per row however
+    large the file grows. The header is written only when the file is new or empty;
+    an existing file keeps its own header (extra keys in a row are dropped, missing
+    ones left blank). Writes are flushed to the OS immediately and fsync'ed in batches.
+    """
+
+    def __init__(self, path: str, columns: list, fsync_every: int = FSYNC_EVERY_ROWS,
+                 fsync_interval: float = FSYNC_INTERVAL_SECONDS):
+        self.path = path
+        self.columns = list(columns)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = _FileLock(path)
+        self._thread_lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._timer = None
+
+    def _header(self, fh) -> list:
+        fh.seek(0)
+        first = fh.readline()
+        return next(csv.reader([first])) if first.strip() else None
+
+    def ensure_header(self):
+        """Creates the file with its header row if it does not exist yet."""
+        self.append([])
+
+    def append(self, rows: list):
+        with self._thread_lock, self._lock, open(self.path, "a+", newline="", encoding="utf-8") as fh:
+            fieldnames = self._header(fh)
+            fh.seek(0, os.SEEK_END)
+            writer = csv.DictWriter(fh, fieldnames=fieldnames or self.columns, extrasaction="ignore")
+            if fieldnames is None:
+                writer.writeheader()
+            writer.writerows(rows)
+            fh.flush()
+            self._unsynced += len(rows)
+            if self._unsynced and (self._unsynced >= self.fsync_every
+                                   or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._fsync(fh)
+            if self._unsynced:
+                self._schedule_sync()
+
+    def _fsync(self, fh):
+        os.fsync(fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _schedule_sync(self):
+        # The last rows of a burst must not wait for the next append to reach the disk
+        if self._timer is None:
+            delay = max(0.0, self.fsync_interval - (time.monotonic() - self._last_sync))
+            self._timer = threading.Timer(delay, self.sync)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def sync(self):
+        """fsyncs rows appended since the last batch (by the interval timer, and at exit)."""
+        with self._thread_lock:
+            self._timer = None
+            if self._unsynced and os.path.exists(self.path):
+                with open(self.path, "a") as fh:
+                    self._fsync(fh)
+
+
+_MIRRORS = {}
+_MIRRORS_LOCK = threading.Lock()
+
+def get_mirror(path: str, columns: list) -> CSVMirror:
+    """One mirror per file per process (survives Streamlit reruns), synced at exit."""
+    with _MIRRORS_LOCK:
+        key = os.path.abspath(path)
+        if key not in _MIRRORS:
+            _MIRRORS[key] = CSVMirror(path, columns)
+            atexit.register(_MIRRORS[key].sync)
+        return _MIRRORS[key]
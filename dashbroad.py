@@ -2,20 +2,40 @@
 
 import streamlit as st
 import pandas as pd
-import sqlite3
 from PIL import Image, ImageDraw, ImageFont
 import pytesseract
 import re
 import os
-import requests 
 from bs4 import BeautifulSoup 
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
 import io
 import base64
+import tempfile
 import time 
-from pyzbar.pyzbar import decode
+from concurrent.futures import Future
 import numpy as np
+from ocr_engine import get_engine, OCR_LANG, OCR_PSM
+from ocr_cache import get_cache as get_ocr_cache
+from off_cache import get_cache as get_off_cache
+from preprocess import preprocess_image, pipeline_version
+from text_regions import ocr_by_regions
+from multipass import coarse_to_fine_ocr, TIME_BUDGET_SECONDS
+from rules import evaluate, missing_fields, compliance_status, RULESET_VERSION, SCRAPE_QUANTITY, SCRAPE_MANUFACTURER
+from recheck import count_stale, recheck_records
+from csv_mirror import get_mirror
+import catalog
+import db
+import dedupe
+from migrations import migrate
+from quantities import UNIT_CLASSES, numeric_fields, range_filter
+from exports import EXPORT_COLUMNS, DEFAULT_EXPORT_COLUMNS, EXPORT_FORMATS, export_records
+from write_behind import get_writer
+from search import HIGHLIGHT, search_records, count_matches
+from queries import PAGE_SIZES, build_filter, combine, fetch_page, count_rows, distinct_values, invalidate_counts
+from batch import iter_label_files, run_batch, BATCH_WORKERS
+from barcodes import decode_retail, valid_check_digit
+from bulk_lookup import BULK_RETRIES, BULK_SOURCE_TYPE, RESOLVE_WORKERS, iter_barcodes, resolve_barcodes
 
 # Attempt to import Selenium components with error handling
 try:
@@ -38,8 +58,29 @@ except Exception:
 
 DB_PATH = "product_compliance.db"
 CSV_FILE = "product_compliance_records.csv"
+CSV_MIRROR = False # Also append every saved record to CSV_FILE (legacy; the Export tab reads the DB directly)
+DEDUPE_SCANS = True # Link repeat scans of the same label (same photo or same extracted fields) to the existing record
+WRITE_BEHIND = False # Queue saved records for a background thread that commits them in groups (see write_behind.py)
+CSV_COLUMNS = [
+    "id", "user_id", "username", "source_type", "product_name", "net_weight", "mrp",
+    "inclusive_of_all_taxes", "mfg_date", "country_of_origin", "manufacturer", "compliance_status", "created_at"
+]
 PRODUCTS_CSV = "products.csv" # Placeholder for local barcode lookup
+CATALOG_DB = "product_catalog.db" # Barcode-indexed copy of PRODUCTS_CSV, refreshed when the file changes (see catalog.py)
+OFF_BASE_URL = "https://world.openfoodfacts.org" # OpenFoodFacts API (or a mirror / local stub server)
+OFF_CACHE_DB = "off_cache.db" # Cached API answers, "not found" included (TTLs in off_cache.py)
+LOCAL_CATALOG_FIRST = False # Look barcodes up in CATALOG_DB before the API (offline lookups once a dump is imported with off_import.py)
+OCR_PREPROCESS = {} # Overrides for preprocess.DEFAULT_PIPELINE (tune with benchmarks/bench_preprocess.py)
+# "full": whole photo in one pass | "regions": only detected text blocks, in parallel
+# "multipass": cheap low-res pass, then re-read only around the keywords of missing fields
+# (raw_text then joins the passes' text; opt in once its output matches "full" on your labels)
+OCR_MODE = "full"
+OCR_TIME_BUDGET = TIME_BUDGET_SECONDS # Per-image limit for the multipass mode
 DISPLAY_COLUMNS = "id, user_id, username, source_type, product_name, net_weight, mrp, inclusive_of_all_taxes, mfg_date, country_of_origin, manufacturer, compliance_status, created_at"
+NUMERIC_DISPLAY_COLUMNS = "mrp_value, net_quantity_value, net_quantity_unit"
+COMPLAINT_COLUMNS = "id, username, product_name, mrp, net_quantity, purchased_platform, date_of_order, date_of_delivery, issue_description, status, filed_at"
+STATUS_PREFIXES = {"Compliant": "✅", "Non-compliant": "❌"} # compliance_status starts with the icon
+_STORAGE_READY = set() # DB paths already initialised by this process
 
 # Streamlit-specific CSS for a cleaner look
 ST_CSS = """
@@ -66,128 +107,133 @@ def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
 def init_storage():
-    """Initializes SQLite database tables and seeds demo users."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    # Users Table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            password_hash TEXT,
-            role TEXT,
-            fullname TEXT
-        )
-    ''')
-    # Records Table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            username TEXT,
-            source_type TEXT,
-            raw_text TEXT,
-            product_name TEXT,
-            net_weight TEXT,
-            mrp TEXT,
-            inclusive_of_all_taxes INTEGER,
-            mfg_date TEXT,
-            country_of_origin TEXT,
-            manufacturer TEXT,
-            compliance_status TEXT,
-            created_at TEXT
-        )
-    ''')
-    # --- COMPLAINTS TABLE (FIXED SCHEMA) ---
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS complaints (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            username TEXT,
-            product_name TEXT,
-            mrp TEXT,
-            net_quantity TEXT,
-            purchased_platform TEXT,
-            date_of_order TEXT,
-            date_of_delivery TEXT,
-            issue_description TEXT,
-            status TEXT,
-            filed_at TEXT
-        )
-    ''')
-    # ------------------------------------------
-    conn.commit()
+    """Brings the database schema up to date (see migrations.py) and seeds demo users, once per process."""
+    if DB_PATH in _STORAGE_READY:
+        return
+    migrate(DB_PATH)
 
     # Seed users if not present
-    c.execute("SELECT COUNT(*) FROM users")
-    if c.fetchone()[0] == 0:
-        users = [
-            ("officer", hash_password("officerpass"), "OFFICER", "Compliance Officer"),
-            ("user", hash_password("userpass"), "USER", "Consumer User"),
-        ]
-        c.executemany("INSERT INTO users (username, password_hash, role, fullname) VALUES (?,?,?,?)", users)
-        conn.commit()
-    conn.close()
+    with db.transaction(DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM users")
+        if c.fetchone()[0] == 0:
+            users = [
+                ("officer", hash_password("officerpass"), "OFFICER", "Compliance Officer"),
+                ("user", hash_password("userpass"), "USER", "Consumer User"),
+            ]
+            c.executemany("INSERT INTO users (username, password_hash, role, fullname) VALUES (?,?,?,?)", users)
 
     # CSV init (keeps compatibility)
-    if not os.path.exists(CSV_FILE):
-        pd.DataFrame(columns=[
-            "id", "user_id", "username", "source_type", "product_name", "net_weight", "mrp",
-            "inclusive_of_all_taxes", "mfg_date", "country_of_origin", "manufacturer", "compliance_status", "created_at"
-        ]).to_csv(CSV_FILE, index=False)
+    if CSV_MIRROR and not os.path.exists(CSV_FILE):
+        get_mirror(CSV_FILE, CSV_COLUMNS).ensure_header()
+    _STORAGE_READY.add(DB_PATH)
 
 def save_record(details: dict, user):
-    """Saves a compliance record to both DB and CSV."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO records (
-            user_id, username, source_type, raw_text, product_name, net_weight, mrp,
-            inclusive_of_all_taxes, mfg_date, country_of_origin, manufacturer, compliance_status, created_at
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-    ''', (
-        user.get('id') if user else None,
-        user.get('username') if user else None,
-        details.get('source_type'),
-        details.get('raw_text'),
-        details.get('product_name'),
-        details.get('net_weight'),
-        details.get('mrp'),
-        1 if details.get('inclusive_of_all_taxes') else 0,
-        details.get('mfg_date'),
-        details.get('country_of_origin'),
-        details.get('manufacturer'),
-        details.get('compliance_status'),
-        details.get('created_at'),
-    ))
-    conn.commit()
-    last_id = c.lastrowid
-    conn.close()
-    
-    row = {
-        "id": last_id,
-        "user_id": user.get('id') if user else None,
-        "username": user.get('username') if user else None,
-        "source_type": details.get('source_type'),
-        "product_name": details.get('product_name'),
-        "net_weight": details.get('net_weight'),
-        "mrp": details.get('mrp'),
-        "inclusive_of_all_taxes": 1 if details.get('inclusive_of_all_taxes') else 0,
-        "mfg_date": details.get('mfg_date'),
-        "country_of_origin": details.get('country_of_origin'),
-        "manufacturer": details.get('manufacturer'),
-        "compliance_status": details.get('compliance_status'),
-        "created_at": details.get('created_at'),
-    }
+    """Saves a compliance record to the DB (and the CSV mirror if enabled)."""
+    return save_records([details], user)[0]
+
+def save_records(details_list: list, user):
+    """
+    Saves several compliance records and returns their ids once committed: directly in one
+    transaction, or with WRITE_BEHIND through the background writer's group commits.
+    """
+    if WRITE_BEHIND:
+        return [future.result() for future in queue_records(details_list, user)]
+    return commit_records([(details, user) for details in details_list])
+
+def save_checked(details: dict, user):
+    """
+    save_record for the interactive pages: returns only once the record is committed (so a
+    "saved" message is true), or shows the error and returns None.
+    """
     try:
-        df_existing = pd.read_csv(CSV_FILE)
-    except FileNotFoundError:
-        df_existing = pd.DataFrame(columns=row.keys())
+        return save_record(details, user)
+    except Exception as e:
+        st.error(f"Could not save the compliance record: {e}")
+        return None
 
-    df_existing = pd.concat([df_existing, pd.DataFrame([row])], ignore_index=True)
-    df_existing.to_csv(CSV_FILE, index=False)
-    
-    return last_id
+def queue_records(details_list: list, user) -> list:
+    """
+    Futures of the saved records' ids. With WRITE_BEHIND this returns as soon as the records
+    are queued (blocking only while the queue is full); otherwise they are saved right away.
+    """
+    entries = [(details, user) for details in details_list]
+    if WRITE_BEHIND:
+        return record_writer().submit(entries)
+    futures = [Future() for _ in entries]
+    for future, record_id in zip(futures, commit_records(entries)):
+        future.set_result(record_id)
+    return futures
+
+def record_writer():
+    return get_writer(DB_PATH, commit_records)
+
+def commit_records(entries: list) -> list:
+    """
+    Inserts (details, user) pairs in one transaction, then appends them to the CSV mirror if
+    enabled. With DEDUPE_SCANS a repeat of one of the user's records is linked to it instead
+    of inserted, and its details get 'duplicate_of'. Returns the ids (the existing record's
+    id for repeats).
+    """
+    rows, ids = [], []
+    with db.transaction(DB_PATH) as conn:
+        c = conn.cursor()
+        for details, user in entries:
+            user_id = user.get('id') if user else None
+            duplicate_of = dedupe.find_duplicate(c, user_id, details) if DEDUPE_SCANS else None
+            if duplicate_of is not None:
+                dedupe.add_fingerprint(c, duplicate_of, details)
+                details['duplicate_of'] = duplicate_of
+                ids.append(duplicate_of)
+                continue
+            c.execute('''
+                INSERT INTO records (
+                    user_id, username, source_type, raw_text, product_name, net_weight, mrp,
+                    inclusive_of_all_taxes, mfg_date, country_of_origin, manufacturer, compliance_status, created_at,
+                    rule_version, net_quantity_value, net_quantity_unit, mrp_value
+                ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            ''', (
+                user_id,
+                user.get('username') if user else None,
+                details.get('source_type'),
+                details.get('raw_text'),
+                details.get('product_name'),
+                details.get('net_weight'),
+                details.get('mrp'),
+                1 if details.get('inclusive_of_all_taxes') else 0,
+                details.get('mfg_date'),
+                details.get('country_of_origin'),
+                details.get('manufacturer'),
+                details.get('compliance_status'),
+                details.get('created_at'),
+                details.get('rule_version'),
+                *numeric_fields(details).values(),
+            ))
+            record_id = c.lastrowid
+            rows.append({
+                "id": record_id,
+                "user_id": user_id,
+                "username": user.get('username') if user else None,
+                "source_type": details.get('source_type'),
+                "product_name": details.get('product_name'),
+                "net_weight": details.get('net_weight'),
+                "mrp": details.get('mrp'),
+                "inclusive_of_all_taxes": 1 if details.get('inclusive_of_all_taxes') else 0,
+                "mfg_date": details.get('mfg_date'),
+                "country_of_origin": details.get('country_of_origin'),
+                "manufacturer": details.get('manufacturer'),
+                "compliance_status": details.get('compliance_status'),
+                "created_at": details.get('created_at'),
+            })
+            dedupe.add_fingerprint(c, record_id, details)
+            ids.append(record_id)
+
+    if not rows:
+        return ids
+    invalidate_counts(DB_PATH, "records")
+    if CSV_MIRROR:
+        get_mirror(CSV_FILE, CSV_COLUMNS).append(rows)
+    return ids
 
 def generate_label_image(product_name, mrp, net_weight, manufacturer, date_of_manufacture, country_of_origin):
     """Generates a professional-looking PNG label."""
@@ -243,9 +289,19 @@ def generate_label_image(product_name, mrp, net_weight, manufacturer, date_of_ma
 
 # ---------- CORE LOGIC (OCR & COMPLIANCE) ----------
 def ocr_image_to_text(img: Image.Image) -> str:
-    """Extracts text from an image using Tesseract."""
+    """Preprocesses and OCRs an image with the pooled Tesseract engine (--psm 6), served from the OCR cache when possible."""
     try:
-        text = pytesseract.image_to_string(img, config='--psm 6') 
+        engine = get_engine()
+        if OCR_MODE == "multipass":
+            compute = lambda im: coarse_to_fine_ocr(im, engine, check_compliance, OCR_PREPROCESS, OCR_TIME_BUDGET)['raw_text']
+            version = pipeline_version(OCR_PREPROCESS) + f"-mp{OCR_TIME_BUDGET:g}"
+        elif OCR_MODE == "regions":
+            compute = lambda im: ocr_by_regions(im, engine, OCR_PREPROCESS)
+            version = pipeline_version(OCR_PREPROCESS) + "-roi"
+        else:
+            compute = lambda im: engine.image_to_string(preprocess_image(im, OCR_PREPROCESS))
+            version = pipeline_version(OCR_PREPROCESS)
+        text = get_ocr_cache().get_or_compute(img, compute, OCR_LANG, OCR_PSM, version)
         return text
     except Exception as e:
         st.error(f"Tesseract OCR failed. Check installation/path. Error: {e}")
@@ -253,69 +309,27 @@ def ocr_image_to_text(img: Image.Image) -> str:
 
 def check_compliance(raw_text: str) -> dict:
     """
-    Parses raw text to extract product details and checks for mandatory label compliance.
+    Parses raw text with the current rule set (see rules.py) and checks for mandatory label compliance.
     """
     details = {}
     details['raw_text'] = raw_text
+    details.update(evaluate(raw_text))
 
-    # Product Name
-    product_match = re.search(r"(?i)(?:Product(?: Name)?|Item|Description)\s*[:\s]*\s*(.+?)(?:\n|MRP|NET|WT|WGT|Qty|Manufacturer|\Z)", raw_text, re.DOTALL)
-    if product_match:
-        details['product_name'] = re.sub(r'\s+', ' ', product_match.group(1).strip()).split('\n')[0]
-    else:
-        fallback_match = re.search(r"(?i)^[\s\W]*([A-Za-z][A-Za-z0-9 ,\-]{2,80})", raw_text, re.MULTILINE)
-        details['product_name'] = fallback_match.group(1).strip() if fallback_match else None
-
-    # Net Quantity / Weight (FIXED: Improved regex for quantity/weight capture)
-    net_match = re.search(
-        r"(?i)(?:NET\s*WT|NET\s*WGT|NET\s*WEIGHT|NET\s*QTY|NET|Qty|Quantity|Weight)[^\n]*?(\d+[\s\.]*\d*\s*(?:g|kg|gm|ml|l|pcs|pack|packet|units|KG))", 
-        raw_text
-    )
-    details['net_weight'] = net_match.group(1).strip() if net_match else None
-
-    # MRP (FIXED: Improved to robustly capture price number regardless of currency symbol or intermediate text)
-    mrp_match = re.search(r"(?i)(?:MRP|Maximum\s*Retail\s*Price|Price|Rs\.?)(?:[^0-9\n]*)([\d,]*\.?\d+)", raw_text) 
-    details['mrp'] = mrp_match.group(1).strip().replace(',', '') if mrp_match else None
-
-    # Inclusive of all taxes (FIXED: Added abbreviation 'Incl.' to capture generated labels)
-    details['inclusive_of_all_taxes'] = bool(re.search(r"(?i)(?:inclusive\s*of\s*all\s*taxes|Incl\.?\s*All\s*Taxes)", raw_text))
-
-    # Manufacture Date
-    mfg_match = re.search(
-        r"(?i)(?:Mfg|Mfd|Manufactured\s*on|Mfg\.?|MFG\s*Date)[\s:/-]*(\d{1,4}[/.-]\d{1,4}[/.-]?\d{0,4})", 
-        raw_text
-    )
-    details['mfg_date'] = mfg_match.group(1).strip() if mfg_match else None
-
-    # Country of Origin
-    country_match = re.search(r"(?i)Country\s*of\s*Origin[:\s]*([A-Za-z\s,]+)(?:\n|Importer|Manufacturer|\Z)", raw_text)
-    details['country_of_origin'] = country_match.group(1).strip() if country_match else None
-
-    # Manufacturer/Packer/Importer Details (FIXED: Added standalone 'Manufacturer' keyword)
-    manu_match = re.search(
-        r"(?is)(?:Manufacturer|Manufactured\s*By|Packed\s*&\s*Marketed\s*by|Mfg\s*By|Importer|Marketer|Seller|Mfg:)\s*[:\s\-]*\s*(.+?)(?:For\s*Consumer\s*Complaints|\n{2,}|Phone:|Tel:|Email:|Customer|Net Qty|MRP|$)", 
-        raw_text
-    )
-    if manu_match:
-        manu = manu_match.group(1).strip().replace("\n", " ")
-        manu = re.sub(r"\s{2,}", " ", manu)
-        details['manufacturer'] = manu.split('Address:')[0].strip()
-    else:
-        details['manufacturer'] = None
-        
     # --- COMPLIANCE CHECK ---
-    
-    missing = []
-    if not details['product_name']: missing.append("Product Name")
-    if not details['net_weight']: missing.append("Net Quantity")
-    if not details['mrp']: missing.append("MRP")
-    if not details['inclusive_of_all_taxes']: missing.append("Taxes Included")
-    if not details['mfg_date']: missing.append("Manufacture Date")
-    if not details['country_of_origin']: missing.append("Country of Origin")
-    if not details['manufacturer']: missing.append("Manufacturer Details")
-
-    details['compliance_status'] = "✅ COMPLIANT" if not missing else f"❌ NON-COMPLIANT: Missing {', '.join(missing)}"
+    details['compliance_status'] = compliance_status(missing_fields(details))
     details['created_at'] = datetime.utcnow().isoformat()
+    details['rule_version'] = RULESET_VERSION
+    return details
+
+def check_label_image(img: Image.Image, source_type: str) -> dict:
+    """
+    OCR + compliance details for a label photo, with its image hash for repeat detection
+    (commit_records links a repeat once the extracted fields confirm it). A re-upload of
+    the same image gets its OCR text from the OCR cache.
+    """
+    details = check_compliance(ocr_image_to_text(img))
+    details['source_type'] = source_type
+    details['image_hash'] = dedupe.image_hash(img)
     return details
 # ---------------------------------------------
 
@@ -341,7 +355,6 @@ def scrape_product(url):
     time.sleep(3) 
 
     product = {"url": url, "Product name": None, "MRP": None, "Net Quantity": None, "Brand name (Proxy)": None, "Manufacturer details": None}
-    raw_text = ""
     page_text = driver.page_source
     
     if "amazon" in url:
@@ -359,8 +372,7 @@ def scrape_product(url):
                 
             price_element = driver.find_element(By.XPATH, "//span[@class='a-price-whole']")
             product["MRP"] = price_element.text.strip() if price_element else None
-            qty_match = re.search(r'(\d+\s*(g|ml|kg|L|pcs))', page_text, re.IGNORECASE)
-            product["Net Quantity"] = qty_match.group(0) if qty_match else None
+            product["Net Quantity"] = scraped_quantity(page_text)
         except Exception:
             pass
             
@@ -375,8 +387,7 @@ def scrape_product(url):
                 pass
             price_element = driver.find_element(By.CLASS_NAME, "_30jeq3")
             product["MRP"] = price_element.text.strip() if price_element else None
-            qty_match = re.search(r'(\d+\s*(g|ml|kg|L|pcs))', page_text, re.IGNORECASE)
-            product["Net Quantity"] = qty_match.group(0) if qty_match else None
+            product["Net Quantity"] = scraped_quantity(page_text)
         except Exception:
             pass
             
@@ -384,57 +395,64 @@ def scrape_product(url):
         driver.quit()
         raise ValueError("Unsupported website. Only Amazon/Flipkart links supported via Selenium.")
 
-    manu_match = re.search(
-        r"(?is)(?:Manufactured\s*By|Packed\s*By|Importer|Marketer|Seller|Address|Marketed\s*By)\s*[:\s\-]*\s*(.+?)(?:\s{2,}|<br>|<BR>|<div|<span|</p>|\Z)", 
-        page_text
-    )
-    
-    if manu_match:
-        manu_detail = manu_match.group(1).strip()
-        soup_snippet = BeautifulSoup(manu_detail, 'html.parser')
-        cleaned_text = soup_snippet.get_text(strip=True).replace('\n', ' ')
-        
-        # --- FIX: Aggressive cleanup to remove embedded URL/JSON snippets ---
-        cleaned_text = re.sub(r'[<>"{}|\\\/]', ' ', cleaned_text)
-        cleaned_text = re.sub(r'selections\?deviceType=.+modal', '', cleaned_text, flags=re.IGNORECASE)
-        cleaned_text = re.sub(r'\s{2,}', ' ', cleaned_text).strip()
-        # ------------------------------------------------------------------
-        
-        product["Manufacturer details"] = cleaned_text[:200]
+    product["Manufacturer details"] = scraped_manufacturer(page_text)
         
     # LOGIC ALREADY PRESENT: Manufacturer details defaults to Brand name if detailed match is not found
     if not product["Manufacturer details"] and product["Brand name (Proxy)"]:
         product["Manufacturer details"] = product["Brand name (Proxy)"]
         
+    raw_text = scraped_raw_text(product)
+    
+    driver.quit()
+    
+    return raw_text, product
+
+def scraped_quantity(page_text: str):
+    """Net quantity (e.g. '200g') found anywhere in the page source, or None."""
+    qty_match = SCRAPE_QUANTITY.search(page_text)
+    return qty_match.group(0) if qty_match else None
+
+def scraped_manufacturer(page_text: str):
+    """Manufacturer details from the page source, stripped of markup and embedded URL/JSON, or None."""
+    manu_match = SCRAPE_MANUFACTURER.search(page_text)
+    if not manu_match:
+        return None
+    manu_detail = manu_match.group(1).strip()
+    soup_snippet = BeautifulSoup(manu_detail, 'html.parser')
+    cleaned_text = soup_snippet.get_text(strip=True).replace('\n', ' ')
+    
+    # --- FIX: Aggressive cleanup to remove embedded URL/JSON snippets ---
+    cleaned_text = re.sub(r'[<>"{}|\\\/]', ' ', cleaned_text)
+    cleaned_text = re.sub(r'selections\?deviceType=.+modal', '', cleaned_text, flags=re.IGNORECASE)
+    cleaned_text = re.sub(r'\s{2,}', ' ', cleaned_text).strip()
+    # ------------------------------------------------------------------
+    
+    return cleaned_text[:200]
+
+def scraped_raw_text(product: dict) -> str:
+    """Label-style text built from the scraped fields, for check_compliance."""
+    raw_text = ""
     raw_text += f"Product Name: {product.get('Product name') or ''}\n"
     raw_text += f"MRP: Rs {product.get('MRP') or ''} (Inclusive of all taxes)\n" 
     raw_text += f"Net Quantity: {product.get('Net Quantity') or ''}\n"
     
     if product["Manufacturer details"]:
         raw_text += f"Manufacturer: {product['Manufacturer details']}\n"
-    
-    driver.quit()
-    
-    return raw_text, product
+    return raw_text
 
 
 # ---------- BARCODE FUNCTIONS ----------
 
 def decode_barcode(image):
-    """Decode barcodes from an image object."""
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-    return decode(image)
+    """Decode EAN/UPC barcodes from an image object (grayscale fast path; only check-digit-valid reads, see barcodes.py)."""
+    return decode_retail(image)
 
-def fetch_from_api(barcode_data):
-    """Fetch product from OpenFoodFacts API."""
+def fetch_from_api(barcode_data, retries: int = 0):
+    """Fetch product from OpenFoodFacts API (served from the response cache when possible)."""
     barcode_data = re.sub(r'\D', '', barcode_data)
-    url = f"https://world.openfoodfacts.org/api/v0/product/{barcode_data}.json"
     try:
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        if data.get("status") == 1:
-            product = data["product"]
+        product = get_off_cache(OFF_CACHE_DB, OFF_BASE_URL).get(barcode_data, retries=retries)
+        if product is not None:
             return {
                 "Product Name": product.get("product_name", "N/A"),
                 "Brand": product.get("brands", "N/A"),
@@ -449,40 +467,46 @@ def fetch_from_api(barcode_data):
     return None
 
 def fetch_from_local_db(barcode_data):
-    """Fallback: check local CSV database."""
-    try:
-        df = pd.read_csv(PRODUCTS_CSV)
-        row = df[df["barcode"].astype(str) == str(barcode_data)]
-        if not row.empty:
-            record = row.iloc[0].to_dict()
-            return {
-                "Product Name": record.get("product_name", "N/A"),
-                "Brand": record.get("brand", "N/A"),
-                "Quantity": record.get("quantity", "N/A"),
-                "Manufacturer": record.get("manufacturer", "N/A"),
-                "Country": record.get("country", "N/A"),
-                "MRP": record.get("mrp", "N/A"),
-                "MFG Date": record.get("mfg_date", "N/A")
-            }
-    except FileNotFoundError:
-        pass
+    """Fallback: look the barcode up in the local catalog (an indexed copy of PRODUCTS_CSV)."""
+    catalog.ensure_synced(PRODUCTS_CSV, CATALOG_DB)
+    record = catalog.lookup(barcode_data, CATALOG_DB)
+    if record:
+        return {
+            "Product Name": record["product_name"] or "N/A",
+            "Brand": record["brand"] or "N/A",
+            "Quantity": record["quantity"] or "N/A",
+            "Manufacturer": record["manufacturer"] or "N/A",
+            "Country": record["country"] or "N/A",
+            "MRP": record["mrp"] or "N/A",
+            "MFG Date": record["mfg_date"] or "N/A"
+        }
     return None
 
-def get_product_details(barcode_data):
-    """Coordinates lookup from API and local DB."""
-    details = fetch_from_api(barcode_data)
+def get_product_details(barcode_data, retries: int = 0):
+    """Coordinates lookup from API and local DB. `retries`: API retries on errors / throttling (bulk runs)."""
+    if LOCAL_CATALOG_FIRST:
+        details = fetch_from_local_db(barcode_data)
+        if details:
+            return details
+
+    # A mistyped or misread code cannot be a real product: skip the network round trip
+    # (the local DB may still know it, e.g. an in-house code)
+    valid = valid_check_digit(re.sub(r'\D', '', str(barcode_data)))
+    details = fetch_from_api(barcode_data, retries) if valid else None
     if details and details.get("Product Name") != "N/A":
         return details
         
-    details = fetch_from_local_db(barcode_data)
+    details = fetch_from_local_db(barcode_data) if not LOCAL_CATALOG_FIRST else None
     if details:
         return details
         
+    if not valid:
+        return {"Error": "❌ Invalid barcode: the check digit does not match (mistyped or misread?)", "Barcode": barcode_data}
     return {"Error": "❌ Product details not found from API or Local DB", "Barcode": barcode_data}
 
-def process_barcode_compliance(details: dict, source_type: str):
+def barcode_compliance_details(details: dict, source_type: str) -> dict:
     """
-    Constructs raw_text from barcode details, runs compliance check, saves, and displays.
+    Constructs raw_text from barcode details and runs the compliance check.
     It then merges non-'N/A' data from the API back into the compliance results.
     """
     raw_text = ""
@@ -536,26 +560,28 @@ def process_barcode_compliance(details: dict, source_type: str):
     # ------------------------------------------------------------------------
 
     # Re-check compliance status after overriding critical fields
-    missing = []
     # Note: MRP/MFG Date are often missing from APIs, so we use the final value
-    if not compliance_details['product_name'] or compliance_details['product_name'] == 'N/A': missing.append("Product Name")
-    if not compliance_details['net_weight'] or compliance_details['net_weight'] == 'N/A': missing.append("Net Quantity")
-    if not compliance_details['mrp'] or compliance_details['mrp'] in ['N/A', 'N/A (API)']: missing.append("MRP")
-    if not compliance_details['inclusive_of_all_taxes']: missing.append("Taxes Included (Assumed Missing)")
-    if not compliance_details['mfg_date'] or compliance_details['mfg_date'] == 'N/A': missing.append("Manufacture Date")
-    if not compliance_details['country_of_origin'] or compliance_details['country_of_origin'] == 'N/A': missing.append("Country of Origin")
-    if not compliance_details['manufacturer'] or compliance_details['manufacturer'] == 'N/A': missing.append("Manufacturer Details")
-    
-    # Update final compliance status
-    compliance_details['compliance_status'] = "✅ COMPLIANT" if not missing else f"❌ NON-COMPLIANT: Missing {', '.join(missing)}"
-    
-    
+    missing = missing_fields(
+        compliance_details,
+        empty_values=('N/A', 'N/A (API)'),
+        labels={'inclusive_of_all_taxes': "Taxes Included (Assumed Missing)"}
+    )
+    compliance_details['compliance_status'] = compliance_status(missing)
+    return compliance_details
+
+def process_barcode_compliance(details: dict, source_type: str) -> dict:
+    """Runs the barcode compliance check, then displays and saves the result. Returns the result."""
+    compliance_details = barcode_compliance_details(details, source_type)
     display_compliance_report(compliance_details)
     
     user = st.session_state.get('user')
     if user:
-        save_record(compliance_details, user)
-        st.success(f"Compliance record saved for ID: **{compliance_details.get('product_name', 'Product')}**.")
+        saved = save_checked(compliance_details, user) is not None  # a repeat is linked to the existing record, not inserted
+        if saved and compliance_details.get('duplicate_of'):
+            st.info(f"Same product as record #{compliance_details['duplicate_of']}: linked to it instead of saving a new record.")
+        elif saved:
+            st.success(f"Compliance record saved for ID: **{compliance_details.get('product_name', 'Product')}**.")
+    return compliance_details
 
 # ---------------------------------------------
 
@@ -613,6 +639,78 @@ def display_compliance_report(details: dict):
             st.subheader("Full JSON Result")
             st.json(details)
 
+def process_batch_upload(files):
+    """Runs OCR + compliance over every uploaded image on a process pool with live progress."""
+    items = list(iter_label_files(files))
+    if not items:
+        st.warning("No PNG/JPG images found in the upload.")
+        return
+
+    st.subheader(f"Batch Compliance Check ({len(items)} images)")
+    progress = st.progress(0.0, text="Starting worker processes...")
+    status_table = st.empty()
+    statuses = []
+    results = []
+
+    for done, result in enumerate(run_batch(items, workers=min(BATCH_WORKERS, len(items))), start=1):
+        details = result['details']
+        if details:
+            results.append(details)
+        statuses.append({
+            "File": result['name'],
+            "Status": result['status'],
+            "Product Name": details.get('product_name') if details else None,
+            "Compliance": details.get('compliance_status') if details else None,
+        })
+        progress.progress(done / len(items), text=f"Processed {done} / {len(items)}: {result['name']}")
+        status_table.dataframe(pd.DataFrame(statuses), use_container_width=True, hide_index=True)
+
+    user = st.session_state.get('user')
+    ids = save_records(results, user)
+    compliant = sum(1 for d in results if d['compliance_status'].startswith("✅"))
+    progress.progress(1.0, text="Batch complete.")
+    st.success(f"Saved {len(ids)} records ({compliant} compliant, {len(results) - compliant} non-compliant, {len(items) - len(results)} failed).")
+
+def process_barcode_manifest(barcodes: list):
+    """
+    Resolves a list of barcodes concurrently, checking each one as its details arrive. Results
+    are queued for saving (group commits with WRITE_BEHIND); the summary waits until they are.
+    """
+    st.subheader(f"Bulk Barcode Check ({len(barcodes)} barcodes)")
+    progress = st.progress(0.0, text="Resolving...")
+    status_table = st.empty()
+    statuses = []
+    saves = []
+    found = compliant = 0
+    user = st.session_state.get('user')
+    start = time.perf_counter()
+
+    lookups = resolve_barcodes(barcodes, lambda barcode: get_product_details(barcode, retries=BULK_RETRIES),
+                               workers=RESOLVE_WORKERS)
+    for done, (barcode, details) in enumerate(lookups, start=1):
+        if "Error" in details:
+            statuses.append({"Barcode": barcode, "Status": details["Error"], "Product Name": None, "Compliance": None})
+        else:
+            result = barcode_compliance_details(details, BULK_SOURCE_TYPE)
+            if user:
+                saves += queue_records([result], user)
+            found += 1
+            compliant += result['compliance_status'].startswith("✅")
+            statuses.append({"Barcode": barcode, "Status": "OK", "Product Name": result.get('product_name'),
+                             "Compliance": result['compliance_status']})
+        progress.progress(done / len(barcodes), text=f"Resolved {done} / {len(barcodes)}: {barcode}")
+        if done % 50 == 0 or done == len(barcodes):  # redrawing the table per row would dominate on long lists
+            status_table.dataframe(pd.DataFrame(statuses), use_container_width=True, hide_index=True)
+
+    errors = [future.exception() for future in saves]  # waits for the queued saves
+    failed = [e for e in errors if e is not None]
+    progress.progress(1.0, text="Bulk lookup complete.")
+    st.success(f"Resolved {len(barcodes)} barcodes in {time.perf_counter() - start:.1f} s: {found} found "
+               f"({compliant} compliant, {found - compliant} non-compliant), {len(barcodes) - found} not found. "
+               f"Saved {len(saves) - len(failed)} records.")
+    if failed:
+        st.error(f"{len(failed)} records could not be saved: {failed[0]}")
+
 def barcode_scanner_ui():
     """UI for all barcode related inputs and processing. (FIXED TUPLE ERROR)"""
     st.subheader("📦 Barcode Product Lookup (EAN/UPC)")
@@ -621,7 +719,7 @@ def barcode_scanner_ui():
     with st.container(border=True):
         option = st.radio(
             "Choose Barcode Input Method:",
-            ["1. Upload Image", "2. Camera Scan", "3. Manual Entry"],
+            ["1. Upload Image", "2. Camera Scan", "3. Manual Entry", "4. Bulk List"],
             horizontal=True
         )
 
@@ -675,10 +773,31 @@ def barcode_scanner_ui():
             if barcode_input and st.button("Lookup Barcode Details", use_container_width=True):
                 process_barcode_lookup(barcode_input.strip(), source_type="Barcode Manual Entry")
                 barcode_processed = True
+
+        elif option == "4. Bulk List":
+            manifest = st.file_uploader("Upload Barcode List / Shipment Manifest (TXT or CSV)", type=["txt", "csv"], key="bulk_barcode_file")
+            pasted = st.text_area("...or paste barcodes, one per line", key="bulk_barcode_text")
+            lines = manifest.getvalue().decode("utf-8", errors="replace").splitlines() if manifest else []
+            barcodes = list(iter_barcodes(lines + pasted.splitlines(), unique=True))
+            if barcodes:
+                st.caption(f"{len(barcodes)} unique barcodes found.")
+            if barcodes and st.button("Resolve & Check All", use_container_width=True, key="bulk_barcode_run"):
+                process_barcode_manifest(barcodes)
+                barcode_processed = True
         
         if not barcode_processed:
             st.info("Awaiting barcode input to run compliance check.")
 
+    with st.expander("🌐 OpenFoodFacts Cache Statistics"):
+        off_stats = get_off_cache(OFF_CACHE_DB, OFF_BASE_URL).summary()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Hit Rate", f"{off_stats['hit_rate']:.0%}")
+        col2.metric("Hits (Found / Not Found)", f"{off_stats['hits']} / {off_stats['negative_hits']}")
+        col3.metric("Stale (Revalidated)", f"{off_stats['stale_hits']} ({off_stats['revalidations']})")
+        col4.metric("API Requests (Errors)", f"{off_stats['fetches']} ({off_stats['fetch_errors']})")
+        st.caption(f"{off_stats['disk_items']} cached barcodes, {off_stats['disk_bytes'] / 1024:.1f} KiB · "
+                   f"{off_stats['evictions']} evicted · {off_stats['served_on_error']} served stale after an API error")
+
 def process_barcode_lookup(barcode_data: str, source_type: str):
     """Wrapper function to handle barcode data and call compliance process."""
     details = get_product_details(barcode_data)
@@ -724,30 +843,27 @@ def complaint_register_ui():
                 st.error("Please fill in all mandatory fields (*).")
             else:
                 try:
-                    conn = sqlite3.connect(DB_PATH)
-                    c = conn.cursor()
-                    
-                    c.execute('''
-                        INSERT INTO complaints (
-                            user_id, username, product_name, mrp, net_quantity, 
-                            purchased_platform, date_of_order, date_of_delivery, 
-                            issue_description, status, filed_at
-                        ) VALUES (?,?,?,?,?,?,?,?,?,?,?)
-                    ''', (
-                        user['id'], 
-                        user['username'], 
-                        product_name, 
-                        mrp, 
-                        net_quantity,
-                        purchased_platform, 
-                        date_of_order.isoformat() if date_of_order else None,
-                        date_of_delivery.isoformat() if date_of_delivery else None,
-                        issue_description, 
-                        "New", # Default status
-                        datetime.utcnow().isoformat()
-                    ))
-                    conn.commit()
-                    conn.close()
+                    with db.transaction(DB_PATH) as conn:
+                        conn.execute('''
+                            INSERT INTO complaints (
+                                user_id, username, product_name, mrp, net_quantity, 
+                                purchased_platform, date_of_order, date_of_delivery, 
+                                issue_description, status, filed_at
+                            ) VALUES (?,?,?,?,?,?,?,?,?,?,?)
+                        ''', (
+                            user['id'], 
+                            user['username'], 
+                            product_name, 
+                            mrp, 
+                            net_quantity,
+                            purchased_platform, 
+                            date_of_order.isoformat() if date_of_order else None,
+                            date_of_delivery.isoformat() if date_of_delivery else None,
+                            issue_description, 
+                            "New", # Default status
+                            datetime.utcnow().isoformat()
+                        ))
+                    invalidate_counts(DB_PATH, "complaints")
                     st.success("✅ Complaint Registered Successfully! The Compliance Officer will review it shortly.")
                     st.balloons()
                 except Exception as e:
@@ -755,6 +871,77 @@ def complaint_register_ui():
 # ---------------------------------------------
 
 
+# ---------- PAGINATED LISTINGS & EXPORT ----------
+
+def date_range_filter(column: str, dates) -> tuple:
+    """(where, params) for an st.date_input range over an ISO timestamp column; the end day is inclusive."""
+    dates = tuple(dates or ())
+    lo = dates[0].isoformat() if len(dates) > 0 else None
+    hi = (dates[1] + timedelta(days=1)).isoformat() if len(dates) > 1 else None
+    return build_filter(ranges={column: (lo, hi)})
+
+def paginated_listing(key: str, table: str, columns: str, order_col: str, where: str = "", params=()):
+    """
+    Newest-first page of `table` with Newer / Older navigation. Pages are fetched by keyset
+    (the cursor of each visited page is kept in session state), so the cost of a page does not
+    grow with how far back it is. Returns the page DataFrame; the caller renders it.
+    """
+    col_size, col_info, col_newer, col_older = st.columns([1, 3, 1, 1])
+    page_size = col_size.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    # Cursors of the pages visited so far; any change of filter or page size starts over
+    signature = (where, tuple(params), page_size)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+
+    df, next_cursor = fetch_page(DB_PATH, table, columns, order_col, where, params, after=cursors[-1], page_size=page_size)
+    if col_newer.button("◀ Newer", key=f"{key}_newer", disabled=len(cursors) == 1, use_container_width=True):
+        cursors.pop()
+        st.rerun()
+    if col_older.button("Older ▶", key=f"{key}_older", disabled=next_cursor is None, use_container_width=True):
+        cursors.append(next_cursor)
+        st.rerun()
+
+    total = count_rows(DB_PATH, table, where, params)
+    first = (len(cursors) - 1) * page_size
+    if not df.empty:
+        col_info.caption(f"Showing {first + 1}–{first + len(df)} of {total}")
+    return df
+
+def highlighted_markdown(text) -> str:
+    """Escapes markdown in a search result field and bolds the FTS hits."""
+    if not isinstance(text, str) or not text:
+        return "—"
+    text = re.sub(r"([\\`*_{}\[\]()#+\-.!|<>~$])", r"\\\1", " ".join(text.split()))
+    return text.replace(HIGHLIGHT[0], "**").replace(HIGHLIGHT[1], "**")
+
+def search_results_ui(query: str):
+    """Ranked full-text matches for the Records tab search box."""
+    limit = st.selectbox("Results", PAGE_SIZES, index=0, key="search_limit")
+    results = search_records(DB_PATH, query, limit)
+    if results.empty:
+        st.info(f"No records mention '{query}'.")
+        return
+    st.caption(f"Top {len(results)} of {count_matches(DB_PATH, query)} matching records, best first")
+    for row in results.itertuples(index=False):
+        with st.container(border=True):
+            st.markdown(f"**#{row.id}** · {highlighted_markdown(row.product_name)} · {highlighted_markdown(row.manufacturer)}")
+            st.markdown(highlighted_markdown(row.snippet))
+            st.caption(f"{row.compliance_status} · {row.source_type} · {row.username} · {row.created_at}")
+
+def export_download(fmt: str, columns: list, where: str = "", params=()):
+    """Deferred st.download_button data: streams the matching records into a temp file only when clicked."""
+    def generate():
+        fh = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        export_records(DB_PATH, fh, fmt, columns, where, params)
+        fh.seek(0)
+        return fh
+    return generate
+# ---------------------------------------------
+
+
 # ---------- DASHBOARD VIEWS ----------
 
 def officer_dashboard():
@@ -768,7 +955,7 @@ def officer_dashboard():
     with tabs[0]:
         st.subheader("1. Source Input for Compliance Check")
 
-        source_options = ['Upload Image', 'Camera Capture']
+        source_options = ['Upload Image', 'Camera Capture', 'Batch Upload (ZIP / Multiple Images)']
         if SELENIUM_AVAILABLE:
             source_options.append('Product URL Scrape (Amazon/Flipkart)')
             
@@ -778,28 +965,36 @@ def officer_dashboard():
             uploaded_file = None
             camera_img = None
             url = None
+            batch_files = None
             
             if source_selection == 'Upload Image':
                 uploaded_file = st.file_uploader("Upload an image of the label", type=['png','jpg','jpeg'])
             elif source_selection == 'Camera Capture':
                 camera_img = st.camera_input("Capture image of the label")
+            elif source_selection == 'Batch Upload (ZIP / Multiple Images)':
+                batch_files = st.file_uploader("Upload label images or ZIP archives", type=['png','jpg','jpeg','zip'], accept_multiple_files=True)
             elif source_selection == 'Product URL Scrape (Amazon/Flipkart)':
                 url = st.text_input("Amazon or Flipkart Product URL:")
             
             check_btn = st.button("Process Compliance Check (OCR/Web)", use_container_width=True)
 
-        if check_btn:
+        if check_btn and batch_files:
+            process_batch_upload(batch_files)
+        elif check_btn:
             raw_text = ""
             source_type = None
 
+            details = None
+            user = st.session_state.get('user')
+
             if camera_img:
-                img = Image.open(camera_img)
-                raw_text = ocr_image_to_text(img)
                 source_type = "Camera OCR"
+                details = check_label_image(Image.open(camera_img), source_type)
+                raw_text = details['raw_text']
             elif uploaded_file:
-                img = Image.open(uploaded_file)
-                raw_text = ocr_image_to_text(img)
                 source_type = "Uploaded Image OCR"
+                details = check_label_image(Image.open(uploaded_file), source_type)
+                raw_text = details['raw_text']
             elif url and source_selection == 'Product URL Scrape (Amazon/Flipkart)':
                 with st.spinner("Scraping product details..."):
                     try:
@@ -812,16 +1007,39 @@ def officer_dashboard():
                         source_type = "Product URL (error)"
 
             if raw_text and source_type not in ["Product URL (error)"]:
-                details = check_compliance(raw_text)
-                details['source_type'] = source_type
+                if details is None:
+                    details = check_compliance(raw_text)
+                    details['source_type'] = source_type
                 display_compliance_report(details)
-                
-                user = st.session_state.get('user')
-                save_record(details, user)
-                st.success(f"Compliance record saved for: **{details.get('product_name', 'Product')}**.")
+
+                saved = save_checked(details, user) is not None  # a repeat is linked to the existing record, not inserted
+                if saved and details.get('duplicate_of'):
+                    st.info(f"Same label as record #{details['duplicate_of']}: linked to it instead of saving a new record.")
+                elif saved:
+                    st.success(f"Compliance record saved for: **{details.get('product_name', 'Product')}**.")
             else:
                 st.info("Processing complete with no valid text extracted.")
 
+        with st.expander("⚡ OCR Cache Statistics"):
+            cache_stats = get_ocr_cache().summary()
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+            col2.metric("Hits (Memory / Disk)", f"{cache_stats['memory_hits']} / {cache_stats['disk_hits']}")
+            col3.metric("Misses", cache_stats['misses'])
+            col4.metric("OCR Time Saved", f"{cache_stats['saved_seconds']:.1f} s")
+            st.caption(f"Disk tier: {cache_stats.get('disk_items', 0)} entries, {cache_stats.get('disk_bytes', 0) / 1024:.1f} KiB")
+
+        if WRITE_BEHIND:
+            with st.expander("🗄️ Write-Behind Queue"):
+                writer_stats = record_writer().summary()
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Queue Depth", f"{writer_stats['depth']} / {writer_stats['capacity']}")
+                col2.metric("Committed (Groups)", f"{writer_stats['committed']} ({writer_stats['groups']})")
+                col3.metric("Commit p50 / p95", f"{writer_stats['commit_p50_ms'] or 0:.1f} / {writer_stats['commit_p95_ms'] or 0:.1f} ms")
+                col4.metric("Queued → Durable p95", f"{writer_stats['latency_p95_ms'] or 0:.1f} ms")
+                st.caption(f"Avg group {writer_stats['avg_group_size']} records · peak depth {writer_stats['max_depth']} · "
+                           f"{writer_stats['blocked_submits']} blocked submits · {writer_stats['failed']} failed")
+
     # ----------------------------------------
     # BARCODE SCAN TAB (Tab 1)
     # ----------------------------------------
@@ -833,13 +1051,45 @@ def officer_dashboard():
     # ----------------------------------------
     with tabs[2]:
         st.subheader("All Compliance Records Log")
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query(f"SELECT {DISPLAY_COLUMNS} FROM records ORDER BY created_at DESC", conn)
-        conn.close()
+        stale = count_stale(DB_PATH)
+        if stale:
+            col_info, col_btn = st.columns([3, 1])
+            col_info.warning(f"{stale} records were checked with an older rule set (current: v{RULESET_VERSION}).")
+            if col_btn.button("Re-evaluate Stale Records", use_container_width=True):
+                with st.spinner("Re-evaluating stored raw text..."):
+                    updated = recheck_records(DB_PATH)
+                    invalidate_counts(DB_PATH, "records")
+                st.success(f"Updated {updated} records to rule set v{RULESET_VERSION}.")
+        query = st.text_input("🔎 Search product name, manufacturer and label text", key="records_search",
+                              placeholder="e.g. Delicious Foods or masala")
+        if query.strip():
+            search_results_ui(query)
+            st.markdown("---")
+        with st.expander("Filter by MRP / Net Quantity"):
+            col_mrp_min, col_mrp_max, col_unit, col_qty_min, col_qty_max = st.columns(5)
+            mrp_min = col_mrp_min.number_input("MRP from (Rs)", min_value=0.0, value=None, step=10.0)
+            mrp_max = col_mrp_max.number_input("MRP to (Rs)", min_value=0.0, value=None, step=10.0)
+            unit = col_unit.selectbox("Quantity unit", ["Any"] + list(UNIT_CLASSES))
+            qty_min = col_qty_min.number_input("Quantity from", min_value=0.0, value=None, step=50.0, disabled=unit == "Any")
+            qty_max = col_qty_max.number_input("Quantity to", min_value=0.0, value=None, step=50.0, disabled=unit == "Any")
+        col_status, col_source, col_user, col_dates = st.columns(4)
+        status = col_status.selectbox("Status", ["Any"] + list(STATUS_PREFIXES), key="record_status")
+        source = col_source.selectbox("Source", ["Any"] + distinct_values(DB_PATH, "records", "source_type"))
+        username = col_user.selectbox("Checked by", ["Any"] + distinct_values(DB_PATH, "records", "username"))
+        dates = col_dates.date_input("Checked between", value=(), max_value=datetime.today())
+        where, params = combine(
+            build_filter(
+                equals={"source_type": None if source == "Any" else source, "username": None if username == "Any" else username},
+                prefixes={"compliance_status": STATUS_PREFIXES.get(status)},
+            ),
+            date_range_filter("created_at", dates),
+            range_filter(mrp_min, mrp_max, None if unit == "Any" else unit, qty_min, qty_max),
+        )
+        df = paginated_listing("records", "records", f"{DISPLAY_COLUMNS}, {NUMERIC_DISPLAY_COLUMNS}", "created_at", where, params)
         if not df.empty:
             st.dataframe(df, use_container_width=True)
         else:
-            st.info("No records yet.")
+            st.info("No records match the filters." if where else "No records yet.")
 
     # ----------------------------------------
     # GENERATE LABEL TAB (Tab 3)
@@ -887,13 +1137,28 @@ def officer_dashboard():
     # ----------------------------------------
     with tabs[4]:
         st.subheader("Export Full Compliance Data")
-        if os.path.exists(CSV_FILE):
-            df_csv = pd.read_csv(CSV_FILE)
-            st.dataframe(df_csv, use_container_width=True)
-            with open(CSV_FILE, "rb") as f:
-                st.download_button("Download CSV File", data=f, file_name=CSV_FILE, mime="text/csv", type="primary", use_container_width=True)
+        col_format, col_dates = st.columns([1, 2])
+        export_format = col_format.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+        export_dates = col_dates.date_input("Checked between", value=(), max_value=datetime.today(), key="export_dates")
+        export_columns = st.multiselect("Columns", EXPORT_COLUMNS, default=DEFAULT_EXPORT_COLUMNS, key="export_columns")
+        where, params = date_range_filter("created_at", export_dates)
+        total = count_rows(DB_PATH, "records", where, params)
+        if not total:
+            st.warning("No records to export. Run a check first, or widen the date range.")
+        elif not export_columns:
+            st.warning("Select at least one column to export.")
         else:
-            st.warning("CSV file not found. Run a check first to create the file.")
+            # Preview only the newest page; the file is generated from the DB when the button is clicked
+            df_preview, _ = fetch_page(DB_PATH, "records", ", ".join(dict.fromkeys(["id", "created_at"] + export_columns)), "created_at", where, params)
+            st.caption(f"Newest {len(df_preview)} of {total} records")
+            st.dataframe(df_preview[export_columns], use_container_width=True)
+            extension, mime = EXPORT_FORMATS[export_format]
+            st.download_button(
+                f"Download {export_format.upper()} File",
+                data=export_download(export_format, export_columns, where, params),
+                file_name=f"product_compliance_records_{datetime.today():%Y%m%d}.{extension}",
+                mime=mime, type="primary", use_container_width=True
+            )
 
     # ----------------------------------------
     # COMPLAINTS TRACKER TAB (Tab 5 - NEW)
@@ -902,14 +1167,20 @@ def officer_dashboard():
         st.subheader("🚨 Active Consumer Complaints")
         st.caption("Review and manage all complaints submitted by users.")
 
-        conn = sqlite3.connect(DB_PATH)
-        df_complaints = pd.read_sql_query("SELECT * FROM complaints ORDER BY filed_at DESC", conn)
-        conn.close()
+        col_status, col_user, col_dates = st.columns(3)
+        status = col_status.selectbox("Status", ["Any"] + distinct_values(DB_PATH, "complaints", "status"), key="complaint_status")
+        username = col_user.selectbox("Filed by", ["Any"] + distinct_values(DB_PATH, "complaints", "username"), key="complaint_user")
+        dates = col_dates.date_input("Filed between", value=(), max_value=datetime.today(), key="complaint_dates")
+        where, params = combine(
+            build_filter(equals={"status": None if status == "Any" else status, "username": None if username == "Any" else username}),
+            date_range_filter("filed_at", dates),
+        )
+        df_complaints = paginated_listing("complaints", "complaints", COMPLAINT_COLUMNS, "filed_at", where, params)
 
         if df_complaints.empty:
-            st.info("No complaints have been registered yet.")
+            st.info("No complaints match the filters." if where else "No complaints have been registered yet.")
         else:
-            df_display = df_complaints.drop(columns=['user_id', 'id', 'filed_at'])
+            df_display = df_complaints.drop(columns=['id', 'filed_at'])
             
             df_display.rename(columns={
                 'username': 'Filed By',
@@ -939,7 +1210,7 @@ def user_dashboard():
     with tabs[0]:
         st.subheader("1. Source Input for Compliance Check")
 
-        source_options = ['Upload Image', 'Camera Capture']
+        source_options = ['Upload Image', 'Camera Capture', 'Batch Upload (ZIP / Multiple Images)']
         if SELENIUM_AVAILABLE:
             source_options.append('Product URL Scrape (Amazon/Flipkart)')
             
@@ -949,28 +1220,36 @@ def user_dashboard():
             uploaded_file = None
             camera_img = None
             url = None
+            batch_files = None
 
             if source_selection == 'Upload Image':
                 uploaded_file = st.file_uploader("Upload an image of the label", type=['png','jpg','jpeg'])
             elif source_selection == 'Camera Capture':
                 camera_img = st.camera_input("Capture image of the label")
+            elif source_selection == 'Batch Upload (ZIP / Multiple Images)':
+                batch_files = st.file_uploader("Upload label images or ZIP archives", type=['png','jpg','jpeg','zip'], accept_multiple_files=True)
             elif source_selection == 'Product URL Scrape (Amazon/Flipkart)':
                 url = st.text_input("Amazon or Flipkart Product URL:")
 
             check_btn = st.button("Process Compliance Check (OCR/Web)", type="primary", use_container_width=True)
 
-        if check_btn:
+        if check_btn and batch_files:
+            process_batch_upload(batch_files)
+        elif check_btn:
             raw_text = ""
             source_type = None
 
+            details = None
+            user = st.session_state.get('user')
+
             if camera_img:
-                img = Image.open(camera_img)
-                raw_text = ocr_image_to_text(img)
                 source_type = "Camera OCR"
+                details = check_label_image(Image.open(camera_img), source_type)
+                raw_text = details['raw_text']
             elif uploaded_file:
-                img = Image.open(uploaded_file)
-                raw_text = ocr_image_to_text(img)
                 source_type = "Uploaded Image OCR"
+                details = check_label_image(Image.open(uploaded_file), source_type)
+                raw_text = details['raw_text']
             elif url and source_selection == 'Product URL Scrape (Amazon/Flipkart)':
                 with st.spinner("Scraping product details..."):
                     try:
@@ -983,13 +1262,16 @@ def user_dashboard():
                         source_type = "Product URL (error)"
 
             if raw_text and source_type not in ["Product URL (error)"]:
-                details = check_compliance(raw_text)
-                details['source_type'] = source_type
+                if details is None:
+                    details = check_compliance(raw_text)
+                    details['source_type'] = source_type
                 display_compliance_report(details)
 
-                user = st.session_state.get('user')
-                save_record(details, user)
-                st.success("Result saved to your personal log.")
+                saved = save_checked(details, user) is not None  # a repeat is linked to the existing record, not inserted
+                if saved and details.get('duplicate_of'):
+                    st.info(f"You already checked this label (record #{details['duplicate_of']} in your log); no new record was added.")
+                elif saved:
+                    st.success("Result saved to your personal log.")
             else:
                 st.info("Processing complete with no valid text extracted.")
 
@@ -1005,9 +1287,7 @@ def user_dashboard():
     with tabs[2]:
         st.subheader("Your Personal Log of Checks")
         user_id = st.session_state.user.get('id')
-        conn = sqlite3.connect(DB_PATH)
-        df_user = pd.read_sql_query(f"SELECT {DISPLAY_COLUMNS} FROM records WHERE user_id=? ORDER BY created_at DESC", conn, params=(user_id,))
-        conn.close()
+        df_user = paginated_listing("personal_log", "records", DISPLAY_COLUMNS, "created_at", "user_id = ?", (user_id,))
         if not df_user.empty:
             st.dataframe(df_user, use_container_width=True)
         else:
@@ -1024,11 +1304,8 @@ def user_dashboard():
 
 def get_user_from_db(username: str):
     """Retrieves user details from database."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id, username, password_hash, role, fullname FROM users WHERE username=?", (username,))
-    row = c.fetchone()
-    conn.close()
+    with db.connection(DB_PATH) as conn:
+        row = conn.execute("SELECT id, username, password_hash, role, fullname FROM users WHERE username=?", (username,)).fetchone()
     if row:
         return {'id': row[0], 'username': row[1], 'password_hash': row[2], 'role': row[3], 'fullname': row[4]}
     return None
@@ -0,0 +1,135 @@
+# db.py - Pooled, WAL-mode SQLite connections shared by every session and module
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+# ---------- CONFIG & CONSTANTS ----------
+POOL_SIZE = 8                  # Connections kept open per database file
+BUSY_TIMEOUT_SECONDS = 10.0    # SQLite waits this long on a lock before raising "database is locked"
+WRITE_RETRIES = 5              # Extra attempts to take the write lock after the busy timeout
+RETRY_BACKOFF_SECONDS = 0.05   # Doubled on every retry
+PRAGMAS = {
+    "journal_mode": "WAL",     # Readers never block on the writer and vice versa
+    "synchronous": "NORMAL",   # Durable at checkpoints; safe against corruption in WAL mode
+    "cache_size": -32000,      # KiB of page cache per connection (negative = size, not pages)
+    "mmap_size": 268435456,    # Map up to 256 MB of the file for reads
+    "temp_store": "MEMORY",
+}
+# ----------------------------------------
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection):
+    """
+    BEGIN IMMEDIATE ... COMMIT on an existing connection. Taking the write lock up front
+    (rather than upgrading a read transaction) means a busy database is waited on at BEGIN,
+    where retrying is safe, instead of failing halfway through. Rolls back on error.
+    """
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            break
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e) or attempt == WRITE_RETRIES:
+                raise
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+class ConnectionPool:
+    """
+    Open connections to one database file, checked out per use instead of opened and
+    closed around every query. Connections are created on demand up to `size`; further
+    callers wait for one to be returned. Connections may be handed between threads
+    (Streamlit runs every rerun on a new thread) but are only used by one at a time.
+    """
+
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_grow = self._created < self.size
+            if can_grow:
+                self._created += 1
+        if not can_grow:
+            return self._idle.get()
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    @contextmanager
+    def connection(self):
+        """A pooled connection for reads or self-managed transactions."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:  # never hand on a connection holding locks
+                conn.rollback()
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """A pooled connection inside write_transaction."""
+        with self.connection() as conn, write_transaction(conn):
+            yield conn
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """One pool per database file per process (survives Streamlit reruns), closed at exit."""
+    with _POOLS_LOCK:
+        if db_path not in _POOLS:
+            _POOLS[db_path] = ConnectionPool(db_path)
+            atexit.register(_POOLS[db_path].close)
+        return _POOLS[db_path]
+
+def connection(db_path: str):
+    return get_pool(db_path).connection()
+
+def transaction(db_path: str):
+    return get_pool(db_path).transaction()
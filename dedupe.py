@@ -0,0 +1,161 @@
+# dedupe.py - Repeat-scan detection: perceptual label-image hashes and normalized-field fingerprints
+#
+# Every saved record gets a row in scan_fingerprints (see migrations.py) holding the
+# image's 64-bit difference hash, split into four indexed 16-bit bands, and a hash of
+# its normalized compliance fields. Two hashes within IMAGE_HASH_MAX_DISTANCE bits of each
+# other always share at least one band exactly, so near-duplicate images are found
+# through the band indexes instead of by comparing against every stored hash. A 64-bit
+# hash is far too coarse to tell two labels of the same layout apart, so a near image
+# is only a candidate: it counts as a repeat when the text fingerprint matches as well.
+# A field match alone only counts within TEXT_MATCH_WINDOW_DAYS: the same product
+# checked again next month is a new check, not a repeat scan.
+
+import hashlib
+import re
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from quantities import parse_mrp, parse_quantity
+
+
+# ---------- CONFIG & CONSTANTS ----------
+HASH_SIZE = 8                 # dHash grid: 8x8 comparisons -> 64-bit hash
+HASH_BANDS = 4                # 16-bit bands; finds every match within HASH_BANDS - 1 differing bits
+IMAGE_HASH_MAX_DISTANCE = 3   # Differing bits still counted as a candidate for the same photo (re-encoded, resized, re-uploaded)
+FINGERPRINT_FIELDS = ("product_name", "net_weight", "mrp", "mfg_date", "country_of_origin", "manufacturer",
+                      "inclusive_of_all_taxes", "compliance_status")  # Every field the compliance check looks at, and its verdict
+MIN_FINGERPRINT_FIELDS = 3    # Fewer extracted fields than this is too little to call two scans the same product
+TEXT_MATCH_WINDOW_DAYS = 30   # Scans with the same fields further apart than this are separate checks
+PLACEHOLDERS = {"n a", "na", "n a api", "none", "null", "unknown", "not found"}  # Normalized values meaning "missing"
+# ----------------------------------------
+
+_BAND_BITS = 64 // HASH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+
+# ---------- HASHES ----------
+def image_hash(img: Image.Image) -> int:
+    """
+    64-bit difference hash (dHash): each bit says whether a pixel of the 9x8 grayscale
+    thumbnail is brighter than its right neighbour. Survives rescaling, recompression and
+    small brightness changes; unsigned.
+    """
+    thumb = img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = list(thumb.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            value = (value << 1) | (left > pixels[row * (HASH_SIZE + 1) + col + 1])
+    return value
+
+def content_hash(img: Image.Image) -> str:
+    """Digest of the decoded pixels, mode and size: equal only for the very same image."""
+    h = hashlib.sha1(f"{img.mode}|{img.width}x{img.height}|".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+def hash_bands(value: int) -> list:
+    return [(value >> (_BAND_BITS * i)) & _BAND_MASK for i in range(HASH_BANDS)]
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def _normalize(text) -> str:
+    if not text or text != text:  # None, "" or NaN (NULL columns read through pandas)
+        return ""
+    value = " ".join(re.findall(r"[a-z0-9]+", str(text).lower()))
+    return "" if value in PLACEHOLDERS else value
+
+def _flag(value) -> bool:
+    # True, 1 / 1.0 (records table, pandas) or "True" / "1" (read back from a CSV)
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "1.0", "yes")
+    return value in (True, 1)
+
+def text_fingerprint(details: dict):
+    """
+    Hash of the normalized FINGERPRINT_FIELDS ('5.00 kg' and '5000 g' agree, case and
+    punctuation are ignored), or None if fewer than MIN_FINGERPRINT_FIELDS label fields
+    were extracted (the tax flag and the status are always there and do not count).
+    """
+    quantity = parse_quantity(details.get("net_weight"))
+    mrp = parse_mrp(details.get("mrp"))
+    values = {
+        "product_name": _normalize(details.get("product_name")),
+        "net_weight": f"{quantity[0]:g} {quantity[1]}" if quantity[0] is not None else "",
+        "mrp": f"{mrp:.2f}" if mrp is not None else "",
+        "mfg_date": _normalize(details.get("mfg_date")),
+        "country_of_origin": _normalize(details.get("country_of_origin")),
+        "manufacturer": _normalize(details.get("manufacturer")),
+    }
+    if sum(1 for value in values.values() if value) < MIN_FINGERPRINT_FIELDS:
+        return None
+    values["inclusive_of_all_taxes"] = "1" if _flag(details.get("inclusive_of_all_taxes")) else "0"
+    values["compliance_status"] = _normalize(details.get("compliance_status"))
+    return hashlib.sha1("\x1f".join(values[field] for field in FINGERPRINT_FIELDS).encode("utf-8")).hexdigest()[:20]
+# ----------------------------------------
+
+
+# ---------- LOOKUP & LINKING (on an open connection / cursor) ----------
+# CROSS JOIN pins the join order: candidates come from the fingerprint indexes, never from
+# a walk over all of the user's records
+def find_by_image(conn, user_id, value: int, fingerprint):
+    """
+    Id of this user's record whose label image is nearest to `value` (within
+    IMAGE_HASH_MAX_DISTANCE) and whose text fingerprint is `fingerprint`, or None.
+    """
+    if not fingerprint:
+        return None
+    bands = hash_bands(value)
+    rows = conn.execute(
+        f"""
+        SELECT f.record_id, f.image_hash FROM scan_fingerprints f CROSS JOIN records r ON r.id = f.record_id
+        WHERE ({" OR ".join(f"f.hash_band{i} = ?" for i in range(HASH_BANDS))})
+          AND f.text_fingerprint = ? AND r.user_id IS ?
+        """,
+        bands + [fingerprint, user_id]
+    ).fetchall()
+    best = min(((hamming(value, h), record_id) for record_id, h in rows), default=None)
+    return best[1] if best and best[0] <= IMAGE_HASH_MAX_DISTANCE else None
+
+def find_by_text(conn, user_id, fingerprint):
+    """Id of this user's earliest record with the same text fingerprint scanned in the last TEXT_MATCH_WINDOW_DAYS, or None."""
+    if not fingerprint:
+        return None
+    since = (datetime.utcnow() - timedelta(days=TEXT_MATCH_WINDOW_DAYS)).isoformat()
+    row = conn.execute(
+        "SELECT MIN(f.record_id) FROM scan_fingerprints f CROSS JOIN records r ON r.id = f.record_id "
+        "WHERE f.text_fingerprint = ? AND f.created_at >= ? AND r.user_id IS ?",
+        (fingerprint, since, user_id)
+    ).fetchone()
+    return row[0]
+
+def find_duplicate(conn, user_id, details: dict):
+    """
+    Existing record of the same user that `details` repeats (same photo with the same
+    extracted fields, or the same fields within TEXT_MATCH_WINDOW_DAYS), or None.
+    """
+    fingerprint = text_fingerprint(details)
+    if details.get("image_hash") is not None:
+        record_id = find_by_image(conn, user_id, details["image_hash"], fingerprint)
+        if record_id is not None:
+            return record_id
+    return find_by_text(conn, user_id, fingerprint)
+
+def add_fingerprint(conn, record_id: int, details: dict):
+    """Indexes a saved record's scan. Also used to link a repeat scan to the record it duplicates."""
+    value = details.get("image_hash")
+    bands = hash_bands(value) if value is not None else [None] * HASH_BANDS
+    conn.execute(
+        f"INSERT INTO scan_fingerprints (record_id, image_hash, {', '.join(f'hash_band{i}' for i in range(HASH_BANDS))}, "
+        f"text_fingerprint, created_at) VALUES (?, ?, {', '.join('?' * HASH_BANDS)}, ?, ?)",
+        [record_id, _signed(value) if value is not None else None] + bands
+        + [text_fingerprint(details), datetime.utcnow().isoformat()]
+    )
+# ----------------------------------------
@@ -0,0 +1,114 @@
+# exports.py - Streams the records table to gzip CSV, Parquet or JSONL in bounded-memory chunks
+
+import gzip
+import io
+import json
+
+import pandas as pd
+
+from db import connection
+from queries import combine
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+# ---------- CONFIG & CONSTANTS ----------
+CHUNK_ROWS = 5000  # Rows read from SQLite (and held in memory) at a time
+EXPORT_COLUMNS = [
+    "id", "user_id", "username", "source_type", "product_name", "net_weight", "mrp",
+    "inclusive_of_all_taxes", "mfg_date", "country_of_origin", "manufacturer", "compliance_status", "created_at",
+    "rule_version", "mrp_value", "net_quantity_value", "net_quantity_unit", "raw_text",
+]
+DEFAULT_EXPORT_COLUMNS = EXPORT_COLUMNS[:13]  # The legacy CSV mirror's columns
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+}
+if PARQUET_AVAILABLE:
+    EXPORT_FORMATS["parquet"] = ("parquet", "application/vnd.apache.parquet")
+# ----------------------------------------
+
+
+def iter_chunks(db_path: str, columns: list, where: str = "", params=(), chunk_rows: int = CHUNK_ROWS):
+    """
+    DataFrames of up to `chunk_rows` matching records in id order. Each chunk is its own
+    keyset query (id > last id seen), so no connection or read snapshot is held between
+    chunks and memory stays flat however large the table is.
+    """
+    select = columns if "id" in columns else ["id"] + list(columns)
+    last_id = 0
+    while True:
+        chunk_where, chunk_params = combine((where, params), ("id > ?", [last_id]))
+        with connection(db_path) as conn:
+            chunk = pd.read_sql_query(
+                f"SELECT {', '.join(select)} FROM records WHERE {chunk_where} ORDER BY id LIMIT ?",
+                conn, params=chunk_params + [chunk_rows], dtype_backend="numpy_nullable"  # keep NULL-able integers integral
+            )
+        if chunk.empty:
+            return
+        last_id = int(chunk["id"].iloc[-1])
+        yield chunk[list(columns)]
+        if len(chunk) < chunk_rows:
+            return
+
+
+def _arrow_schema(db_path: str, columns: list):
+    # Fixed from the declared column types, so chunks whose values happen to be all NULL
+    # (or all whole numbers) still match the schema the file was opened with
+    with connection(db_path) as conn:
+        declared = {row[1]: (row[2] or "").upper() for row in conn.execute("PRAGMA table_info(records)")}
+    types = {"INTEGER": pa.int64(), "REAL": pa.float64()}
+    return pa.schema([(column, types.get(declared.get(column), pa.string())) for column in columns])
+
+
+def write_export(fh, fmt: str, chunks, columns: list, db_path: str = None) -> int:
+    """Writes `chunks` to the binary file `fh` in `fmt` (a key of EXPORT_FORMATS). Returns the row count."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}' (available: {', '.join(EXPORT_FORMATS)})")
+    rows = 0
+    if fmt == "parquet":
+        schema = _arrow_schema(db_path, columns)
+        with pq.ParquetWriter(fh, schema, compression="zstd") as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+            if not rows:
+                writer.write_table(schema.empty_table())
+        return rows
+
+    raw = gzip.GzipFile(fileobj=fh, mode="wb", compresslevel=6, mtime=0) if fmt == "csv.gz" else fh
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv.gz":
+            pd.DataFrame(columns=columns).to_csv(text, index=False)
+        for chunk in chunks:
+            if fmt == "csv.gz":
+                chunk.to_csv(text, header=False, index=False)
+            else:
+                for record in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+                    text.write(json.dumps(dict(zip(columns, record)), ensure_ascii=False, default=str) + "\n")
+            rows += len(chunk)
+        text.flush()
+    finally:
+        text.detach()  # leave `fh` open for the caller
+        if raw is not fh:
+            raw.close()
+    return rows
+
+
+def export_records(db_path: str, fh, fmt: str, columns: list = None, where: str = "", params=(),
+                   chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Streams the records matching `where` to `fh` (binary, writable) without loading the
+    table into memory. `columns` defaults to DEFAULT_EXPORT_COLUMNS. Returns the row count.
+    """
+    columns = [c for c in (columns or DEFAULT_EXPORT_COLUMNS) if c in EXPORT_COLUMNS]
+    if not columns:
+        raise ValueError("No exportable columns selected")
+    return write_export(fh, fmt, iter_chunks(db_path, columns, where, params, chunk_rows), columns, db_path)
@@ -0,0 +1,261 @@
+# migrations.py - Versioned schema migrations keyed on PRAGMA user_version
+#
+# To change the schema, append a (version, description, function) entry to MIGRATIONS.
+# Never edit an entry that has shipped: databases already past its version will not
+# run it again. Each migration runs in its own write transaction together with the
+# user_version bump, so a failed step leaves the database at the previous version.
+
+import sqlite3
+import threading
+
+import pandas as pd
+
+from db import connection, write_transaction
+from dedupe import text_fingerprint
+from quantities import numeric_frame
+
+
+# ---------- HELPERS ----------
+def ensure_columns(cursor, table: str, columns: dict) -> list:
+    """Adds any of `columns` ({name: type}) that an existing table is missing. Returns the names added."""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    added = []
+    for name, decl in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+            added.append(name)
+    return added
+
+def rebuild_table(cursor, table: str, definition: str):
+    """
+    Recreates `table` with a new column `definition` (the part inside CREATE TABLE (...)),
+    for changes ALTER TABLE cannot make (dropping constraints, changing types or defaults).
+    Columns present in both versions are copied; the table's indexes are recreated where
+    their columns still exist.
+    """
+    indexes = [row[0] for row in cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL", (table,))]
+    old_columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+    cursor.execute(f"CREATE TABLE {table}__new ({definition})")
+    new_columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table}__new)")}
+    shared = ", ".join(c for c in old_columns if c in new_columns)
+    cursor.execute(f"INSERT INTO {table}__new ({shared}) SELECT {shared} FROM {table}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
+    for sql in indexes:
+        try:
+            cursor.execute(sql)
+        except sqlite3.OperationalError:  # index refers to a dropped column
+            pass
+# ----------------------------------------
+
+
+# ---------- MIGRATIONS ----------
+def _base_tables(c):
+    # IF NOT EXISTS: databases created before versioning already have these tables
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password_hash TEXT,
+            role TEXT,
+            fullname TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            username TEXT,
+            source_type TEXT,
+            raw_text TEXT,
+            product_name TEXT,
+            net_weight TEXT,
+            mrp TEXT,
+            inclusive_of_all_taxes INTEGER,
+            mfg_date TEXT,
+            country_of_origin TEXT,
+            manufacturer TEXT,
+            compliance_status TEXT,
+            created_at TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS complaints (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            username TEXT,
+            product_name TEXT,
+            mrp TEXT,
+            net_quantity TEXT,
+            purchased_platform TEXT,
+            date_of_order TEXT,
+            date_of_delivery TEXT,
+            issue_description TEXT,
+            status TEXT,
+            filed_at TEXT
+        )
+    ''')
+
+def _rule_version(c):
+    ensure_columns(c, "records", {"rule_version": "INTEGER"})
+
+def _numeric_columns(c, chunk_size=50000):
+    added = ensure_columns(c, "records", {"net_quantity_value": "REAL", "net_quantity_unit": "TEXT", "mrp_value": "REAL"})
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_mrp_value ON records(mrp_value)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_net_quantity ON records(net_quantity_unit, net_quantity_value)")
+    if not added:
+        return
+    # Backfill existing rows in keyset-ordered chunks (bounded memory, same transaction)
+    last_id = 0
+    while True:
+        chunk = pd.read_sql_query(
+            "SELECT id, net_weight, mrp FROM records WHERE id > ? ORDER BY id LIMIT ?",
+            c.connection, params=(last_id, chunk_size)
+        )
+        if chunk.empty:
+            break
+        values = numeric_frame(chunk["net_weight"], chunk["mrp"])
+        values["id"] = chunk["id"]
+        c.executemany("UPDATE records SET net_quantity_value=?, net_quantity_unit=?, mrp_value=? WHERE id=?",
+                      values.itertuples(index=False, name=None))
+        last_id = int(chunk["id"].iloc[-1])
+
+def _listing_indexes(c):
+    # Records tab: ORDER BY created_at DESC; personal log: WHERE user_id=? ORDER BY created_at DESC
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_created_at ON records(created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_user_created ON records(user_id, created_at)")
+    # Stale-record count shown on every Records tab render
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_rule_version ON records(rule_version)")
+    # Complaints tracker: ORDER BY filed_at DESC
+    c.execute("CREATE INDEX IF NOT EXISTS idx_complaints_filed_at ON complaints(filed_at)")
+
+def _filter_indexes(c):
+    # Server-side filters of the paginated Records / Complaints views, each with the sort column
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_source_created ON records(source_type, created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_status_created ON records(compliance_status, created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_username_created ON records(username, created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_complaints_status_filed ON complaints(status, filed_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_complaints_username_filed ON complaints(username, filed_at)")
+
+def _records_fts(c):
+    # External-content FTS5 index: stores only the token index, the text stays in records.
+    # Triggers keep it in step with every insert, delete and text update.
+    columns = ("product_name", "manufacturer", "raw_text")
+    names = ", ".join(columns)
+    c.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+            {names}, content='records', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    new = ", ".join(f"new.{col}" for col in columns)
+    old = ", ".join(f"old.{col}" for col in columns)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+            INSERT INTO records_fts(rowid, {names}) VALUES (new.id, {new});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+            INSERT INTO records_fts(records_fts, rowid, {names}) VALUES ('delete', old.id, {old});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS records_fts_update AFTER UPDATE OF {names} ON records BEGIN
+            INSERT INTO records_fts(records_fts, rowid, {names}) VALUES ('delete', old.id, {old});
+            INSERT INTO records_fts(rowid, {names}) VALUES (new.id, {new});
+        END
+    """)
+    # Backfill: index every existing row
+    c.execute("INSERT INTO records_fts(records_fts) VALUES ('rebuild')")
+
+def _scan_fingerprints(c, chunk_size=50000):
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS scan_fingerprints (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            record_id INTEGER NOT NULL,
+            image_hash INTEGER,
+            hash_band0 INTEGER,
+            hash_band1 INTEGER,
+            hash_band2 INTEGER,
+            hash_band3 INTEGER,
+            text_fingerprint TEXT,
+            created_at TEXT
+        )
+    ''')
+    for i in range(4):
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_scan_fingerprints_band{i} ON scan_fingerprints(hash_band{i})")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_scan_fingerprints_text ON scan_fingerprints(text_fingerprint)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_scan_fingerprints_record ON scan_fingerprints(record_id)")
+    # Backfill text fingerprints of existing records (their images were never stored)
+    last_id = 0
+    while True:
+        chunk = pd.read_sql_query(
+            "SELECT id, product_name, net_weight, mrp, mfg_date, created_at FROM records WHERE id > ? ORDER BY id LIMIT ?",
+            c.connection, params=(last_id, chunk_size)
+        )
+        if chunk.empty:
+            break
+        rows = [(row["id"], text_fingerprint(row), row["created_at"]) for row in chunk.to_dict("records")]
+        c.executemany("INSERT INTO scan_fingerprints (record_id, text_fingerprint, created_at) VALUES (?,?,?)", rows)
+        last_id = int(chunk["id"].iloc[-1])
+
+def _fingerprint_compliance_fields(c, chunk_size=50000):
+    # Text fingerprints now cover every compliance field and the status; recompute the stored
+    # ones from their records (a linked repeat gets its record's, which it matched)
+    last_id = 0
+    while True:
+        chunk = pd.read_sql_query(
+            "SELECT id, product_name, net_weight, mrp, mfg_date, country_of_origin, manufacturer, "
+            "inclusive_of_all_taxes, compliance_status FROM records WHERE id > ? ORDER BY id LIMIT ?",
+            c.connection, params=(last_id, chunk_size)
+        )
+        if chunk.empty:
+            break
+        rows = [(text_fingerprint(row), row["id"]) for row in chunk.to_dict("records")]
+        c.executemany("UPDATE scan_fingerprints SET text_fingerprint = ? WHERE record_id = ?", rows)
+        last_id = int(chunk["id"].iloc[-1])
+
+MIGRATIONS = [
+    (1, "users, records and complaints tables", _base_tables),
+    (2, "records.rule_version", _rule_version),
+    (3, "normalized quantity / MRP columns with indexes and backfill", _numeric_columns),
+    (4, "indexes for the records, personal log and complaints listings", _listing_indexes),
+    (5, "indexes for the records / complaints filters", _filter_indexes),
+    (6, "FTS5 index over product_name, manufacturer and raw_text", _records_fts),
+    (7, "scan_fingerprints for repeat-scan detection, with text fingerprint backfill", _scan_fingerprints),
+    (8, "text fingerprints over all compliance fields and the status", _fingerprint_compliance_fields),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+# ----------------------------------------
+
+
+# ---------- RUNNER ----------
+_MIGRATED = {} # db_path -> schema version reached by this process
+_MIGRATE_LOCK = threading.Lock()
+
+def schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(db_path: str, migrations: list = MIGRATIONS) -> int:
+    """
+    Applies pending `migrations` (MIGRATIONS unless another database's list, like the
+    product catalog's, is given) to `db_path`; a no-op after the first call per process.
+    Safe to run from several processes at once: each step re-checks the version after
+    taking the write lock. Returns the schema version.
+    """
+    with _MIGRATE_LOCK:
+        if db_path in _MIGRATED:
+            return _MIGRATED[db_path]
+        with connection(db_path) as conn:
+            for version, _, apply in migrations:
+                if schema_version(conn) >= version:
+                    continue
+                with write_transaction(conn):
+                    if schema_version(conn) >= version:  # another process got there first
+                        continue
+                    apply(conn.cursor())
+                    conn.execute(f"PRAGMA user_version = {version}")
+            _MIGRATED[db_path] = schema_version(conn)
+        return _MIGRATED[db_path]
+# ----------------------------------------
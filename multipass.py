@@ -0,0 +1,112 @@
+# multipass.py - Coarse-to-fine OCR driven by the compliance check
+
+import re
+import time
+
+from PIL import Image
+
+from ocr_engine import OCR_LANG, OCR_PSM
+from preprocess import preprocess_image
+from rules import field_keywords
+from text_regions import merge_rects, ocr_by_regions
+
+
+# ---------- CONFIG & CONSTANTS ----------
+COARSE_TEXT_HEIGHT = 20      # Glyph height (px) for the cheap first pass
+TIME_BUDGET_SECONDS = 8.0    # Per image; no new pass is started if it would likely overrun
+REFINE_PSMS = (6, 11)        # Alternate page segmentation modes tried on keyword regions
+# ----------------------------------------
+
+
+def missing_fields(details: dict) -> list:
+    """Names (not labels) of the rule fields check() has not found yet."""
+    return [field for field in field_keywords() if not details.get(field)]
+
+
+def words_to_text(words: list) -> str:
+    """Rebuilds line-oriented text from Tesseract word boxes."""
+    lines, current, key = [], [], None
+    for word in words:
+        if word["line"] != key and current:
+            lines.append(" ".join(current))
+            current = []
+        key = word["line"]
+        current.append(word["text"])
+    if current:
+        lines.append(" ".join(current))
+    return "\n".join(lines)
+
+
+def keyword_regions(words: list, fields: list, scale_x: float, scale_y: float, size: tuple) -> list:
+    """
+    Boxes (in fine-image coordinates) around the keywords of the given fields:
+    from just left of the keyword to the right edge, and a few lines down for
+    values that wrap (addresses) or sit below their caption.
+    """
+    width, height = size
+    keywords = field_keywords()
+    rects = []
+    for word in words:
+        token = re.sub(r"[^a-z]", "", word["text"].lower())
+        if not token or not any(token.startswith(kw) for f in fields for kw in keywords[f]):
+            continue
+        h = word["height"]
+        x0 = max(0, int((word["left"] - h) * scale_x))
+        y0 = max(0, int((word["top"] - h) * scale_y))
+        y1 = min(height, int((word["top"] + 4 * h) * scale_y))
+        if y1 > y0:
+            rects.append((x0, y0, width - x0, y1 - y0))
+    return merge_rects(rects, gap=0)
+
+
+def coarse_to_fine_ocr(img: Image.Image, engine, check, config: dict = None,
+                       budget: float = TIME_BUDGET_SECONDS, lang: str = OCR_LANG) -> dict:
+    """
+    1. One cheap low-resolution pass with word boxes.
+    2. For fields still missing, re-OCR only the regions around their keywords at full
+       resolution, trying alternate PSMs.
+    3. If something is still missing and time allows, a full high-resolution region pass.
+    Stops as soon as `check(text)` finds every field or the time budget would be exceeded.
+    Returns {"raw_text", "details", "passes", "elapsed"}.
+    """
+    config = config or {}
+    start = time.perf_counter()
+    passes = []
+
+    def elapsed():
+        return time.perf_counter() - start
+
+    coarse = preprocess_image(img, {**config, "target_text_height": COARSE_TEXT_HEIGHT})
+    words = engine.image_to_data(coarse, lang, OCR_PSM)
+    text = words_to_text(words)
+    details = check(text)
+    coarse_seconds = elapsed()
+    passes.append("coarse")
+    missing = missing_fields(details)
+
+    fine = None
+    if missing:
+        fine = preprocess_image(img, config)
+        sx, sy = fine.width / float(coarse.width), fine.height / float(coarse.height)
+        rects = keyword_regions(words, missing, sx, sy, fine.size)
+        # The fine pass costs roughly coarse time x pixel ratio; skip it if that blows the budget
+        crop_pixels = sum(w * h for _, _, w, h in rects)
+        estimate = coarse_seconds * crop_pixels / float(coarse.width * coarse.height)
+        if rects and elapsed() + estimate < budget:
+            crops = [fine.crop((x, y, x + w, y + h)) for x, y, w, h in rects]
+            for psm in REFINE_PSMS:
+                text += "\n" + "\n".join(t.strip() for t in engine.map(crops, lang, psm) if t.strip())
+                details = check(text)
+                passes.append(f"keyword-regions psm{psm}")
+                missing = missing_fields(details)
+                if not missing or elapsed() + estimate >= budget:
+                    break
+
+    if missing:
+        estimate = coarse_seconds * (fine.width * fine.height) / float(coarse.width * coarse.height)
+        if elapsed() + estimate < budget:
+            text += "\n" + ocr_by_regions(img, engine, config, lang)
+            details = check(text)
+            passes.append("full-regions")
+
+    return {"raw_text": text, "details": details, "passes": passes, "elapsed": elapsed()}
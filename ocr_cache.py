@@ -0,0 +1,164 @@
+# ocr_cache.py - Content-addressed OCR result cache (in-process LRU + size-bounded SQLite tier)
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+
+# ---------- CONFIG & CONSTANTS ----------
+OCR_CACHE_DB = "ocr_cache.db"
+MEMORY_ITEMS = 256
+DISK_BUDGET_BYTES = 64 * 1024 * 1024
+EVICT_TO_FRACTION = 0.9  # Evict down to this share of the budget, so the next puts have headroom
+# ----------------------------------------
+
+
+def cache_key(img: Image.Image, lang: str, psm: int, preprocess: str) -> str:
+    """Hashes the decoded pixels plus everything that influences the OCR output."""
+    h = hashlib.sha256()
+    h.update(f"{img.mode}|{img.width}x{img.height}|{lang}|psm{psm}|{preprocess}|".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+class OCRCache:
+    """
+    Two-tier cache of OCR text. The memory tier is a plain LRU; the disk tier
+    is an SQLite table evicted by last access once it exceeds `disk_budget` bytes.
+    """
+
+    def __init__(self, db_path: str = OCR_CACHE_DB, memory_items: int = MEMORY_ITEMS,
+                 disk_budget: int = DISK_BUDGET_BYTES):
+        self.memory_items = memory_items
+        self.disk_budget = disk_budget
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_seconds": 0.0}
+        self._conn = None
+        self._bytes = 0
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS ocr_cache (
+                    key TEXT PRIMARY KEY,
+                    text TEXT,
+                    size INTEGER,
+                    ocr_seconds REAL,
+                    last_access REAL
+                )
+            ''')
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_last_access ON ocr_cache(last_access)")
+            self._conn.commit()
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+
+    # -- memory tier --
+    def _mem_get(self, key):
+        entry = self._mem.get(key)
+        if entry is not None:
+            self._mem.move_to_end(key)
+        return entry
+
+    def _mem_put(self, key, text, seconds):
+        self._mem[key] = (text, seconds)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory_items:
+            self._mem.popitem(last=False)
+
+    # -- disk tier --
+    def _disk_get(self, key):
+        if self._conn is None:
+            return None
+        row = self._conn.execute("SELECT text, ocr_seconds FROM ocr_cache WHERE key=?", (key,)).fetchone()
+        if row:
+            self._conn.execute("UPDATE ocr_cache SET last_access=? WHERE key=?", (time.time(), key))
+            self._conn.commit()
+        return row
+
+    def _disk_put(self, key, text, seconds):
+        if self._conn is None:
+            return
+        size = len(text.encode("utf-8")) + len(key)
+        old = self._conn.execute("SELECT size FROM ocr_cache WHERE key=?", (key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ocr_cache (key, text, size, ocr_seconds, last_access) VALUES (?,?,?,?,?)",
+            (key, text, size, seconds, time.time())
+        )
+        self._bytes += size - (old[0] if old else 0)
+        if self._bytes > self.disk_budget:
+            # The running total drifts when other processes share the file; recount before evicting
+            # (only every so many puts, as eviction goes down to EVICT_TO_FRACTION of the budget)
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if self._bytes > self.disk_budget:
+            # Walk from the least recently used end until we are back under the low watermark
+            excess = self._bytes - int(self.disk_budget * EVICT_TO_FRACTION)
+            victims = []
+            for victim_key, victim_size in self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access"):
+                if excess <= 0:
+                    break
+                victims.append((victim_key,))
+                excess -= victim_size
+                self._bytes -= victim_size
+            self._conn.executemany("DELETE FROM ocr_cache WHERE key=?", victims)
+        self._conn.commit()
+
+    # -- public API --
+    def get(self, key: str):
+        """Returns cached text for `key` or None, updating the hit/miss counters."""
+        with self._lock:
+            entry = self._mem_get(key)
+            if entry is not None:
+                self.stats["memory_hits"] += 1
+                self.stats["saved_seconds"] += entry[1] or 0.0
+                return entry[0]
+            row = self._disk_get(key)
+            if row is not None:
+                self.stats["disk_hits"] += 1
+                self.stats["saved_seconds"] += row[1] or 0.0
+                self._mem_put(key, row[0], row[1])
+                return row[0]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, text: str, seconds: float = 0.0):
+        with self._lock:
+            self._mem_put(key, text, seconds)
+            self._disk_put(key, text, seconds)
+
+    def get_or_compute(self, img: Image.Image, compute, lang: str, psm: int, preprocess: str = "none") -> str:
+        """Serves OCR text from the cache, running `compute(img)` only on a miss."""
+        key = cache_key(img, lang, psm, preprocess)
+        text = self.get(key)
+        if text is not None:
+            return text
+        start = time.perf_counter()
+        text = compute(img)
+        self.put(key, text, time.perf_counter() - start)
+        return text
+
+    def summary(self) -> dict:
+        """Snapshot of counters plus the current disk tier size."""
+        with self._lock:
+            out = dict(self.stats)
+            lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+            out["hit_rate"] = (out["memory_hits"] + out["disk_hits"]) / lookups if lookups else 0.0
+            out["memory_items"] = len(self._mem)
+            if self._conn is not None:
+                count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()
+                out["disk_items"], out["disk_bytes"] = count, size
+            return out
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> OCRCache:
+    """Returns the process-wide OCR cache."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = OCRCache()
+        return _CACHE
@@ -0,0 +1,264 @@
+# ocr_engine.py - Pooled Tesseract OCR engine (resident C API workers, pytesseract fallback)
+
+import atexit
+import ctypes
+import ctypes.util
+import os
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+import pytesseract
+
+
+# ---------- CONFIG & CONSTANTS ----------
+OCR_LANG = "eng"
+OCR_PSM = 6  # Single uniform block of text, same as the old '--psm 6'
+POOL_SIZE = os.cpu_count() or 1
+WINDOWS_TESSERACT_DIR = r"C:\Program Files\Tesseract-OCR"
+# ----------------------------------------
+
+
+# ---------- C API BINDING ----------
+def _load_libtesseract():
+    """Locates and loads libtesseract via ctypes. Returns None if unavailable."""
+    candidates = []
+    found = ctypes.util.find_library("tesseract")
+    if found:
+        candidates.append(found)
+    if platform.system() == "Windows":
+        tess_dir = os.path.dirname(pytesseract.pytesseract.tesseract_cmd) or WINDOWS_TESSERACT_DIR
+        for name in ("libtesseract-5.dll", "libtesseract-4.dll", "tesseract53.dll"):
+            candidates.append(os.path.join(tess_dir, name))
+    else:
+        candidates += ["libtesseract.so.5", "libtesseract.so.4", "libtesseract.dylib"]
+
+    for path in candidates:
+        try:
+            lib = ctypes.CDLL(path)
+        except OSError:
+            continue
+        _declare_signatures(lib)
+        return lib
+    return None
+
+def _declare_signatures(lib):
+    api = ctypes.c_void_p
+    lib.TessBaseAPICreate.restype = api
+    lib.TessBaseAPICreate.argtypes = []
+    lib.TessBaseAPIInit3.restype = ctypes.c_int
+    lib.TessBaseAPIInit3.argtypes = [api, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetPageSegMode.restype = None
+    lib.TessBaseAPISetPageSegMode.argtypes = [api, ctypes.c_int]
+    lib.TessBaseAPISetImage.restype = None
+    lib.TessBaseAPISetImage.argtypes = [api, ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.TessBaseAPISetSourceResolution.restype = None
+    lib.TessBaseAPISetSourceResolution.argtypes = [api, ctypes.c_int]
+    # Returned as a raw pointer so it can be handed back to TessDeleteText
+    lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+    lib.TessBaseAPIGetUTF8Text.argtypes = [api]
+    lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+    lib.TessBaseAPIGetTsvText.argtypes = [api, ctypes.c_int]
+    lib.TessDeleteText.restype = None
+    lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+    lib.TessBaseAPIClear.restype = None
+    lib.TessBaseAPIClear.argtypes = [api]
+    lib.TessBaseAPIEnd.restype = None
+    lib.TessBaseAPIEnd.argtypes = [api]
+    lib.TessBaseAPIDelete.restype = None
+    lib.TessBaseAPIDelete.argtypes = [api]
+
+
+def parse_tsv(tsv: str) -> list:
+    """Word rows of Tesseract TSV output as dicts (text, left, top, width, height, conf, line key)."""
+    words = []
+    for line in tsv.splitlines():
+        cols = line.split("\t")
+        if len(cols) < 12 or cols[0] != "5":  # level 5 = word (also skips the header row)
+            continue
+        text = cols[11].strip()
+        if not text:
+            continue
+        words.append({
+            "text": text,
+            "left": int(cols[6]), "top": int(cols[7]), "width": int(cols[8]), "height": int(cols[9]),
+            "conf": float(cols[10]),
+            "line": (int(cols[2]), int(cols[3]), int(cols[4])),
+        })
+    return words
+
+
+def _as_raw_image(img: Image.Image):
+    """Converts a PIL image into the (bytes, w, h, bytes_per_pixel) layout Tesseract expects."""
+    if img.mode in ("1", "P", "I", "F", "I;16"):
+        img = img.convert("L")
+    elif img.mode not in ("L", "RGB"):
+        img = img.convert("RGB")
+    bpp = 1 if img.mode == "L" else 3
+    return img.tobytes(), img.width, img.height, bpp
+
+
+class CApiWorker:
+    """One resident TessBaseAPI handle with its traineddata already loaded."""
+
+    def __init__(self, lib, lang: str, psm: int):
+        self.lib = lib
+        self.handle = lib.TessBaseAPICreate()
+        if lib.TessBaseAPIInit3(self.handle, None, lang.encode()) != 0:
+            lib.TessBaseAPIDelete(self.handle)
+            self.handle = None
+            raise RuntimeError(f"TessBaseAPIInit3 failed for language '{lang}'")
+        lib.TessBaseAPISetPageSegMode(self.handle, psm)
+
+    def recognize(self, img: Image.Image, tsv: bool = False) -> str:
+        """Plain UTF-8 text, or Tesseract's word-level TSV when `tsv` is set."""
+        data, w, h, bpp = _as_raw_image(img)
+        lib = self.lib
+        # ctypes releases the GIL for these calls, so workers run truly in parallel
+        lib.TessBaseAPISetImage(self.handle, data, w, h, bpp, w * bpp)
+        dpi = img.info.get("dpi")
+        if dpi:
+            lib.TessBaseAPISetSourceResolution(self.handle, int(dpi[0]))
+        ptr = lib.TessBaseAPIGetTsvText(self.handle, 0) if tsv else lib.TessBaseAPIGetUTF8Text(self.handle)
+        try:
+            return ctypes.string_at(ptr).decode("utf-8", errors="replace") if ptr else ""
+        finally:
+            if ptr:
+                lib.TessDeleteText(ptr)
+            lib.TessBaseAPIClear(self.handle)
+
+    def close(self):
+        if self.handle:
+            self.lib.TessBaseAPIEnd(self.handle)
+            self.lib.TessBaseAPIDelete(self.handle)
+            self.handle = None
+# ----------------------------------------
+
+
+# ---------- ENGINE & POOL ----------
+class OCREngine:
+    """
+    Pool of long-lived Tesseract workers keyed by (lang, psm).
+    Workers are created on demand up to `size` in total and then reused, so the
+    traineddata is loaded once per worker instead of once per image. At the cap,
+    an idle worker of another config is closed to make room for the one needed.
+    Falls back to pytesseract (one tesseract process per call) when
+    libtesseract cannot be loaded or a worker fails to initialise.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, backend: str = "auto"):
+        self.size = max(1, int(size))
+        self.lib = _load_libtesseract() if backend in ("auto", "capi") else None
+        if backend == "capi" and self.lib is None:
+            raise RuntimeError("libtesseract could not be loaded for the C API backend")
+        self.backend = "capi" if self.lib is not None else "pytesseract"
+        self._idle = {}     # (lang, psm) -> workers not checked out
+        self._created = {}  # (lang, psm) -> live workers, idle or not
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._executor = None
+
+    # -- worker checkout --
+    def _acquire(self, lang, psm):
+        key = (lang, psm)
+        retired = None
+        with self._released:
+            while True:
+                idle = self._idle.setdefault(key, [])
+                if idle:
+                    return idle.pop()
+                if sum(self._created.values()) < self.size:
+                    break
+                other = next((k for k, workers in self._idle.items() if workers), None)
+                if other is not None:
+                    retired = self._idle[other].pop()
+                    self._created[other] -= 1
+                    break
+                self._released.wait()  # every worker is checked out
+            self._created[key] = self._created.get(key, 0) + 1
+        if retired is not None:
+            retired.close()
+        try:
+            return CApiWorker(self.lib, lang, psm)
+        except Exception:
+            with self._released:
+                self._created[key] -= 1
+                self._released.notify()
+            raise
+
+    def _release(self, lang, psm, worker):
+        with self._released:
+            self._idle.setdefault((lang, psm), []).append(worker)
+            self._released.notify()
+
+    def warm(self, lang: str = OCR_LANG, psm: int = OCR_PSM):
+        """Pre-initialises the full pool for a config so the first requests pay no startup cost."""
+        if self.backend != "capi":
+            return
+        workers = [self._acquire(lang, psm) for _ in range(self.size)]
+        for w in workers:
+            self._release(lang, psm, w)
+
+    # -- public API --
+    def _run(self, img, lang, psm, tsv):
+        if self.backend == "capi":
+            try:
+                worker = self._acquire(lang, psm)
+            except RuntimeError:
+                # e.g. tessdata not found by the library - stop retrying and use the CLI from now on
+                self.backend = "pytesseract"
+            else:
+                try:
+                    return worker.recognize(img, tsv=tsv)
+                finally:
+                    self._release(lang, psm, worker)
+        if tsv:
+            return pytesseract.image_to_data(img, lang=lang, config=f"--psm {psm}")
+        return pytesseract.image_to_string(img, lang=lang, config=f"--psm {psm}")
+
+    def image_to_string(self, img: Image.Image, lang: str = OCR_LANG, psm: int = OCR_PSM) -> str:
+        """OCRs an in-memory PIL image and returns the recognised text."""
+        return self._run(img, lang, psm, tsv=False)
+
+    def image_to_data(self, img: Image.Image, lang: str = OCR_LANG, psm: int = OCR_PSM) -> list:
+        """OCRs an in-memory PIL image and returns word boxes (see parse_tsv)."""
+        return parse_tsv(self._run(img, lang, psm, tsv=True))
+
+    def map(self, images, lang: str = OCR_LANG, psm: int = OCR_PSM) -> list:
+        """OCRs several images concurrently across the pool, preserving order."""
+        images = list(images)
+        if len(images) <= 1:
+            return [self.image_to_string(im, lang, psm) for im in images]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="ocr")
+        return list(self._executor.map(lambda im: self.image_to_string(im, lang, psm), images))
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+        with self._lock:
+            idle, self._idle, self._created = self._idle, {}, {}
+        for workers in idle.values():
+            for worker in workers:
+                worker.close()
+
+
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+def get_engine(size: int = None) -> OCREngine:
+    """
+    Returns the process-wide OCR engine (survives Streamlit reruns since modules stay imported).
+    `size` only applies to the first call, e.g. to keep batch worker processes at one worker each.
+    """
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = OCREngine(size or POOL_SIZE)
+            atexit.register(_ENGINE.close)
+        return _ENGINE
+# ----------------------------------------
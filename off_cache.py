@@ -0,0 +1,273 @@
+# off_cache.py - OpenFoodFacts product lookups behind a persistent response cache
+#
+# Answers are kept in SQLite keyed by barcode, "not found" included. A fresh entry is
+# served without touching the network; an expired one is still served for STALE_SECONDS
+# while a small background pool refreshes it (stale-while-revalidate), and is also the
+# fallback when a refresh fails. The table is evicted by last access once it exceeds
+# `disk_budget` bytes, like the OCR cache.
+#
+# Requests share one keep-alive session, and at most PER_HOST_LIMIT of them run against
+# a host at a time however many threads are looking barcodes up.
+
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# ---------- CONFIG & CONSTANTS ----------
+OFF_BASE_URL = "https://world.openfoodfacts.org"
+OFF_CACHE_DB = "off_cache.db"
+PRODUCT_FIELDS = ("product_name", "brands", "quantity", "manufacturing_places", "countries")  # Only these are requested and stored
+HIT_TTL_SECONDS = 7 * 24 * 3600   # Found products are served without revalidation for this long...
+MISS_TTL_SECONDS = 6 * 3600       # ...and "not found" answers for this long (new products do get added)
+STALE_SECONDS = 30 * 24 * 3600    # Past its TTL an entry is served for this much longer while it is refreshed
+DISK_BUDGET_BYTES = 16 * 1024 * 1024
+EVICT_TO_FRACTION = 0.9           # Evict down to this share of the budget, so the next stores have headroom
+REVALIDATE_WORKERS = 2            # Background refreshes of stale entries run on this many threads...
+MAX_PENDING_REVALIDATIONS = 256   # ...with at most this many queued; past that a stale hit is just served
+REQUEST_TIMEOUT_SECONDS = 5
+PER_HOST_LIMIT = 8                # Concurrent requests per API host (OpenFoodFacts throttles aggressive clients)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF_SECONDS = 0.5       # Doubled on every retry (with jitter); a Retry-After header takes precedence
+MAX_RETRY_AFTER_SECONDS = 30.0
+# ----------------------------------------
+
+
+# ---------- HTTP ----------
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_HOST_SLOTS = defaultdict(lambda: threading.BoundedSemaphore(PER_HOST_LIMIT))
+
+def get_session() -> requests.Session:
+    """Process-wide session: connections (and TLS handshakes) are reused across lookups and threads."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=PER_HOST_LIMIT)
+            _SESSION.mount("http://", adapter)
+            _SESSION.mount("https://", adapter)
+        return _SESSION
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    with _SESSION_LOCK:
+        return _HOST_SLOTS[urlsplit(url).netloc]
+
+def _retry_delay(response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+    delay = RETRY_BACKOFF_SECONDS * 2 ** attempt
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def fetch_product(barcode: str, base_url: str = OFF_BASE_URL, timeout: float = REQUEST_TIMEOUT_SECONDS,
+                  retries: int = 0, http=None):
+    """
+    The product's PRODUCT_FIELDS as a dict, or None if OpenFoodFacts does not know the
+    barcode. Connection errors, timeouts and RETRY_STATUSES are retried up to `retries`
+    times, then raise (they must not be cached as "not found"). `http` is anything with
+    requests' get(); the shared session by default.
+    """
+    http = http or get_session()
+    url = f"{base_url.rstrip('/')}/api/v0/product/{barcode}.json"
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            with _host_slot(url):  # released while backing off
+                response = http.get(url, params={"fields": ",".join(PRODUCT_FIELDS)}, timeout=timeout)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            data = response.json()
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+            status = e.response.status_code if e.response is not None else None
+            if attempt == retries or (status is not None and status not in RETRY_STATUSES):
+                raise
+            time.sleep(_retry_delay(e.response, attempt))
+            continue
+        if data.get("status") != 1:
+            return None
+        product = data.get("product") or {}
+        return {field: product[field] for field in PRODUCT_FIELDS if field in product}
+# ----------------------------------------
+
+
+class ProductCache:
+    """
+    Barcode -> OpenFoodFacts product (or None for "not found"). get() only goes to the
+    network for barcodes never seen, or last fetched more than TTL + STALE_SECONDS ago.
+    `fetch(barcode, retries)` does the actual request (fetch_product against `base_url` by
+    default). Safe to share between threads.
+    """
+
+    def __init__(self, db_path: str = OFF_CACHE_DB, base_url: str = OFF_BASE_URL, fetch=None,
+                 hit_ttl: float = HIT_TTL_SECONDS, miss_ttl: float = MISS_TTL_SECONDS,
+                 stale: float = STALE_SECONDS, disk_budget: int = DISK_BUDGET_BYTES):
+        self.base_url = base_url
+        self._fetch = fetch or (lambda barcode, retries: fetch_product(barcode, self.base_url, retries=retries))
+        self.hit_ttl, self.miss_ttl, self.stale = hit_ttl, miss_ttl, stale
+        self.disk_budget = disk_budget
+        self._lock = threading.Lock()
+        self._refreshing = set()  # barcodes with a revalidation queued or running
+        self._revalidator = ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS, thread_name_prefix="off-revalidate")
+        self.stats = {"hits": 0, "negative_hits": 0, "stale_hits": 0, "misses": 0, "served_on_error": 0,
+                      "fetches": 0, "fetch_errors": 0, "revalidations": 0, "evictions": 0}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # a cache: losing the last entries on power loss is fine
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS off_cache (
+                barcode TEXT PRIMARY KEY,
+                product TEXT,
+                size INTEGER,
+                fetched_at REAL,
+                expires_at REAL,
+                last_access REAL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_off_cache_last_access ON off_cache(last_access)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM off_cache").fetchone()[0]
+
+    # -- storage --
+    def _read(self, barcode):
+        with self._lock:
+            row = self._conn.execute("SELECT product, expires_at FROM off_cache WHERE barcode=?", (barcode,)).fetchone()
+            if row:
+                self._conn.execute("UPDATE off_cache SET last_access=? WHERE barcode=?", (time.time(), barcode))
+                self._conn.commit()
+        return row
+
+    def _store(self, barcode, product):
+        now = time.time()
+        text = json.dumps(product) if product is not None else None
+        size = len(barcode) + (len(text.encode("utf-8")) if text else 0)
+        expires = now + (self.hit_ttl if product is not None else self.miss_ttl)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM off_cache WHERE barcode=?", (barcode,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO off_cache (barcode, product, size, fetched_at, expires_at, last_access) VALUES (?,?,?,?,?,?)",
+                (barcode, text, size, now, expires, now)
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.disk_budget:
+                # The running total drifts when other processes share the file; recount before evicting
+                # (only every so many stores, as eviction goes down to EVICT_TO_FRACTION of the budget)
+                self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM off_cache").fetchone()[0]
+            if self._bytes > self.disk_budget:
+                excess = self._bytes - int(self.disk_budget * EVICT_TO_FRACTION)
+                victims = []
+                for victim, victim_size in self._conn.execute("SELECT barcode, size FROM off_cache ORDER BY last_access"):
+                    if excess <= 0:
+                        break
+                    victims.append((victim,))
+                    excess -= victim_size
+                    self._bytes -= victim_size
+                self._conn.executemany("DELETE FROM off_cache WHERE barcode=?", victims)
+                self.stats["evictions"] += len(victims)
+            self._conn.commit()
+
+    def _refresh(self, barcode, retries=0):
+        try:
+            product = self._fetch(barcode, retries)
+        except Exception:
+            with self._lock:
+                self.stats["fetch_errors"] += 1
+            raise
+        with self._lock:
+            self.stats["fetches"] += 1
+        self._store(barcode, product)
+        return product
+
+    def _revalidate(self, barcode):
+        with self._lock:
+            if barcode in self._refreshing or len(self._refreshing) >= MAX_PENDING_REVALIDATIONS:
+                return  # already queued, or the pool is busy: a later stale hit queues it
+            self._refreshing.add(barcode)
+            self.stats["revalidations"] += 1
+
+        def run():
+            try:
+                self._refresh(barcode)
+            except Exception:
+                pass  # keep serving the stale entry; the next get() tries again
+            finally:
+                with self._lock:
+                    self._refreshing.discard(barcode)
+
+        self._revalidator.submit(run)
+
+    # -- public API --
+    def get(self, barcode, retries: int = 0):
+        """
+        The product dict for `barcode`, or None if OpenFoodFacts does not know it. A request
+        is retried `retries` times (see fetch_product); interactive lookups fail fast, bulk
+        runs retry (see bulk_lookup.py). Raises the fetch error only when nothing (not even
+        a stale entry) is cached.
+        """
+        barcode = re.sub(r"\D", "", str(barcode))
+        row = self._read(barcode)
+        now = time.time()
+        if row is not None:
+            product = json.loads(row[0]) if row[0] is not None else None
+            if now < row[1]:
+                with self._lock:
+                    self.stats["hits" if product is not None else "negative_hits"] += 1
+                return product
+            if now < row[1] + self.stale:
+                with self._lock:
+                    self.stats["stale_hits"] += 1
+                self._revalidate(barcode)
+                return product
+        with self._lock:
+            self.stats["misses"] += 1
+        try:
+            return self._refresh(barcode, retries)
+        except Exception:
+            if row is None:
+                raise
+            with self._lock:
+                self.stats["served_on_error"] += 1
+            return json.loads(row[0]) if row[0] is not None else None
+
+    def invalidate(self, barcode):
+        barcode = re.sub(r"\D", "", str(barcode))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM off_cache WHERE barcode=?", (barcode,)).fetchone()
+            self._conn.execute("DELETE FROM off_cache WHERE barcode=?", (barcode,))
+            self._conn.commit()
+            self._bytes -= old[0] if old else 0
+
+    def summary(self) -> dict:
+        """Snapshot of counters plus the current table size."""
+        with self._lock:
+            out = dict(self.stats)
+            served = out["hits"] + out["negative_hits"] + out["stale_hits"]
+            out["hit_rate"] = served / (served + out["misses"]) if served + out["misses"] else 0.0
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM off_cache").fetchone()
+            out["disk_items"], out["disk_bytes"] = count, size
+            return out
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_cache(db_path: str = OFF_CACHE_DB, base_url: str = OFF_BASE_URL) -> ProductCache:
+    """
+    Returns the process-wide product cache for this file: one per file, so there is a
+    single running size total. `base_url` only applies to the first call.
+    """
+    with _CACHES_LOCK:
+        if db_path not in _CACHES:
+            _CACHES[db_path] = ProductCache(db_path, base_url)
+        return _CACHES[db_path]
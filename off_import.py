@@ -0,0 +1,190 @@
+# off_import.py - Streams OpenFoodFacts product dumps into the local catalog (product_catalog.db)
+#
+# Usage (from the repo root):
+#   python off_import.py openfoodfacts-products.jsonl.gz           # full JSONL export
+#   python off_import.py en.openfoodfacts.org.products.csv.gz      # or the tab-separated CSV export
+#   python off_import.py delta/*.json.gz                           # later: just the daily delta files
+#
+# Dumps are read line by line (gzip is decompressed on the fly) and committed in chunks,
+# so memory stays flat however large the file. Only the fields get_product_details uses
+# are kept. The newest last_modified_t imported so far is remembered, separately for full
+# exports and for delta files (named openfoodfacts_products_<from>_<to>.json.gz); later
+# runs of the same kind skip every row modified before it (without parsing JSON rows in
+# full), which makes delta files and re-downloaded full dumps cheap to apply. A delta
+# imported before the first full export therefore does not hide the export's older rows.
+
+import argparse
+import csv
+import gzip
+import json
+import re
+import sys
+import time
+from datetime import datetime
+
+import catalog
+from db import connection, transaction
+from migrations import migrate
+
+
+# ---------- CONFIG & CONSTANTS ----------
+OFF_SOURCE = "openfoodfacts"
+DUMP_CHUNK_ROWS = 10000
+PROGRESS_EVERY_ROWS = 100000
+# Catalog field -> OpenFoodFacts fields, first non-empty wins (mirrors fetch_from_api)
+FIELD_MAP = {
+    "product_name": ("product_name", "product_name_en", "generic_name"),
+    "brand": ("brands",),
+    "quantity": ("quantity",),
+    "manufacturer": ("manufacturing_places", "brands"),
+    "country": ("countries",),
+}
+# ----------------------------------------
+
+_MODIFIED = re.compile(rb'"last_modified_t"\s*:\s*(\d+)')
+_DELTA_NAME = re.compile(r"_\d+_\d+\.json(\.gz)?$")
+_SOURCE_FIELDS = sorted({name for names in FIELD_MAP.values() for name in names} | {"code", "last_modified_t"})
+
+
+def _open(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+def is_jsonl(path: str) -> bool:
+    name = path[:-3] if path.endswith(".gz") else path
+    return name.endswith((".jsonl", ".json", ".ndjson"))
+
+def dump_kind(path: str) -> str:
+    """'delta' for OpenFoodFacts' daily delta files, 'full' for anything else."""
+    return "delta" if _DELTA_NAME.search(path) else "full"
+
+
+# ---------- READERS: (barcode, last_modified_t, {source field: value}) ----------
+def iter_jsonl(fh, modified_after: int = 0):
+    for line in fh:
+        # The timestamp is found without decoding the (often 10+ KB) product; nested
+        # objects carry their own, never newer than the product's
+        stamps = _MODIFIED.findall(line)
+        if stamps and max(int(stamp) for stamp in stamps) < modified_after:
+            yield None
+            continue
+        try:
+            product = json.loads(line)
+        except ValueError:
+            continue
+        code = product.get("code")
+        if code:
+            yield str(code), int(product.get("last_modified_t") or 0), product
+
+def iter_csv(fh, modified_after: int = 0):
+    # The CSV export is tab-separated and unquoted; quote characters are literal
+    csv.field_size_limit(2 ** 31 - 1)
+    rows = csv.reader((line.decode("utf-8", errors="replace") for line in fh), delimiter="\t", quoting=csv.QUOTE_NONE)
+    header = next(rows, [])
+    index = {name: header.index(name) for name in _SOURCE_FIELDS if name in header}
+    if "code" not in index:
+        raise ValueError("Not an OpenFoodFacts CSV export (no 'code' column)")
+    modified = index.get("last_modified_t")
+    for row in rows:
+        stamp = int(row[modified]) if modified is not None and modified < len(row) and row[modified].isdigit() else 0
+        if stamp and stamp < modified_after:
+            yield None
+            continue
+        product = {name: row[i] for name, i in index.items() if i < len(row)}
+        if product.get("code"):
+            yield product["code"], stamp, product
+# ----------------------------------------
+
+
+def project(product: dict) -> dict:
+    """OpenFoodFacts product -> catalog fields (see FIELD_MAP)."""
+    fields = {}
+    for field, names in FIELD_MAP.items():
+        for name in names:
+            value = product.get(name)
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value)
+            if value not in (None, ""):
+                fields[field] = str(value).strip()
+                break
+    return fields
+
+
+def modified_through(db_path: str = catalog.CATALOG_DB, kind: str = "full", source: str = OFF_SOURCE) -> int:
+    migrate(db_path, catalog.CATALOG_MIGRATIONS)
+    with connection(db_path) as conn:
+        row = conn.execute("SELECT modified_through FROM dump_imports WHERE source = ?", (f"{source}:{kind}",)).fetchone()
+    return row[0] if row and row[0] else 0
+
+
+def import_dump(path: str, db_path: str = catalog.CATALOG_DB, full: bool = False,
+                chunk_rows: int = DUMP_CHUNK_ROWS, progress=None) -> dict:
+    """
+    Imports one OpenFoodFacts JSONL or CSV export (optionally gzipped) into the catalog.
+    Rows modified before the last import of the same kind (see dump_kind) are skipped
+    unless `full`. Products that came from products.csv are never overwritten. The
+    high-water mark only advances once the whole file is in, so an interrupted import is
+    simply run again. Returns counters: read, imported, skipped, modified_through.
+    """
+    kind = dump_kind(path)
+    since = 0 if full else modified_through(db_path, kind)
+    reader = iter_jsonl if is_jsonl(path) else iter_csv
+    stats = {"read": 0, "imported": 0, "skipped": 0, "modified_through": since}
+    newest = since
+    batch = []
+
+    def commit():
+        with transaction(db_path) as conn:
+            catalog.upsert_products(conn, batch, OFF_SOURCE, 0, overwrite=False)
+        stats["imported"] += len(batch)
+        batch.clear()
+
+    with _open(path) as fh:
+        for item in reader(fh, since):
+            stats["read"] += 1
+            if progress and stats["read"] % PROGRESS_EVERY_ROWS == 0:
+                progress(stats)
+            if item is None:
+                stats["skipped"] += 1
+                continue
+            barcode, stamp, product = item
+            if not catalog.normalize_barcode(barcode):
+                continue
+            newest = max(newest, stamp)
+            batch.append((barcode, project(product)))
+            if len(batch) >= chunk_rows:
+                commit()
+        commit()
+
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT INTO dump_imports (source, modified_through, rows, files, imported_at) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT(source) DO UPDATE SET modified_through = MAX(COALESCE(modified_through, 0), excluded.modified_through), "
+            "rows = rows + excluded.rows, files = files + 1, imported_at = excluded.imported_at",
+            (f"{OFF_SOURCE}:{kind}", newest, stats["imported"], datetime.utcnow().isoformat())
+        )
+    stats["modified_through"] = max(since, newest)
+    return stats
+
+
+def main(argv=None) -> int:
+    from dashbroad import CATALOG_DB
+
+    parser = argparse.ArgumentParser(description="Import OpenFoodFacts JSONL/CSV exports into the local product catalog.")
+    parser.add_argument("dumps", nargs="+", help="Export files (.jsonl / .csv, optionally .gz), oldest first")
+    parser.add_argument("--db", default=CATALOG_DB)
+    parser.add_argument("--full", action="store_true", help="Re-import every row, not only those modified since the last import")
+    args = parser.parse_args(argv)
+
+    for path in args.dumps:
+        start = time.perf_counter()
+        since = modified_through(args.db, dump_kind(path)) if not args.full else 0
+        print(f"{path}: importing rows modified since {since} ({dump_kind(path)} dump)", file=sys.stderr)
+        stats = import_dump(path, args.db, full=args.full,
+                            progress=lambda s: print(f"  {s['read']} read, {s['imported']} imported", file=sys.stderr))
+        print(f"{path}: {stats['imported']} imported, {stats['skipped']} unchanged, of {stats['read']} rows "
+              f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# preprocess.py - Vectorized OpenCV/NumPy image preprocessing ahead of OCR
+
+import hashlib
+import json
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+# ---------- CONFIG & CONSTANTS ----------
+PREPROCESS_VERSION = 2  # Bump whenever a stage changes behaviour so cached OCR text is invalidated
+
+DEFAULT_PIPELINE = {
+    "grayscale": True,
+    "downscale": True,
+    "target_dpi": 300,           # Used when the image carries real DPI metadata...
+    "min_scan_dpi": 150,         # ...at least this much (phone and camera JPEGs say a nominal 72)
+    "target_text_height": 32,    # Otherwise: scale so the median glyph is ~this many pixels tall
+    "min_side": 600,             # Never shrink below this (pixels, shorter side)
+    "deskew": True,
+    "max_skew_degrees": 15.0,
+    "threshold": True,
+    "block_size": 31,            # Adaptive threshold neighbourhood (odd)
+    "threshold_c": 15,
+}
+
+# Cumulative stage order used by the benchmark: each step enables one more stage
+STAGES = ["grayscale", "downscale", "deskew", "threshold"]
+# ----------------------------------------
+
+
+def pipeline_version(config: dict = None) -> str:
+    """Stable identifier of a pipeline configuration, used in OCR cache keys."""
+    config = {**DEFAULT_PIPELINE, **(config or {})}
+    digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:10]
+    return f"v{PREPROCESS_VERSION}-{digest}"
+
+
+def to_array(img: Image.Image) -> np.ndarray:
+    """PIL image -> uint8 array (HxW for grayscale, HxWx3 RGB otherwise)."""
+    if img.mode == "L":
+        return np.asarray(img)
+    return np.asarray(img.convert("RGB"))
+
+
+def to_gray(arr: np.ndarray) -> np.ndarray:
+    return arr if arr.ndim == 2 else cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+
+
+def estimate_text_height(gray: np.ndarray) -> float:
+    """Median height of glyph-sized connected components, measured on a thumbnail for speed."""
+    h, w = gray.shape[:2]
+    factor = min(1.0, 1000.0 / max(h, w))
+    small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA) if factor < 1 else gray
+    _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    # Keep components shaped like characters: not specks, not lines or whole blocks
+    sh = small.shape[0]
+    mask = (heights >= 4) & (heights <= sh * 0.2) & (widths <= heights * 3)
+    if not mask.any():
+        return 0.0
+    return float(np.median(heights[mask])) / factor
+
+
+def downscale(arr: np.ndarray, config: dict, dpi=None) -> np.ndarray:
+    """Shrinks the image towards the target text size. Never upscales."""
+    h, w = arr.shape[:2]
+    scale = 1.0
+    if dpi and float(dpi) >= config["min_scan_dpi"]:
+        scale = config["target_dpi"] / float(dpi)
+    else:
+        text_h = estimate_text_height(to_gray(arr))
+        if text_h > 0:
+            scale = config["target_text_height"] / text_h
+    scale = max(scale, config["min_side"] / float(min(h, w)))
+    if scale >= 1.0:
+        return arr
+    return cv2.resize(arr, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def skew_angle(gray: np.ndarray) -> float:
+    """Dominant text angle in degrees from the minimum-area rectangle around ink pixels."""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(binary)
+    if coords is None or len(coords) < 50:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    # OpenCV >= 4.5 reports (0, 90]; older versions [-90, 0). Normalise to (-45, 45].
+    if angle < -45:
+        angle += 90
+    elif angle > 45:
+        angle -= 90
+    return float(angle)
+
+
+def deskew(gray: np.ndarray, config: dict) -> np.ndarray:
+    angle = skew_angle(gray)
+    if abs(angle) < 0.5 or abs(angle) > config["max_skew_degrees"]:
+        return gray
+    h, w = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def adaptive_threshold(gray: np.ndarray, config: dict) -> np.ndarray:
+    block = int(config["block_size"]) | 1
+    return cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block, config["threshold_c"]
+    )
+
+
+def preprocess_image(img: Image.Image, config: dict = None) -> Image.Image:
+    """
+    Runs the enabled stages (grayscale -> downscale -> deskew -> adaptive threshold)
+    and returns a PIL image ready for Tesseract.
+    """
+    config = {**DEFAULT_PIPELINE, **(config or {})}
+    arr = to_array(img)
+
+    if config["downscale"]:
+        arr = downscale(arr, config, dpi=(img.info.get("dpi") or (None,))[0])
+    if config["grayscale"] or config["deskew"] or config["threshold"]:
+        arr = to_gray(arr)
+    if config["deskew"]:
+        arr = deskew(arr, config)
+    if config["threshold"]:
+        arr = adaptive_threshold(arr, config)
+
+    return Image.fromarray(arr)
+
+
+def stage_configs() -> list:
+    """(name, config) pairs enabling the stages cumulatively, starting from a no-op pipeline."""
+    configs = [("raw", {stage: False for stage in STAGES})]
+    enabled = {}
+    for stage in STAGES:
+        enabled[stage] = True
+        cfg = {s: enabled.get(s, False) for s in STAGES}
+        configs.append(("+" + stage, cfg))
+    return configs
@@ -0,0 +1,87 @@
+# quantities.py - Canonical numeric net quantity / MRP parsed from the free-text record fields
+
+import re
+
+import pandas as pd
+
+
+# ---------- CONFIG & CONSTANTS ----------
+# unit spelling -> (unit class, factor to the class's base unit)
+UNITS = {
+    "mg": ("g", 0.001), "g": ("g", 1.0), "gm": ("g", 1.0), "gms": ("g", 1.0), "gram": ("g", 1.0), "grams": ("g", 1.0),
+    "kg": ("g", 1000.0), "kgs": ("g", 1000.0),
+    "ml": ("ml", 1.0), "l": ("ml", 1000.0), "ltr": ("ml", 1000.0), "litre": ("ml", 1000.0), "litres": ("ml", 1000.0),
+    "liter": ("ml", 1000.0), "liters": ("ml", 1000.0),
+    "pcs": ("pcs", 1.0), "pc": ("pcs", 1.0), "pack": ("pcs", 1.0), "packet": ("pcs", 1.0), "packets": ("pcs", 1.0),
+    "unit": ("pcs", 1.0), "units": ("pcs", 1.0), "nos": ("pcs", 1.0),
+}
+UNIT_CLASSES = ("g", "ml", "pcs")
+NUMERIC_COLUMNS = {"net_quantity_value": "REAL", "net_quantity_unit": "TEXT", "mrp_value": "REAL"}
+# ----------------------------------------
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?"
+# Optional multipack count ("4 x 125g"), amount, unit
+QUANTITY_PATTERN = re.compile(
+    rf"(?i)(?:(\d+)\s*[x×*]\s*)?({_NUMBER})\s*({'|'.join(sorted(UNITS, key=len, reverse=True))})\b"
+)
+MRP_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _to_float(number: str) -> float:
+    # "1,000" is a thousands separator, "1,5" a decimal comma
+    if re.fullmatch(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?", number):
+        return float(number.replace(",", ""))
+    return float(number.replace(",", "."))
+
+
+def parse_quantity(text):
+    """'5.00 kg' -> (5000.0, 'g'), '4 x 125g' -> (500.0, 'g'), '1 L' -> (1000.0, 'ml'). (None, None) if unparseable."""
+    if not text:
+        return None, None
+    match = QUANTITY_PATTERN.search(str(text))
+    if not match:
+        return None, None
+    unit_class, factor = UNITS[match.group(3).lower()]
+    value = _to_float(match.group(2)) * factor * (int(match.group(1)) if match.group(1) else 1)
+    return round(value, 6), unit_class
+
+
+def parse_mrp(text):
+    """'Rs. 1,299.00' -> 1299.0. None for missing values and placeholders like 'N/A (API)'."""
+    if not text:
+        return None
+    match = MRP_PATTERN.search(str(text))
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+def numeric_fields(details: dict) -> dict:
+    """The NUMERIC_COLUMNS values for one record's details."""
+    value, unit = parse_quantity(details.get("net_weight"))
+    return {"net_quantity_value": value, "net_quantity_unit": unit, "mrp_value": parse_mrp(details.get("mrp"))}
+
+
+def numeric_frame(net_weight: pd.Series, mrp: pd.Series) -> pd.DataFrame:
+    """numeric_fields over whole columns (bulk re-check and the schema backfill)."""
+    quantities = net_weight.map(parse_quantity)
+    return pd.DataFrame({
+        "net_quantity_value": quantities.str[0],
+        "net_quantity_unit": quantities.str[1],
+        "mrp_value": mrp.map(parse_mrp),
+    }, index=net_weight.index).astype(object).where(lambda df: df.notna(), None)
+
+
+def range_filter(mrp_min=None, mrp_max=None, unit=None, qty_min=None, qty_max=None):
+    """SQL WHERE fragment and params over the indexed numeric columns; ('', []) when unfiltered."""
+    clauses, params = [], []
+    for column, op, value in (("mrp_value", ">=", mrp_min), ("mrp_value", "<=", mrp_max)):
+        if value is not None:
+            clauses.append(f"{column} {op} ?")
+            params.append(float(value))
+    if unit:
+        clauses.append("net_quantity_unit = ?")
+        params.append(unit)
+        for op, value in ((">=", qty_min), ("<=", qty_max)):
+            if value is not None:
+                clauses.append(f"net_quantity_value {op} ?")
+                params.append(float(value))
+    return " AND ".join(clauses), params
@@ -0,0 +1,119 @@
+# queries.py - Keyset-paginated, SQL-filtered listings of records and complaints
+
+import threading
+import time
+
+import pandas as pd
+
+from db import connection
+
+
+# ---------- CONFIG & CONSTANTS ----------
+PAGE_SIZES = (50, 100, 250, 500)
+COUNT_TTL_SECONDS = 30.0  # Totals and filter options are cached this long unless invalidated by a write
+# ----------------------------------------
+
+
+# ---------- FILTERS ----------
+def prefix_bounds(prefix: str) -> tuple:
+    """[lo, hi) string range matching `prefix`, usable by an index (unlike LIKE)."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def build_filter(equals: dict = None, prefixes: dict = None, ranges: dict = None) -> tuple:
+    """
+    (where, params) for column filters; None values and empty ranges are ignored.
+    - equals: {column: value}
+    - prefixes: {column: text the value starts with}
+    - ranges: {column: (lo, hi)}, lo inclusive, hi exclusive, either may be None
+    Column names come from code, never from user input.
+    """
+    clauses, params = [], []
+    for column, value in (equals or {}).items():
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    for column, prefix in (prefixes or {}).items():
+        if prefix:
+            lo, hi = prefix_bounds(prefix)
+            clauses.append(f"{column} >= ? AND {column} < ?")
+            params += [lo, hi]
+    for column, (lo, hi) in (ranges or {}).items():
+        if lo is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(lo)
+        if hi is not None:
+            clauses.append(f"{column} < ?")
+            params.append(hi)
+    return " AND ".join(clauses), params
+
+def combine(*filters) -> tuple:
+    """ANDs several (where, params) pairs."""
+    clauses, params = [], []
+    for where, p in filters:
+        if where:
+            clauses.append(f"({where})")
+            params += list(p)
+    return " AND ".join(clauses), params
+# ----------------------------------------
+
+
+# ---------- PAGES ----------
+def fetch_page(db_path: str, table: str, columns: str, order_col: str, where: str = "", params=(),
+               after: tuple = None, page_size: int = PAGE_SIZES[1]) -> tuple:
+    """
+    One page of `table`, newest first by (order_col, id). `after` is the cursor returned
+    with the previous page; the query seeks straight to it through the order_col index
+    instead of skipping OFFSET rows. Returns (DataFrame, cursor for the next page or None).
+    """
+    clauses = [where] if where else []
+    params = list(params)
+    if after is not None:
+        clauses.append(f"({order_col}, id) < (?, ?)")
+        params += list(after)
+    sql = (f"SELECT {columns} FROM {table} {'WHERE ' + ' AND '.join(clauses) if clauses else ''} "
+           f"ORDER BY {order_col} DESC, id DESC LIMIT ?")
+    with connection(db_path) as conn:
+        df = pd.read_sql_query(sql, conn, params=params + [page_size + 1])
+    if len(df) <= page_size:
+        return df, None
+    df = df.iloc[:page_size]
+    last = df.iloc[-1]
+    return df, (last[order_col], int(last["id"]))
+
+
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+def _cached(key, compute):
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit and now - hit[0] < COUNT_TTL_SECONDS:
+            return hit[1]
+    value = compute()
+    with _CACHE_LOCK:
+        _CACHE[key] = (now, value)
+    return value
+
+def count_rows(db_path: str, table: str, where: str = "", params=()) -> int:
+    """Total rows matching the filter, cached per filter for COUNT_TTL_SECONDS."""
+    def compute():
+        with connection(db_path) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table} {'WHERE ' + where if where else ''}", list(params)).fetchone()[0]
+    return _cached(("count", db_path, table, where, tuple(params)), compute)
+
+def distinct_values(db_path: str, table: str, column: str) -> list:
+    """Sorted non-empty values of a column (for filter dropdowns), cached like count_rows."""
+    def compute():
+        with connection(db_path) as conn:
+            rows = conn.execute(f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column}")
+            return [row[0] for row in rows if row[0]]
+    return _cached(("distinct", db_path, table, column), compute)
+
+def invalidate_counts(db_path: str = None, table: str = None):
+    """Drops cached totals / filter options after a write (all of them if no table is given)."""
+    with _CACHE_LOCK:
+        for key in list(_CACHE):
+            if (db_path is None or key[1] == db_path) and (table is None or key[2] == table):
+                del _CACHE[key]
+# ----------------------------------------
@@ -0,0 +1,109 @@
+# recheck.py - Vectorized bulk re-evaluation of stored records when the rule set changes
+#
+# Usage (from the repo root):
+#   python recheck.py [--chunk 50000]
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from db import connection, write_transaction
+from quantities import NUMERIC_COLUMNS, numeric_frame
+from rules import RULESET_VERSION, compliance_status, get_rules
+
+
+# ---------- CONFIG & CONSTANTS ----------
+CHUNK_SIZE = 50000
+# Barcode records merge API values into the result after the regex pass, so their
+# stored fields cannot be rebuilt from raw_text alone.
+STALE_FILTER = "(rule_version IS NULL OR rule_version < ?) AND COALESCE(source_type, '') NOT LIKE 'Barcode%'"
+# ----------------------------------------
+
+
+def evaluate_series(raw_text: pd.Series, version: int = None) -> pd.DataFrame:
+    """Series equivalent of rules.evaluate plus the compliance status, one column per field."""
+    text = raw_text.fillna("").astype(object)
+    out = pd.DataFrame(index=text.index)
+    status_parts = pd.Series("", index=text.index, dtype=object)
+
+    for rule in get_rules(version):
+        if rule.flag:
+            values = text.str.contains(rule.pattern, regex=True, na=False)
+            missing = ~values
+        else:
+            extracted = text.str.extract(rule.pattern, expand=True)[rule.group - 1]
+            values = rule.vclean(extracted)
+            if rule.fallback is not None:
+                fallback = text.str.extract(rule.fallback, expand=True)[0].str.strip()
+                values = values.where(extracted.notna(), fallback)
+            values = values.astype(object).where(values.notna(), None)
+            missing = values.isna() | (values == "")
+        out[rule.name] = values
+        status_parts += np.where(missing, rule.label + ", ", "")
+
+    status_parts = status_parts.str[:-2]
+    out["compliance_status"] = np.where(status_parts == "", compliance_status([]),
+                                        "❌ NON-COMPLIANT: Missing " + status_parts)
+    return out
+
+
+def count_stale(db_path: str, version: int = RULESET_VERSION) -> int:
+    with connection(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM records WHERE {STALE_FILTER}", (version,)).fetchone()[0]
+
+
+def recheck_records(db_path: str, chunk_size: int = CHUNK_SIZE, version: int = RULESET_VERSION, progress=None) -> int:
+    """
+    Re-evaluates every stale record in keyset-ordered chunks, one transaction per chunk.
+    `progress(done)` is called after each chunk. Returns the number of rows updated.
+    """
+    fields = [rule.name for rule in get_rules(version)] + list(NUMERIC_COLUMNS)
+    assignments = ", ".join(f"{f}=?" for f in fields + ["compliance_status", "rule_version"])
+    done = 0
+    last_id = 0
+    with connection(db_path) as conn:
+        while True:
+            chunk = pd.read_sql_query(
+                f"SELECT id, raw_text FROM records WHERE id > ? AND {STALE_FILTER} ORDER BY id LIMIT ?",
+                conn, params=(last_id, version, chunk_size)
+            )
+            if chunk.empty:
+                break
+            result = evaluate_series(chunk["raw_text"], version)
+            result["inclusive_of_all_taxes"] = result["inclusive_of_all_taxes"].astype(int)
+            result = result.join(numeric_frame(result["net_weight"], result["mrp"]))
+            result["rule_version"] = version
+            result["id"] = chunk["id"]
+            rows = result[fields + ["compliance_status", "rule_version", "id"]].itertuples(index=False, name=None)
+            with write_transaction(conn):
+                conn.executemany(f"UPDATE records SET {assignments} WHERE id=?", rows)
+            done += len(chunk)
+            last_id = int(chunk["id"].iloc[-1])
+            if progress:
+                progress(done)
+    return done
+
+
+def main(argv=None) -> int:
+    from dashbroad import DB_PATH, init_storage
+
+    parser = argparse.ArgumentParser(description="Re-evaluate stored records against the current rule set.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.db == DB_PATH:
+        init_storage()
+    stale = count_stale(args.db)
+    print(f"{stale} records older than rule set v{RULESET_VERSION}", file=sys.stderr)
+    start = time.perf_counter()
+    updated = recheck_records(args.db, args.chunk, progress=lambda n: print(f"  {n}/{stale}", file=sys.stderr))
+    print(f"Updated {updated} records in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
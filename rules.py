@@ -0,0 +1,206 @@
+# rules.py - Declarative, precompiled field-extraction rules shared by the OCR, barcode and scraping paths
+
+import re
+
+
+# ---------- FIELD CLEAN-UP ----------
+def _clean_product_name(value):
+    return re.sub(r'\s+', ' ', value.strip()).split('\n')[0]
+
+def _clean_mrp(value):
+    return value.strip().replace(',', '')
+
+def _clean_manufacturer(value):
+    manu = value.strip().replace("\n", " ")
+    manu = re.sub(r"\s{2,}", " ", manu)
+    return manu.split('Address:')[0].strip()
+
+def _strip(value):
+    return value.strip()
+
+# Vectorised equivalents over a pandas string Series (used by the bulk re-check)
+def _vclean_product_name(values):
+    return values.str.strip().str.replace(r'\s+', ' ', regex=True)
+
+def _vclean_mrp(values):
+    return values.str.strip().str.replace(',', '', regex=False)
+
+def _vclean_manufacturer(values):
+    manu = values.str.strip().str.replace("\n", " ", regex=False)
+    manu = manu.str.replace(r"\s{2,}", " ", regex=True)
+    return manu.str.split('Address:', n=1, regex=False).str[0].str.strip()
+
+def _vstrip(values):
+    return values.str.strip()
+# ----------------------------------------
+
+
+class FieldRule:
+    """
+    One mandatory label field.
+    - pattern: precompiled regex; `group` holds the value (or presence only, if `flag`)
+    - prefixes: lower-case literals every pattern match starts with. They let the
+      evaluator skip fields whose keywords are absent and start searching at the
+      first keyword instead of offset 0, without changing the result.
+    - fallback: optional keyword-less pattern tried when the main one finds nothing
+    - vclean: Series version of `clean`, must produce identical values
+    """
+
+    __slots__ = ("name", "label", "pattern", "group", "prefixes", "clean", "vclean", "flag", "fallback")
+
+    def __init__(self, name, label, pattern, prefixes, group=1, clean=_strip, vclean=_vstrip, flag=False, fallback=None):
+        self.name = name
+        self.label = label
+        self.pattern = re.compile(pattern)
+        self.group = group
+        self.prefixes = tuple(prefixes)
+        self.clean = clean
+        self.vclean = vclean
+        self.flag = flag
+        self.fallback = re.compile(fallback[0], fallback[1]) if fallback else None
+
+    def revise(self, pattern=None, fallback=None):
+        """Copy of this rule with a new pattern and/or fallback (for the next rule-set version)."""
+        rule = FieldRule.__new__(FieldRule)
+        for attr in self.__slots__:
+            setattr(rule, attr, getattr(self, attr))
+        if pattern is not None:
+            rule.pattern = re.compile(pattern)
+        if fallback is not None:
+            rule.fallback = re.compile(fallback[0], fallback[1])
+        return rule
+
+
+# ---------- RULE SETS ----------
+# Bump RULESET_VERSION (and add a new entry) whenever extraction behaviour changes,
+# so stored records can be recognised as stale and re-evaluated.
+RULES_V1 = [
+    FieldRule(
+        "product_name", "Product Name",
+        r"(?is)(?:Product(?: Name)?|Item|Description)\s*[:\s]*\s*(.+?)(?:\n|MRP|NET|WT|WGT|Qty|Manufacturer|\Z)",
+        prefixes=("product", "item", "description"),
+        clean=_clean_product_name,
+        vclean=_vclean_product_name,
+        fallback=(r"(?i)^[\s\W]*([A-Za-z][A-Za-z0-9 ,\-]{2,80})", re.MULTILINE),
+    ),
+    FieldRule(
+        "net_weight", "Net Quantity",
+        r"(?i)(?:NET\s*WT|NET\s*WGT|NET\s*WEIGHT|NET\s*QTY|NET|Qty|Quantity|Weight)[^\n]*?(\d+[\s\.]*\d*\s*(?:g|kg|gm|ml|l|pcs|pack|packet|units|KG))",
+        prefixes=("net", "qty", "quantity", "weight"),
+    ),
+    FieldRule(
+        "mrp", "MRP",
+        r"(?i)(?:MRP|Maximum\s*Retail\s*Price|Price|Rs\.?)(?:[^0-9\n]*)([\d,]*\.?\d+)",
+        prefixes=("mrp", "maximum", "price", "rs"),
+        clean=_clean_mrp,
+        vclean=_vclean_mrp,
+    ),
+    FieldRule(
+        "inclusive_of_all_taxes", "Taxes Included",
+        r"(?i)(?:inclusive\s*of\s*all\s*taxes|Incl\.?\s*All\s*Taxes)",
+        prefixes=("incl",),
+        flag=True,
+    ),
+    FieldRule(
+        "mfg_date", "Manufacture Date",
+        r"(?i)(?:Mfg|Mfd|Manufactured\s*on|Mfg\.?|MFG\s*Date)[\s:/-]*(\d{1,4}[/.-]\d{1,4}[/.-]?\d{0,4})",
+        prefixes=("mfg", "mfd", "manufactured"),
+    ),
+    FieldRule(
+        "country_of_origin", "Country of Origin",
+        r"(?i)Country\s*of\s*Origin[:\s]*([A-Za-z\s,]+)(?:\n|Importer|Manufacturer|\Z)",
+        prefixes=("country",),
+    ),
+    FieldRule(
+        "manufacturer", "Manufacturer Details",
+        r"(?is)(?:Manufacturer|Manufactured\s*By|Packed\s*&\s*Marketed\s*by|Mfg\s*By|Importer|Marketer|Seller|Mfg:)\s*[:\s\-]*\s*(.+?)(?:For\s*Consumer\s*Complaints|\n{2,}|Phone:|Tel:|Email:|Customer|Net Qty|MRP|$)",
+        prefixes=("manufacture", "packed", "mfg", "importer", "marketer", "seller"),
+        clean=_clean_manufacturer,
+        vclean=_vclean_manufacturer,
+    ),
+]
+
+# V2: hardened against pathological OCR text. The V1 net weight, MRP and country patterns
+# backtrack polynomially on long digit / whitespace runs (a few hundred characters of OCR
+# noise took seconds). Each V2 match attempt starts at a keyword and does bounded work:
+# - numbers are only tried at the start of a digit run (?<!\d) and matched atomically (?>...)
+# - the gap between keyword and value is capped, so repeated keywords on one long line
+#   no longer rescan the rest of the line each time
+# - separator runs are atomic and the country capture is bounded
+# - the keyword-less product name fallback skips leading blanks / punctuation within one
+#   line only: V1's ^[\s\W]* also crossed newlines, so every line start rescanned the rest
+#   of a blank or punctuation run (quadratic on OCR output that is mostly empty lines)
+# The other fields already match in linear time and keep their V1 patterns.
+RULES_V2 = [
+    RULES_V1[0].revise(
+        fallback=(r"(?i)^[^\S\n]*[^\w\n]{0,20}([A-Za-z][A-Za-z0-9 ,\-]{2,80})", re.MULTILINE)
+    ),
+    RULES_V1[1].revise(
+        r"(?i)(?:NET\s*WT|NET\s*WGT|NET\s*WEIGHT|NET\s*QTY|NET|Qty|Quantity|Weight)[^\n]{0,200}?(?<!\d)((?>\d+[\s\.]*\d*\s*)(?:g|kg|gm|ml|l|pcs|pack|packet|units|KG))"
+    ),
+    RULES_V1[2].revise(
+        r"(?i)(?:MRP|Maximum\s*Retail\s*Price|Price|Rs\.?)(?:[^0-9\n]{0,200})([\d,]*\.?\d+)"
+    ),
+    RULES_V1[3],
+    RULES_V1[4],
+    RULES_V1[5].revise(
+        r"(?i)Country\s*of\s*Origin(?>[:\s]*)([A-Za-z\s,]{1,200})(?:\n|Importer|Manufacturer|\Z)"
+    ),
+    RULES_V1[6],
+]
+
+RULESETS = {1: RULES_V1, 2: RULES_V2}
+RULESET_VERSION = 2
+
+# Patterns the scraper applies to raw page source (quantity anchored to digit-run starts as in V2)
+SCRAPE_QUANTITY = re.compile(r'(?<!\d)((?>\d+\s*)(g|ml|kg|L|pcs))', re.IGNORECASE)
+SCRAPE_MANUFACTURER = re.compile(
+    r"(?is)(?:Manufactured\s*By|Packed\s*By|Importer|Marketer|Seller|Address|Marketed\s*By)\s*[:\s\-]*\s*(.+?)(?:\s{2,}|<br>|<BR>|<div|<span|</p>|\Z)"
+)
+# ----------------------------------------
+
+
+# ---------- EVALUATOR ----------
+def get_rules(version: int = None) -> list:
+    return RULESETS[version or RULESET_VERSION]
+
+def evaluate(raw_text: str, version: int = None) -> dict:
+    """Extracts every field of the rule set from raw_text. Missing fields are None (False for flags)."""
+    lower = raw_text.lower()
+    # str.lower() can change length for a few exotic characters; offsets are only reusable if it doesn't
+    offsets_valid = len(lower) == len(raw_text)
+    details = {}
+    for rule in get_rules(version):
+        starts = [pos for pos in (lower.find(p) for p in rule.prefixes) if pos >= 0]
+        match = None
+        if starts:
+            match = rule.pattern.search(raw_text, min(starts) if offsets_valid else 0)
+        if rule.flag:
+            details[rule.name] = bool(match)
+            continue
+        if match:
+            details[rule.name] = rule.clean(match.group(rule.group))
+        elif rule.fallback:
+            fallback = rule.fallback.search(raw_text)
+            details[rule.name] = fallback.group(1).strip() if fallback else None
+        else:
+            details[rule.name] = None
+    return details
+
+def missing_fields(details: dict, version: int = None, empty_values=(), labels: dict = None) -> list:
+    """Labels of the fields that are falsy (or in `empty_values`, e.g. 'N/A'), in rule order."""
+    labels = labels or {}
+    missing = []
+    for rule in get_rules(version):
+        value = details.get(rule.name)
+        if not value or (empty_values and value in empty_values):
+            missing.append(labels.get(rule.name, rule.label))
+    return missing
+
+def compliance_status(missing: list) -> str:
+    return "✅ COMPLIANT" if not missing else f"❌ NON-COMPLIANT: Missing {', '.join(missing)}"
+
+def field_keywords(version: int = None) -> dict:
+    """Keyword prefixes per field, e.g. to locate where a missing field should be on the label."""
+    return {rule.name: rule.prefixes for rule in get_rules(version)}
+# ----------------------------------------
@@ -0,0 +1,81 @@
+# search.py - Ranked full-text search over records (FTS5 index maintained by triggers, see migrations.py)
+
+import re
+
+import pandas as pd
+
+from db import connection, transaction
+
+
+# ---------- CONFIG & CONSTANTS ----------
+# bm25 weights of the records_fts columns (product_name, manufacturer, raw_text):
+# a hit in the name outranks one buried in the OCR text
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+RANK_CANDIDATES = 5000  # Very broad terms rank only their newest this-many matches (bm25 is computed per candidate)
+SNIPPET_TOKENS = 12  # Words of raw_text context shown around the hits
+HIGHLIGHT = ("\x02", "\x03")  # Hit markers; control characters never occur in stored text, so callers can swap in their own markup
+# ----------------------------------------
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(text: str) -> str:
+    """
+    Free text -> FTS5 MATCH expression: every word must occur, the last one as a prefix
+    (so results appear while typing). Words are quoted, so FTS syntax characters and
+    keywords (AND, OR, NEAR, -, ...) in user input are searched for literally.
+    Returns '' if the text has no searchable words.
+    """
+    terms = _TERM.findall(text or "")
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_records(db_path: str, text: str, limit: int = 50, columns: str = "r.id, r.username, r.source_type, r.compliance_status, r.created_at") -> pd.DataFrame:
+    """
+    Best `limit` matches for `text`, best first. Besides `columns` (of records, aliased r),
+    each row has score (bm25, lower is better), product_name / manufacturer with hits
+    wrapped in HIGHLIGHT, and a raw_text snippet around the hits.
+    Terms matching more than RANK_CANDIDATES records are ranked among the newest
+    RANK_CANDIDATES of them, keeping every search fast however common the word.
+    """
+    expression = match_expression(text)
+    if not expression:
+        return pd.DataFrame()
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    start, end = HIGHLIGHT
+    sql = f"""
+        SELECT {columns},
+               bm25(records_fts, {weights}) AS score,
+               highlight(records_fts, 0, '{start}', '{end}') AS product_name,
+               highlight(records_fts, 1, '{start}', '{end}') AS manufacturer,
+               snippet(records_fts, 2, '{start}', '{end}', '…', {SNIPPET_TOKENS}) AS snippet
+        FROM records_fts JOIN records r ON r.id = records_fts.rowid
+        WHERE records_fts MATCH ? AND records_fts.rowid >= ?
+        ORDER BY score
+        LIMIT ?
+    """
+    with connection(db_path) as conn:
+        # Walking the doclist newest-first is cheap; scoring all of it is not
+        cutoff = conn.execute(
+            "SELECT rowid FROM records_fts WHERE records_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+            (expression, RANK_CANDIDATES - 1)
+        ).fetchone()
+        return pd.read_sql_query(sql, conn, params=(expression, cutoff[0] if cutoff else 0, limit))
+
+
+def count_matches(db_path: str, text: str) -> int:
+    expression = match_expression(text)
+    if not expression:
+        return 0
+    with connection(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM records_fts WHERE records_fts MATCH ?", (expression,)).fetchone()[0]
+
+
+def rebuild_index(db_path: str):
+    """Re-indexes every record from scratch (after bulk edits made with the triggers disabled, or to compact)."""
+    with transaction(db_path) as conn:
+        conn.execute("INSERT INTO records_fts(records_fts) VALUES ('rebuild')")
@@ -0,0 +1,56 @@
+# tests/test_dedupe.py - Repeat-scan detection (dedupe.py)
+
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+import dedupe
+from csv_mirror import CSVMirror
+from db import transaction
+from migrations import migrate
+
+
+LABEL_A = {"product_name": "Spicy Masala Chips", "net_weight": "50 g", "mrp": "20", "inclusive_of_all_taxes": True,
+           "mfg_date": "01/2024", "country_of_origin": "India", "manufacturer": "ABC Foods", "compliance_status": "✅ COMPLIANT"}
+LABEL_B = {"product_name": "Salted Peanuts", "net_weight": "100 g", "mrp": "35", "inclusive_of_all_taxes": True,
+           "mfg_date": "02/2024", "country_of_origin": "India", "manufacturer": "XYZ Ltd", "compliance_status": "✅ COMPLIANT"}
+
+
+def _save(db_path, user_id, details):
+    with transaction(db_path) as conn:
+        cursor = conn.execute("INSERT INTO records (user_id, product_name, created_at) VALUES (?, ?, ?)",
+                              (user_id, details["product_name"], datetime.utcnow().isoformat()))
+        dedupe.add_fingerprint(conn, cursor.lastrowid, details)
+        return cursor.lastrowid
+
+
+def test_near_image_is_only_a_candidate(tmp_path):
+    db_path = str(tmp_path / "records.db")
+    migrate(db_path)
+    record_id = _save(db_path, 1, dict(LABEL_A, image_hash=0x0123456789ABCDEF))
+    near = 0x0123456789ABCDEF ^ 0b11  # 2 bits apart: same label layout, another product
+    with transaction(db_path) as conn:
+        assert dedupe.find_duplicate(conn, 1, dict(LABEL_B, image_hash=near)) is None
+        assert dedupe.find_duplicate(conn, 1, dict(LABEL_A, image_hash=near)) == record_id
+        assert dedupe.find_duplicate(conn, 2, dict(LABEL_A, image_hash=near)) is None  # another user's scans
+
+
+def test_fingerprint_survives_csv_round_trip(tmp_path):
+    path = str(tmp_path / "products.csv")
+    columns = list(dedupe.FINGERPRINT_FIELDS)
+    CSVMirror(path, columns).append([LABEL_A, dict(LABEL_B, inclusive_of_all_taxes=False)])
+    rows = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")  # as camera.py reads it back
+    assert rows[0]["inclusive_of_all_taxes"] == "True"
+    assert [dedupe.text_fingerprint(row) for row in rows] == [
+        dedupe.text_fingerprint(LABEL_A), dedupe.text_fingerprint(dict(LABEL_B, inclusive_of_all_taxes=False))
+    ]
+
+
+def test_fingerprint_survives_records_round_trip(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "records.db"))
+    conn.execute(f"CREATE TABLE records ({', '.join(dedupe.FINGERPRINT_FIELDS)})")
+    conn.execute(f"INSERT INTO records VALUES ({', '.join('?' * len(dedupe.FINGERPRINT_FIELDS))})",
+                 [1 if LABEL_A[field] is True else LABEL_A[field] for field in dedupe.FINGERPRINT_FIELDS])
+    row = pd.read_sql_query("SELECT * FROM records", conn).to_dict("records")[0]  # as migration 8 reads it back
+    assert dedupe.text_fingerprint(row) == dedupe.text_fingerprint(LABEL_A)
@@ -0,0 +1,39 @@
+# tests/test_preprocess.py - OCR preprocessing (preprocess.py)
+
+import io
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from preprocess import DEFAULT_PIPELINE, downscale, preprocess_image
+
+
+def _photo(width=4000, height=3000, dpi=72) -> Image.Image:
+    """A phone-sized label photo with ~100 px tall text, saved as a JPEG claiming `dpi`."""
+    arr = np.full((height, width), 255, dtype=np.uint8)
+    for row in range(6):
+        cv2.putText(arr, "NET WT 500 g MRP Rs 120", (150, 400 + row * 400), cv2.FONT_HERSHEY_SIMPLEX, 4, 0, 10)
+    buf = io.BytesIO()
+    Image.fromarray(arr).save(buf, format="JPEG", dpi=(dpi, dpi))
+    return Image.open(io.BytesIO(buf.getvalue()))
+
+
+def test_nominal_camera_dpi_is_ignored():
+    img = _photo(dpi=72)
+    assert img.info["dpi"][0] == 72
+    out = downscale(np.asarray(img), DEFAULT_PIPELINE, dpi=72)
+    assert max(out.shape) < 4000  # sized from the text height instead of 300 / 72 > 1
+    assert min(out.shape) >= DEFAULT_PIPELINE["min_side"]
+
+
+def test_preprocess_shrinks_72_dpi_photo():
+    img = _photo(dpi=72)
+    out = preprocess_image(img, {"deskew": False, "threshold": False})
+    assert out.width < img.width and out.height < img.height
+
+
+def test_real_scan_dpi_is_used():
+    arr = np.asarray(_photo(dpi=600))
+    out = downscale(arr, DEFAULT_PIPELINE, dpi=600)
+    assert out.shape[1] == 2000  # 300 / 600
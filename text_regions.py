@@ -0,0 +1,123 @@
+# text_regions.py - Morphology/contour text-block detection so only label regions are OCR'd
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ocr_engine import OCR_LANG, OCR_PSM
+from preprocess import DEFAULT_PIPELINE, adaptive_threshold, estimate_text_height, preprocess_image, to_array, to_gray
+
+
+# ---------- CONFIG & CONSTANTS ----------
+DETECT_MAX_SIDE = 1200      # Detection runs on a thumbnail of at most this size
+MIN_REGION_FRACTION = 0.0001
+MAX_COVERAGE = 0.85         # If text covers more than this, cropping saves nothing - OCR the whole image
+ROW_OVERLAP = 0.6           # Blocks sharing this much of a row are merged (label / value columns)
+# ----------------------------------------
+
+
+def merge_rects(rects: list, gap: int) -> list:
+    """Unions rectangles that touch (after growing by `gap`) or sit on the same text row."""
+    rects = [list(r) for r in rects]
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        while rects:
+            x, y, w, h = rects.pop()
+            i = 0
+            while i < len(rects):
+                ox, oy, ow, oh = rects[i]
+                touches = (x - gap < ox + ow and ox - gap < x + w and y - gap < oy + oh and oy - gap < y + h)
+                v_overlap = min(y + h, oy + oh) - max(y, oy)
+                same_row = v_overlap > ROW_OVERLAP * min(h, oh)
+                if touches or same_row:
+                    nx, ny = min(x, ox), min(y, oy)
+                    w, h = max(x + w, ox + ow) - nx, max(y + h, oy + oh) - ny
+                    x, y = nx, ny
+                    rects.pop(i)
+                    merged = True
+                else:
+                    i += 1
+            out.append([x, y, w, h])
+        rects = out
+    return [tuple(r) for r in rects]
+
+
+def find_text_regions(gray: np.ndarray) -> list:
+    """
+    Returns text-block rectangles (x, y, w, h) in `gray` coordinates, in reading order.
+    Characters light up in the morphological gradient; closing with kernels sized
+    from the estimated glyph height joins them into lines and then blocks.
+    """
+    h, w = gray.shape[:2]
+    factor = min(1.0, DETECT_MAX_SIDE / float(max(h, w)))
+    small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA) if factor < 1 else gray
+    sh, sw = small.shape[:2]
+
+    text_h = estimate_text_height(small) or 12.0
+    grad = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # Drop long straight edges (label borders, shelf lines) so they don't enclose everything
+    rule_len = max(10, int(text_h * 6))
+    rules = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (rule_len, 1)))
+    rules |= cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, rule_len)))
+    binary = cv2.subtract(binary, rules)
+    line_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, int(text_h * 1.5)), max(1, int(text_h * 0.3))))
+    block_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(1, int(text_h * 0.8))))
+    closed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, line_kernel)
+    closed = cv2.morphologyEx(closed, cv2.MORPH_CLOSE, block_kernel)
+
+    contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    rects = []
+    min_area = MIN_REGION_FRACTION * sh * sw
+    for contour in contours:
+        x, y, rw, rh = cv2.boundingRect(contour)
+        if rw * rh < min_area or rh < text_h * 0.5 or rw < text_h:
+            continue
+        # Text has a moderate edge density; flat packaging art and dense texture do not
+        density = cv2.countNonZero(binary[y:y + rh, x:x + rw]) / float(rw * rh)
+        if not 0.08 <= density <= 0.9:
+            continue
+        rects.append((x, y, rw, rh))
+
+    rects = merge_rects(rects, gap=int(text_h))
+    pad = int(text_h * 0.5)
+    out = []
+    for x, y, rw, rh in rects:
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        x1, y1 = min(sw, x + rw + pad), min(sh, y + rh + pad)
+        out.append((int(x0 / factor), int(y0 / factor), int((x1 - x0) / factor), int((y1 - y0) / factor)))
+    out.sort(key=lambda r: (r[1] // max(1, int(text_h / factor)), r[0]))
+    return out
+
+
+def crop_text_regions(img: Image.Image, detect_on: Image.Image = None) -> list:
+    """
+    Crops `img` to its text blocks, detected on `detect_on` if given (an image with the
+    same geometry, e.g. the pre-threshold grayscale). Returns [img] when cropping would not help.
+    """
+    gray = to_gray(to_array(detect_on if detect_on is not None else img))
+    regions = find_text_regions(gray)
+    covered = sum(w * h for _, _, w, h in regions)
+    if not regions or covered > MAX_COVERAGE * img.width * img.height:
+        return [img]
+    return [img.crop((x, y, x + w, y + h)) for x, y, w, h in regions]
+
+
+def stitch_texts(texts: list) -> str:
+    """Joins per-region OCR output in reading order, one line break between regions."""
+    return "\n".join(t.strip() for t in texts if t and t.strip())
+
+
+def ocr_by_regions(img: Image.Image, engine, config: dict = None, lang: str = OCR_LANG, psm: int = OCR_PSM) -> str:
+    """
+    Preprocesses `img`, OCRs each detected text block in parallel on the engine pool
+    and stitches the pieces back into one raw_text.
+    """
+    config = {**DEFAULT_PIPELINE, **(config or {})}
+    # Regions are found on the grayscale; adaptive thresholding turns background texture into noise
+    base = preprocess_image(img, {**config, "threshold": False})
+    final = Image.fromarray(adaptive_threshold(to_gray(to_array(base)), config)) if config["threshold"] else base
+    crops = crop_text_regions(final, detect_on=base)
+    return stitch_texts(engine.map(crops, lang, psm))
@@ -0,0 +1,166 @@
+# write_behind.py - Background writer thread that commits queued records in groups
+
+import atexit
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+# ---------- CONFIG & CONSTANTS ----------
+GROUP_MAX_ITEMS = 200         # Commit as soon as this many items are waiting...
+GROUP_WINDOW_SECONDS = 0.05   # ...or this long after the first item of the group arrived...
+GROUP_IDLE_SECONDS = 0.005    # ...or when no further item has arrived for this long
+QUEUE_CAPACITY = 5000         # Producers block (back-pressure) once this many items are pending
+SUBMIT_TIMEOUT_SECONDS = 30.0 # ...and give up with queue.Full after waiting this long
+LATENCY_SAMPLES = 1000        # Recent groups kept for the latency percentiles
+# ----------------------------------------
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Items submitted from any thread are committed by one writer thread in groups, so a
+    burst of N saves costs a handful of transactions instead of N, and the
+    caller does not wait for the disk. `commit(items)` runs on the writer thread and returns
+    one result per item (e.g. the new row ids); each submit() gets Futures for those results.
+
+    Durability: an item is on disk once its Future is done. close() (registered at exit by
+    get_writer) commits everything still queued; a hard kill loses at most the pending items.
+    """
+
+    def __init__(self, commit, max_items: int = GROUP_MAX_ITEMS, window: float = GROUP_WINDOW_SECONDS,
+                 idle: float = GROUP_IDLE_SECONDS, capacity: int = QUEUE_CAPACITY, name: str = "write-behind"):
+        self._commit = commit
+        self.max_items = max(1, int(max_items))
+        self.window = window
+        self.idle = idle
+        self._queue = queue.Queue(maxsize=max(1, int(capacity)))
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"submitted": 0, "committed": 0, "failed": 0, "groups": 0, "blocked_submits": 0, "max_depth": 0}
+        self._commit_seconds = deque(maxlen=LATENCY_SAMPLES)  # per group: time inside commit()
+        self._wait_seconds = deque(maxlen=LATENCY_SAMPLES)    # per group: oldest item's submit -> durable
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ---------- producer side ----------
+    def submit(self, items: list, timeout: float = SUBMIT_TIMEOUT_SECONDS) -> list:
+        """
+        Queues `items`; returns a Future per item. Blocks while the queue is full and raises
+        queue.Full after `timeout` (items queued before that are still committed).
+        """
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        futures = []
+        for item in items:
+            future = Future()
+            entry = (item, future, time.perf_counter())
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                with self._lock:
+                    self.stats["blocked_submits"] += 1
+                self._queue.put(entry, timeout=timeout)
+            futures.append(future)
+        with self._lock:
+            self.stats["submitted"] += len(futures)
+            self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+        return futures
+
+    def flush(self):
+        """Blocks until everything submitted so far is committed (or failed)."""
+        self._queue.join()
+
+    def close(self):
+        """Commits what is still queued and stops the writer thread. Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    # ---------- writer thread ----------
+    def _next_group(self) -> tuple:
+        entry = self._queue.get()
+        if entry is _STOP:
+            return [], True
+        group = [entry]
+        deadline = time.perf_counter() + self.window
+        while len(group) < self.max_items:
+            remaining = min(deadline - time.perf_counter(), self.idle)
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return group, True
+            group.append(entry)
+        return group, False
+
+    def _commit_group(self, group: list):
+        start = time.perf_counter()
+        try:
+            results = self._commit([item for item, _, _ in group])
+        except Exception as e:
+            if len(group) > 1:  # one bad item must not sink the rest of the group
+                for entry in group:
+                    self._commit_group([entry])
+                return
+            group[0][1].set_exception(e)
+            with self._lock:
+                self.stats["failed"] += 1
+            return
+        end = time.perf_counter()
+        for (_, future, _), result in zip(group, results):
+            future.set_result(result)
+        with self._lock:
+            self.stats["committed"] += len(group)
+            self.stats["groups"] += 1
+            self._commit_seconds.append(end - start)
+            self._wait_seconds.append(end - min(submitted for _, _, submitted in group))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            group, stopping = self._next_group()
+            if group:
+                self._commit_group(group)
+            for _ in range(len(group) + stopping):
+                self._queue.task_done()
+
+    # ---------- metrics ----------
+    def summary(self) -> dict:
+        """Counters plus current queue depth and group size / latency percentiles (ms)."""
+        def pct(values, q):
+            if not values:
+                return None
+            if len(values) == 1:
+                return round(1e3 * values[0], 2)
+            return round(1e3 * statistics.quantiles(values, n=100)[q - 1], 2)
+
+        with self._lock:
+            out = dict(self.stats)
+            commit_seconds, wait_seconds = list(self._commit_seconds), list(self._wait_seconds)
+        out["depth"] = self._queue.qsize()
+        out["capacity"] = self._queue.maxsize
+        out["avg_group_size"] = round(out["committed"] / out["groups"], 1) if out["groups"] else 0.0
+        out["commit_p50_ms"], out["commit_p95_ms"] = pct(commit_seconds, 50), pct(commit_seconds, 95)
+        out["latency_p50_ms"], out["latency_p95_ms"] = pct(wait_seconds, 50), pct(wait_seconds, 95)
+        return out
+
+
+_WRITERS = {}
+_WRITERS_LOCK = threading.Lock()
+
+def get_writer(key: str, commit) -> WriteBehindQueue:
+    """One writer per key (e.g. database path) per process (survives Streamlit reruns), drained at exit."""
+    with _WRITERS_LOCK:
+        if key not in _WRITERS:
+            _WRITERS[key] = WriteBehindQueue(commit)
+            atexit.register(_WRITERS[key].close)
+        return _WRITERS[key]